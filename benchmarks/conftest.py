@@ -0,0 +1,109 @@
+"""
+Shared fixtures of the benchmark suite.
+
+Run the suite and save a baseline with::
+
+    pytest benchmarks --benchmark-autosave --benchmark-json=baseline.json
+
+then fail on time regressions against the last saved run, and on peak
+memory regressions against the JSON baseline, with::
+
+    pytest benchmarks --benchmark-compare --benchmark-compare-fail=mean:15% \\
+        --memory-baseline=baseline.json
+"""
+
+import json
+import tracemalloc
+from typing import Any, Callable
+
+import matplotlib
+
+matplotlib.use("Agg")
+
+import pytest  # noqa: E402
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark memory")
+    group.addoption(
+        "--memory-baseline",
+        default=None,
+        help="benchmark JSON file whose peak memory is the regression baseline",
+    )
+    group.addoption(
+        "--memory-tolerance",
+        type=float,
+        default=0.15,
+        help="allowed relative increase of peak memory (default: 0.15)",
+    )
+
+
+@pytest.fixture(scope="session")
+def memory_baseline(pytestconfig):
+    """Peak memory of each benchmark in the baseline run, by full name."""
+    path = pytestconfig.getoption("--memory-baseline")
+    if path is None:
+        return {}
+    with open(path, encoding="utf-8") as fh:
+        benchmarks = json.load(fh)["benchmarks"]
+    return {
+        bench["fullname"]: bench["extra_info"]["peak_memory_bytes"]
+        for bench in benchmarks
+        if "peak_memory_bytes" in bench.get("extra_info", {})
+    }
+
+
+def measure_peak_memory(func: Callable, *args: Any, **kwargs: Any) -> int:
+    """
+    Measure the peak memory allocated by one call.
+
+    Parameters
+    ----------
+    func : Callable
+        Function to call
+    *args, **kwargs
+        Arguments of the call
+
+    Returns
+    -------
+    int
+        Peak traced memory in bytes
+    """
+    tracemalloc.start()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak
+
+
+@pytest.fixture
+def run_benchmark(benchmark, request, memory_baseline):
+    """
+    Time a call and record its throughput and peak memory.
+
+    The returned function takes the number of processed items (syllables,
+    edges, ...), the function and its arguments, and returns the result of
+    the timed call. The test fails if the peak memory exceeds the baseline
+    by more than the tolerance.
+    """
+
+    def run(nb_items: int, func: Callable, *args: Any, **kwargs: Any) -> Any:
+        result = benchmark(func, *args, **kwargs)
+        benchmark.extra_info["nb_items"] = nb_items
+        if benchmark.stats is not None:  # None with --benchmark-disable
+            mean_time = benchmark.stats.stats.mean
+            benchmark.extra_info["items_per_s"] = nb_items / mean_time
+
+        peak_memory = measure_peak_memory(func, *args, **kwargs)
+        benchmark.extra_info["peak_memory_bytes"] = peak_memory
+        baseline = memory_baseline.get(request.node.nodeid)
+        if baseline is not None:
+            tolerance = request.config.getoption("--memory-tolerance")
+            assert peak_memory <= baseline * (1 + tolerance), (
+                f"peak memory regressed from {baseline} to {peak_memory} bytes"
+            )
+        return result
+
+    return run
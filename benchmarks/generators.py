@@ -0,0 +1,76 @@
+"""
+Synthetic syllable sequence generators for the benchmarks.
+"""
+
+import numpy as np
+from typing import Tuple
+
+# Code points of the synthetic syllables; past the ASCII letters they are
+# taken from the CJK block so alphabets of thousands of notes stay valid
+_SYMBOLS = "abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ"
+
+
+def make_note_seq(nb_notes: int) -> str:
+    """
+    Build a note sequence of a given size, stop syllable ("*") last.
+
+    Parameters
+    ----------
+    nb_notes : int
+        Number of notes, stop syllable included
+
+    Returns
+    -------
+    str
+        Note sequence
+    """
+    symbols = _SYMBOLS + "".join(chr(0x4E00 + ind) for ind in range(nb_notes))
+    return symbols[: nb_notes - 1] + "*"
+
+
+def make_syllables(
+    nb_syllables: int,
+    nb_notes: int = 10,
+    randomness: float = 0.2,
+    seed: int = 0,
+) -> Tuple[str, str]:
+    """
+    Generate a syllable string from a simple Markov chain.
+
+    Each syllable is followed by the next note of the note sequence (the
+    stop syllable wrapping back to the first note), except that with
+    probability ``randomness`` the next syllable is drawn uniformly. The
+    transition entropy thus goes from 0 (fully stereotyped song) at
+    ``randomness=0`` to ``log2(nb_notes)`` at ``randomness=1``.
+
+    Parameters
+    ----------
+    nb_syllables : int
+        Length of the sequence
+    nb_notes : int, optional
+        Alphabet size, stop syllable included, by default 10
+    randomness : float, optional
+        Probability of a uniform random transition, by default 0.2
+    seed : int, optional
+        Random seed, by default 0
+
+    Returns
+    -------
+    Tuple[str, str]
+        Syllable string and note sequence
+    """
+    rng = np.random.default_rng(seed)
+    note_seq = make_note_seq(nb_notes)
+
+    # Between two random jumps the chain steps through the note sequence,
+    # so each syllable is the last jump target plus the steps taken since
+    ind = np.arange(nb_syllables)
+    is_jump = rng.random(nb_syllables) < randomness
+    is_jump[:1] = True
+    jump_target = rng.integers(0, nb_notes, nb_syllables)
+    last_jump = np.maximum.accumulate(np.where(is_jump, ind, 0))
+    codes = (jump_target[last_jump] + ind - last_jump) % nb_notes
+
+    symbols = np.array([ord(note) for note in note_seq], dtype=np.uint32)
+    syllables = symbols[codes].tobytes().decode("utf-32-le")
+    return syllables, note_seq
@@ -0,0 +1,83 @@
+"""
+Benchmarks of the transition matrix, network and metric functions.
+"""
+
+import pytest
+
+from benchmarks.generators import make_syllables
+from syllable_network_analysis.analysis import (
+    get_row_entropy,
+    get_sequence_consistency,
+    get_sequence_linearity,
+    get_sequence_metrics,
+    get_song_stereotypy,
+    get_syllable_network,
+    get_trans_entropy,
+    get_trans_matrix,
+    get_typical_rows,
+)
+
+SEQUENCE_LENGTHS = [10_000, 100_000, 1_000_000]
+ALPHABET_SIZES = [10, 100, 1000]
+
+
+class TestBenchTransMatrix:
+    """Benchmarks of transition matrix construction."""
+
+    @pytest.mark.parametrize("nb_syllables", SEQUENCE_LENGTHS)
+    @pytest.mark.parametrize("randomness", [0.0, 0.5])
+    def test_get_trans_matrix(self, run_benchmark, nb_syllables, randomness):
+        """Time transition counting across sequence lengths and entropies."""
+        syllables, note_seq = make_syllables(nb_syllables, randomness=randomness)
+        run_benchmark(nb_syllables, get_trans_matrix, syllables, note_seq)
+
+    @pytest.mark.parametrize("nb_notes", ALPHABET_SIZES)
+    @pytest.mark.parametrize("sparse", [False, True])
+    def test_get_trans_matrix_alphabet(self, run_benchmark, nb_notes, sparse):
+        """Time transition counting across alphabet sizes."""
+        syllables, note_seq = make_syllables(100_000, nb_notes=nb_notes)
+        run_benchmark(
+            len(syllables), get_trans_matrix, syllables, note_seq, sparse=sparse
+        )
+
+
+class TestBenchNetwork:
+    """Benchmarks of the network and metric functions."""
+
+    @pytest.fixture(params=ALPHABET_SIZES)
+    def trans_matrix(self, request):
+        syllables, note_seq = make_syllables(200_000, nb_notes=request.param)
+        return note_seq, get_trans_matrix(syllables, note_seq)
+
+    def test_get_syllable_network(self, run_benchmark, trans_matrix):
+        """Time the conversion to an edge list."""
+        _, trans_matrix = trans_matrix
+        run_benchmark(trans_matrix.size, get_syllable_network, trans_matrix)
+
+    @pytest.mark.parametrize(
+        "func", [get_row_entropy, get_trans_entropy, get_typical_rows]
+    )
+    def test_matrix_metric(self, run_benchmark, trans_matrix, func):
+        """Time the metrics computed from the transition matrix alone."""
+        _, trans_matrix = trans_matrix
+        run_benchmark(trans_matrix.size, func, trans_matrix)
+
+    @pytest.mark.parametrize(
+        "func",
+        [get_sequence_linearity, get_sequence_consistency, get_sequence_metrics],
+    )
+    def test_sequence_metric(self, run_benchmark, trans_matrix, func):
+        """Time the metrics computed from the note sequence and matrix."""
+        note_seq, trans_matrix = trans_matrix
+        run_benchmark(trans_matrix.size, func, note_seq, trans_matrix)
+
+    def test_get_song_stereotypy(self, run_benchmark, trans_matrix):
+        """Time song stereotypy from the linearity and consistency."""
+        note_seq, trans_matrix = trans_matrix
+        linearity = get_sequence_linearity(note_seq, trans_matrix)
+        consistency = get_sequence_consistency(note_seq, trans_matrix)
+        run_benchmark(1, get_song_stereotypy, linearity, consistency)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,37 @@
+"""
+Benchmarks of the plotting functions.
+"""
+
+import pytest
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from benchmarks.generators import make_syllables
+from syllable_network_analysis.analysis import get_syllable_network, get_trans_matrix
+from syllable_network_analysis.plot import plot_transition_diag
+
+
+class TestBenchPlot:
+    """Benchmarks of transition diagram drawing."""
+
+    @pytest.mark.parametrize("nb_syllables", [1_000, 10_000, 30_000])
+    @pytest.mark.parametrize("randomness", [0.1, 0.5])
+    def test_plot_transition_diag(self, run_benchmark, nb_syllables, randomness):
+        """Time drawing and rendering as the number of instances grows."""
+        syllables, note_seq = make_syllables(nb_syllables, randomness=randomness)
+        syl_network = get_syllable_network(get_trans_matrix(syllables, note_seq))
+        syl_color = {note: f"C{ind % 10}" for ind, note in enumerate(note_seq)}
+
+        def draw():
+            fig = Figure(figsize=(6, 6))
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot(1, 1, 1)
+            plot_transition_diag(ax, note_seq, syl_network, syl_color)
+            fig.canvas.draw()
+
+        nb_instances = sum(weight for _, _, weight in syl_network)
+        run_benchmark(nb_instances, draw)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
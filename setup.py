@@ -30,7 +30,13 @@ setup(
     ],
     python_requires=">=3.8",
     install_requires=requirements,
+    entry_points={
+        "console_scripts": [
+            "syllable-network=syllable_network_analysis.cli:main",
+        ]
+    },
     extras_require={
+        "parquet": ["pyarrow>=7.0.0"],
         "dev": [
             "pytest>=6.0.0",
             "pytest-cov>=2.12.0",
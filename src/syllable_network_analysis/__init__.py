@@ -8,24 +8,129 @@ __version__ = "0.1.0"
 __author__ = "Your Name"
 __email__ = "your.email@example.com"
 
+import importlib
+
 from .analysis import (
+    Alphabet,
+    MarkovCounts,
+    MotifIndex,
+    ResultCache,
+    SyllableCorpus,
+    SyllableRuns,
+    SyllableSequence,
+    TransitionCounter,
+    bootstrap_metrics,
+    convert_song_info,
+    disable_cache,
+    enable_cache,
+    get_bout_trans_matrices,
+    get_cache,
+    get_conditional_entropy,
+    get_confidence_interval,
+    get_entropy_by_order,
+    get_grouped_metrics,
+    get_grouped_trans_matrices,
+    get_markov_counts,
+    get_pairwise_divergence,
+    get_repeat_counts,
+    get_repeat_stats,
+    get_repeat_trans_matrix,
+    get_row_entropy,
     get_sequence_consistency,
     get_sequence_linearity,
+    get_sequence_metrics,
     get_song_stereotypy,
     get_syllable_network,
+    get_syllable_runs,
     get_trans_entropy,
+    get_trans_matrices,
     get_trans_matrix,
+    get_typical_rows,
+    get_windowed_metrics,
+    get_windowed_trans_matrices,
+    load_song_info,
     nb_song_note_in_bout,
+    shuffle_null_metrics,
+    write_corpus,
 )
-from .plot import plot_transition_diag
+
+# Plotting pulls in matplotlib, so it is only imported on first use (as is
+# audio processing)
+_LAZY_ATTRS = {
+    "plot_transition_diag": ".plot",
+    "DiagramJob": ".plot",
+    "render_transition_diagrams": ".plot",
+    "SyllableSegmenter": ".audio",
+    "segment_file": ".audio",
+    "segment_files": ".audio",
+    "label_file": ".audio",
+    "label_files": ".audio",
+}
+_LAZY_SUBMODULES = {"audio", "cli", "plot"}
 
 __all__ = [
     "get_trans_matrix",
+    "get_trans_matrices",
     "get_syllable_network",
     "get_trans_entropy",
+    "get_row_entropy",
+    "get_typical_rows",
     "get_sequence_linearity",
     "get_sequence_consistency",
     "get_song_stereotypy",
+    "get_sequence_metrics",
     "nb_song_note_in_bout",
+    "SyllableSequence",
+    "TransitionCounter",
+    "get_windowed_trans_matrices",
+    "get_windowed_metrics",
+    "get_bout_trans_matrices",
+    "bootstrap_metrics",
+    "shuffle_null_metrics",
+    "get_confidence_interval",
+    "SyllableCorpus",
+    "write_corpus",
+    "convert_song_info",
+    "load_song_info",
+    "ResultCache",
+    "enable_cache",
+    "disable_cache",
+    "get_cache",
+    "MarkovCounts",
+    "get_markov_counts",
+    "get_conditional_entropy",
+    "get_entropy_by_order",
+    "SyllableRuns",
+    "get_syllable_runs",
+    "get_repeat_counts",
+    "get_repeat_stats",
+    "get_repeat_trans_matrix",
+    "Alphabet",
+    "get_grouped_trans_matrices",
+    "get_grouped_metrics",
+    "get_pairwise_divergence",
+    "MotifIndex",
     "plot_transition_diag",
+    "DiagramJob",
+    "render_transition_diagrams",
+    "SyllableSegmenter",
+    "segment_file",
+    "segment_files",
+    "label_file",
+    "label_files",
 ]
+
+
+def __getattr__(name):
+    if name in _LAZY_ATTRS:
+        value = getattr(importlib.import_module(_LAZY_ATTRS[name], __name__), name)
+    elif name in _LAZY_SUBMODULES:
+        value = importlib.import_module(f".{name}", __name__)
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRS) | _LAZY_SUBMODULES)
@@ -4,20 +4,86 @@ Analysis module for syllable network analysis.
 
 from .core import (
     get_trans_matrix,
+    get_trans_matrices,
     get_syllable_network,
     get_trans_entropy,
+    get_row_entropy,
+    get_typical_rows,
     get_sequence_linearity,
     get_sequence_consistency,
     get_song_stereotypy,
+    get_sequence_metrics,
     nb_song_note_in_bout,
 )
+from .alphabet import Alphabet
+from .cache import ResultCache, disable_cache, enable_cache, get_cache
+from .corpus import SyllableCorpus, convert_song_info, load_song_info, write_corpus
+from .divergence import get_pairwise_divergence
+from .grouped import get_grouped_metrics, get_grouped_trans_matrices
+from .markov import (
+    MarkovCounts,
+    get_conditional_entropy,
+    get_entropy_by_order,
+    get_markov_counts,
+)
+from .motifs import MotifIndex
+from .repeats import (
+    SyllableRuns,
+    get_repeat_counts,
+    get_repeat_stats,
+    get_repeat_trans_matrix,
+    get_syllable_runs,
+)
+from .resampling import (
+    bootstrap_metrics,
+    get_bout_trans_matrices,
+    get_confidence_interval,
+    shuffle_null_metrics,
+)
+from .sequence import SyllableSequence
+from .streaming import TransitionCounter
+from .windowed import get_windowed_metrics, get_windowed_trans_matrices
 
 __all__ = [
     "get_trans_matrix",
+    "get_trans_matrices",
     "get_syllable_network",
     "get_trans_entropy",
+    "get_row_entropy",
+    "get_typical_rows",
     "get_sequence_linearity",
     "get_sequence_consistency",
     "get_song_stereotypy",
+    "get_sequence_metrics",
     "nb_song_note_in_bout",
+    "SyllableSequence",
+    "TransitionCounter",
+    "get_windowed_trans_matrices",
+    "get_windowed_metrics",
+    "get_bout_trans_matrices",
+    "bootstrap_metrics",
+    "shuffle_null_metrics",
+    "get_confidence_interval",
+    "SyllableCorpus",
+    "write_corpus",
+    "convert_song_info",
+    "load_song_info",
+    "ResultCache",
+    "enable_cache",
+    "disable_cache",
+    "get_cache",
+    "MarkovCounts",
+    "get_markov_counts",
+    "get_conditional_entropy",
+    "get_entropy_by_order",
+    "SyllableRuns",
+    "get_syllable_runs",
+    "get_repeat_counts",
+    "get_repeat_stats",
+    "get_repeat_trans_matrix",
+    "Alphabet",
+    "get_grouped_trans_matrices",
+    "get_grouped_metrics",
+    "get_pairwise_divergence",
+    "MotifIndex",
 ]
\ No newline at end of file
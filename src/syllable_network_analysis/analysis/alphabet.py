@@ -0,0 +1,255 @@
+"""
+Syllable alphabet with precomputed symbol lookup tables.
+"""
+
+import numpy as np
+from typing import Any, Dict, Iterator, Sequence, Tuple, Union
+
+# Syllable categories, in note sequence order
+CATEGORIES = ("intro", "song", "call", "stop")
+
+
+class Alphabet:
+    """
+    Syllable alphabet split into intro notes, song notes, calls and stop.
+
+    Symbols are ordered as intro notes, song notes, calls and the stop
+    symbol, so an alphabet can be used wherever a note sequence is expected.
+    Symbol indices are looked up in a precomputed table: a syllable string
+    is encoded with a single ``np.take`` on a code point table, instead of
+    one scan of the note sequence per syllable.
+
+    Labels may have several characters (e.g. ``"i1"``, ``"call2"``). Strings
+    of syllables are then read as whitespace-separated labels.
+
+    Parameters
+    ----------
+    intro_notes : str or Sequence[str], optional
+        Intro note labels (a string is split into characters)
+    song_notes : str or Sequence[str], optional
+        Song note labels
+    calls : str or Sequence[str], optional
+        Call labels
+    stop_symbol : str, optional
+        Bout stop symbol, by default "*"
+    """
+
+    def __init__(
+        self,
+        intro_notes: Union[str, Sequence[str]] = (),
+        song_notes: Union[str, Sequence[str]] = (),
+        calls: Union[str, Sequence[str]] = (),
+        stop_symbol: str = "*",
+    ):
+        self.intro_notes = tuple(intro_notes)
+        self.song_notes = tuple(song_notes)
+        self.calls = tuple(calls)
+        self.stop_symbol = stop_symbol
+        self.symbols = (
+            self.intro_notes + self.song_notes + self.calls + (stop_symbol,)
+        )
+        self.categories = (
+            ("intro",) * len(self.intro_notes)
+            + ("song",) * len(self.song_notes)
+            + ("call",) * len(self.calls)
+            + ("stop",)
+        )
+
+        self._index = {}
+        for ind, symbol in enumerate(self.symbols):
+            if not isinstance(symbol, str) or not symbol:
+                raise ValueError(f"Invalid syllable label {symbol!r}")
+            if symbol in self._index:
+                raise ValueError(f"Duplicate syllable label {symbol!r}")
+            self._index[symbol] = ind
+
+        # Code point -> index table, with a trailing -1 for all code points
+        # past the table (it covers all 256 bytes at least)
+        self.is_single_char = all(len(symbol) == 1 for symbol in self.symbols)
+        self._lut = None
+        if self.is_single_char:
+            points = np.array([ord(symbol) for symbol in self.symbols])
+            self._lut = np.full(max(points.max() + 2, 257), -1, dtype=np.int64)
+            self._lut[points] = np.arange(len(self.symbols))
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any]) -> "Alphabet":
+        """
+        Build the alphabet of the syllables section of a configuration.
+
+        Parameters
+        ----------
+        config : Dict[str, Any]
+            Configuration (see ``load_config``), or its syllables section
+
+        Returns
+        -------
+        Alphabet
+            Alphabet
+        """
+        syllables = config.get("syllables", config)
+        return cls(
+            intro_notes=syllables.get("intro_notes", ()),
+            song_notes=syllables.get("song_notes", ()),
+            calls=syllables.get("calls", ()),
+            stop_symbol=syllables.get("stop_symbol", "*"),
+        )
+
+    @classmethod
+    def from_note_seq(cls, note_seq: Union[str, Sequence[str]]) -> "Alphabet":
+        """
+        Build an alphabet from a note sequence (stop symbol last).
+
+        All notes but the stop symbol are taken as song notes.
+
+        Parameters
+        ----------
+        note_seq : str or Sequence[str]
+            Note sequence
+
+        Returns
+        -------
+        Alphabet
+            Alphabet
+        """
+        if isinstance(note_seq, Alphabet):
+            return note_seq
+        note_seq = tuple(note_seq)
+        return cls(song_notes=note_seq[:-1], stop_symbol=note_seq[-1])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Get the alphabet as a syllables configuration section."""
+        return {
+            "intro_notes": list(self.intro_notes),
+            "song_notes": list(self.song_notes),
+            "calls": list(self.calls),
+            "stop_symbol": self.stop_symbol,
+        }
+
+    def __len__(self) -> int:
+        return len(self.symbols)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.symbols)
+
+    def __getitem__(self, ind: Union[int, slice]) -> Union[str, Tuple[str, ...]]:
+        return self.symbols[ind]
+
+    def __contains__(self, symbol: str) -> bool:
+        return symbol in self._index
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, Alphabet):
+            return NotImplemented
+        return (self.symbols, self.categories) == (other.symbols, other.categories)
+
+    def __hash__(self) -> int:
+        return hash((self.symbols, self.categories))
+
+    def __repr__(self) -> str:
+        return (
+            f"Alphabet(intro_notes={list(self.intro_notes)}, "
+            f"song_notes={list(self.song_notes)}, calls={list(self.calls)}, "
+            f"stop_symbol={self.stop_symbol!r})"
+        )
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return self.to_dict()
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__init__(**state)
+
+    @property
+    def note_seq(self) -> Union[str, Tuple[str, ...]]:
+        """Note sequence: a string for single-character labels."""
+        if self.is_single_char:
+            return "".join(self.symbols)
+        return self.symbols
+
+    def index(self, symbol: str) -> int:
+        """
+        Get the index of a symbol.
+
+        Parameters
+        ----------
+        symbol : str
+            Syllable label
+
+        Returns
+        -------
+        int
+            Index in the note sequence, -1 if the symbol is not in it
+        """
+        return self._index.get(symbol, -1)
+
+    def get_category_mask(self, category: str) -> np.ndarray:
+        """
+        Find the notes of a category.
+
+        Parameters
+        ----------
+        category : str
+            One of "intro", "song", "call" and "stop"
+
+        Returns
+        -------
+        np.ndarray
+            Boolean mask over the note indices
+        """
+        if category not in CATEGORIES:
+            raise ValueError(f"Unknown category {category!r}")
+        return np.array([cat == category for cat in self.categories])
+
+    def encode(self, syllables: Union[str, Sequence[str]]) -> np.ndarray:
+        """
+        Encode syllables into their indices.
+
+        Parameters
+        ----------
+        syllables : str or Sequence[str]
+            String of syllables (whitespace-separated labels for an alphabet
+            with multi-character labels), or a sequence of labels
+
+        Returns
+        -------
+        np.ndarray
+            Index of each syllable, -1 for syllables not in the alphabet
+        """
+        if isinstance(syllables, str):
+            if self.is_single_char:
+                try:
+                    points = np.frombuffer(syllables.encode("latin-1"), np.uint8)
+                except UnicodeEncodeError:
+                    points = np.frombuffer(
+                        syllables.encode("utf-32-le"), dtype=np.uint32
+                    )
+                    points = np.minimum(points, np.uint32(self._lut.size - 1))
+                return np.take(self._lut, points)
+            syllables = syllables.split()
+
+        index = self._index
+        return np.fromiter(
+            (index.get(syllable, -1) for syllable in syllables),
+            dtype=np.int64,
+            count=len(syllables),
+        )
+
+    def decode(self, codes: np.ndarray, unknown: str = "?") -> Tuple[str, ...]:
+        """
+        Decode indices back into labels.
+
+        Parameters
+        ----------
+        codes : np.ndarray
+            Syllable indices, negative for unknown syllables
+        unknown : str, optional
+            Label of unknown syllables, by default "?"
+
+        Returns
+        -------
+        Tuple[str, ...]
+            Label of each syllable
+        """
+        labels = np.array(self.symbols + (unknown,), dtype=object)
+        codes = np.asarray(codes)
+        return tuple(labels[np.where(codes < 0, len(self.symbols), codes)])
@@ -0,0 +1,308 @@
+"""
+Opt-in content-addressed cache for transition matrices and metrics.
+
+Results are keyed on a hash of the function name and the content of its
+arguments (syllable data, note sequence, parameters), so a cached result
+is never reused once the underlying data changes.
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional, Union
+
+import numpy as np
+
+from ..utils.lazy import is_sparse
+from .alphabet import Alphabet
+from .sequence import SyllableSequence
+
+# Bump when cached results change format or meaning
+CACHE_VERSION = 1
+
+_MISSING = object()
+
+# Active cache, None when caching is disabled
+_cache = None
+
+
+def _update_hash(hasher: "hashlib._Hash", obj: Any) -> None:
+    """Feed the content of an argument into a hash."""
+    if obj is None or isinstance(obj, (bool, int, float, np.generic)):
+        hasher.update(b"v" + repr(obj).encode())
+    elif isinstance(obj, str):
+        data = obj.encode("utf-8")
+        hasher.update(b"s%d:" % len(data) + data)
+    elif isinstance(obj, bytes):
+        hasher.update(b"b%d:" % len(obj) + obj)
+    elif isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+        hasher.update(b"a" + obj.dtype.str.encode() + repr(obj.shape).encode())
+        hasher.update(np.ascontiguousarray(obj).data)
+    elif is_sparse(obj):
+        import scipy.sparse as sp
+
+        obj = sp.csr_matrix(obj, copy=True)
+        obj.sum_duplicates()  # canonical form, same content hashes the same
+        hasher.update(b"c" + repr(obj.shape).encode())
+        _update_hash(hasher, (obj.data, obj.indices, obj.indptr))
+    elif isinstance(obj, Alphabet):
+        hasher.update(b"A")
+        _update_hash(hasher, (obj.symbols, obj.categories))
+    elif isinstance(obj, SyllableSequence):
+        hasher.update(b"q")
+        _update_hash(hasher, (obj.codes, obj.bout_offsets, obj.note_seq))
+    elif isinstance(obj, (tuple, list)):
+        hasher.update(b"l%d:" % len(obj))
+        for item in obj:
+            _update_hash(hasher, item)
+    elif isinstance(obj, dict):
+        hasher.update(b"d%d:" % len(obj))
+        for key in sorted(obj):
+            _update_hash(hasher, key)
+            _update_hash(hasher, obj[key])
+    else:
+        raise TypeError(f"Cannot hash argument of type {type(obj).__name__}")
+
+
+def get_cache_key(name: str, *args: Any, **kwargs: Any) -> str:
+    """
+    Build a content-addressed cache key.
+
+    Parameters
+    ----------
+    name : str
+        Name of the cached function
+    *args, **kwargs
+        Arguments of the call (strings, arrays, sparse matrices, syllable
+        sequences, containers of those, or scalars)
+
+    Returns
+    -------
+    str
+        Hex digest of the function name and argument contents
+    """
+    hasher = hashlib.sha256()
+    _update_hash(hasher, (CACHE_VERSION, name, args, kwargs))
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier result cache.
+
+    Parameters
+    ----------
+    max_items : int, optional
+        Number of results kept in the in-memory LRU tier, by default 256
+    cache_dir : str or Path, optional
+        Directory of the on-disk tier, by default no disk tier
+    max_bytes : int, optional
+        Size cap of the on-disk tier; least recently used files are
+        evicted beyond it, by default 1 GB
+    """
+
+    def __init__(
+        self,
+        max_items: int = 256,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_bytes: int = 2**30,
+    ):
+        self.max_items = max_items
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        # Size of each file of the disk tier, scanned once and then kept up to
+        # date, so that a write does not list the whole directory
+        self._disk_sizes = {}
+        self._disk_bytes = 0
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._scan_disk()
+
+    def _path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.pkl"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Look up a result, first in memory then on disk.
+
+        Parameters
+        ----------
+        key : str
+            Cache key (see ``get_cache_key``)
+        default : Any, optional
+            Returned on a miss, by default None
+
+        Returns
+        -------
+        Any
+            Copy of the cached result, or ``default``
+        """
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(self._memory[key])
+
+        if self.cache_dir is not None:
+            path = self._path(key)
+            try:
+                with open(path, "rb") as fh:
+                    result = pickle.load(fh)
+                os.utime(path)  # mark as recently used
+            except (OSError, pickle.UnpicklingError, EOFError):
+                pass
+            else:
+                self.hits += 1
+                self._set_memory(key, result)
+                return copy.deepcopy(result)
+
+        self.misses += 1
+        return default
+
+    def set(self, key: str, result: Any) -> None:
+        """
+        Store a result in both tiers.
+
+        Parameters
+        ----------
+        key : str
+            Cache key (see ``get_cache_key``)
+        result : Any
+            Picklable result
+        """
+        result = copy.deepcopy(result)
+        self._set_memory(key, result)
+        if self.cache_dir is not None:
+            tmp_path = self._path(key).with_suffix(f".tmp{os.getpid()}")
+            with open(tmp_path, "wb") as fh:
+                pickle.dump(result, fh, protocol=pickle.HIGHEST_PROTOCOL)
+            size = tmp_path.stat().st_size
+            os.replace(tmp_path, self._path(key))
+            self._disk_bytes += size - self._disk_sizes.get(key, 0)
+            self._disk_sizes[key] = size
+            if self._disk_bytes > self.max_bytes:
+                self._evict_disk()
+
+    def _set_memory(self, key: str, result: Any) -> None:
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_items:
+            self._memory.popitem(last=False)
+
+    def _list_disk(self) -> list:
+        """List the (mtime, size, path) of the files of the disk tier."""
+        entries = []
+        for path in self.cache_dir.glob("*.pkl"):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        return entries
+
+    def _scan_disk(self) -> list:
+        """Recount the files of the disk tier (e.g. written by other processes)."""
+        entries = self._list_disk()
+        self._disk_sizes = {path.stem: size for _, size, path in entries}
+        self._disk_bytes = sum(self._disk_sizes.values())
+        return entries
+
+    def _evict_disk(self) -> None:
+        """Remove least recently used files beyond the size cap."""
+        entries = sorted(self._scan_disk(), key=lambda entry: entry[0])
+        for _, size, path in entries:
+            if self._disk_bytes <= self.max_bytes:
+                break
+            try:
+                path.unlink()
+            except OSError:
+                continue
+            self._disk_bytes -= self._disk_sizes.pop(path.stem, size)
+
+    def clear(self) -> None:
+        """Remove all cached results from both tiers."""
+        self._memory.clear()
+        if self.cache_dir is not None:
+            for path in self.cache_dir.glob("*.pkl"):
+                path.unlink()
+            self._disk_sizes.clear()
+            self._disk_bytes = 0
+
+
+def enable_cache(
+    max_items: int = 256,
+    cache_dir: Optional[Union[str, Path]] = None,
+    max_bytes: int = 2**30,
+) -> ResultCache:
+    """
+    Turn on caching of the analysis functions.
+
+    Parameters
+    ----------
+    max_items : int, optional
+        Number of results kept in memory, by default 256
+    cache_dir : str or Path, optional
+        Directory of the on-disk tier, by default memory only
+    max_bytes : int, optional
+        Size cap of the on-disk tier, by default 1 GB
+
+    Returns
+    -------
+    ResultCache
+        The active cache
+    """
+    global _cache
+    _cache = ResultCache(
+        max_items=max_items, cache_dir=cache_dir, max_bytes=max_bytes
+    )
+    return _cache
+
+
+def disable_cache() -> None:
+    """Turn off caching (cached files on disk are kept)."""
+    global _cache
+    _cache = None
+
+
+def get_cache() -> Optional[ResultCache]:
+    """Get the active cache, None if caching is disabled."""
+    return _cache
+
+
+def cached(func: Callable) -> Callable:
+    """
+    Cache the results of an analysis function when caching is enabled.
+
+    Calls go straight through to ``func`` while caching is disabled or
+    when an argument cannot be hashed. Arguments are bound to the signature
+    of ``func`` (defaults included) before hashing, so passing an argument
+    by position or by keyword gives the same key.
+    """
+    name = f"{func.__module__}.{func.__qualname__}"
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        cache = _cache
+        if cache is None:
+            return func(*args, **kwargs)
+        try:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            key = get_cache_key(name, *bound.args, **bound.kwargs)
+        except TypeError:
+            return func(*args, **kwargs)
+        result = cache.get(key, _MISSING)
+        if result is _MISSING:
+            result = func(*args, **kwargs)
+            cache.set(key, result)
+        return result
+
+    return wrapper
@@ -3,10 +3,21 @@ Core analysis functions for syllable network analysis.
 """
 
 import numpy as np
-from typing import List, Tuple, Dict, Optional
+from typing import TYPE_CHECKING, List, Tuple, Dict, Optional, Sequence, Union
 
+from ..utils.lazy import is_sparse
+from ..utils.profiling import profiled
+from .alphabet import Alphabet
+from .cache import cached
+from .sequence import SyllableSequence, _encode_syllables
 
-def nb_song_note_in_bout(song_notes: str, bout: str) -> int:
+if TYPE_CHECKING:  # SciPy is only imported for sparse matrices
+    import scipy.sparse as sp
+
+
+def nb_song_note_in_bout(
+    song_notes: str, bout: Union[str, SyllableSequence]
+) -> int:
     """
     Returns the number of song notes within a bout.
     
@@ -14,109 +25,474 @@ def nb_song_note_in_bout(song_notes: str, bout: str) -> int:
     ----------
     song_notes : str
         String containing song notes
-    bout : str
-        String containing bout information
+    bout : str or SyllableSequence
+        String containing bout information, or an encoded bout
         
     Returns
     -------
     int
         Number of song notes in the bout
     """
-    nb_song_note_in_bout = len([note for note in song_notes if note in bout])
-    return nb_song_note_in_bout
+    if isinstance(bout, SyllableSequence):
+        is_present = np.zeros(len(bout.note_seq) + 1, dtype=bool)
+        is_present[bout.get_codes()] = True  # unknown syllables land on -1
+        song_codes = _encode_syllables(song_notes, bout.note_seq)
+        return int(np.sum(is_present[song_codes[song_codes >= 0]]))
 
+    bout_notes = set(bout)
+    return sum(note in bout_notes for note in song_notes)
 
-def get_trans_matrix(
-    syllables: str, 
-    note_seq: str, 
-    normalize: bool = False
+
+def _valid_transitions(
+    codes: np.ndarray, nb_notes: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Get the start and end indices of countable transitions.
+
+    Pairs involving an unknown syllable (negative code) are skipped and
+    no transitions are counted out of the stop syllable (last note).
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded syllables (see ``_encode_syllables``)
+    nb_notes : int
+        Number of notes in the note sequence
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Start and end note indices of each transition
+    """
+    start, end = codes[:-1], codes[1:]
+    valid = (start >= 0) & (end >= 0) & (start < nb_notes - 1)
+    return start[valid], end[valid]
+
+
+def _count_transitions(codes: np.ndarray, nb_notes: int) -> np.ndarray:
+    """
+    Count transitions between consecutive encoded syllables.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded syllables (see ``_encode_syllables``)
+    nb_notes : int
+        Number of notes in the note sequence
+
+    Returns
+    -------
+    np.ndarray
+        Transition count matrix of shape (nb_notes, nb_notes)
+    """
+    start, end = _valid_transitions(codes, nb_notes)
+    counts = np.bincount(start * nb_notes + end, minlength=nb_notes * nb_notes)
+    return counts.astype(np.int64, copy=False).reshape(nb_notes, nb_notes)
+
+
+def _count_transitions_sparse(codes: np.ndarray, nb_notes: int) -> "sp.csr_matrix":
+    """
+    Count transitions into a sparse matrix.
+
+    Memory scales with the number of distinct transitions instead of
+    ``nb_notes ** 2``.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded syllables (see ``_encode_syllables``)
+    nb_notes : int
+        Number of notes in the note sequence
+
+    Returns
+    -------
+    sp.csr_matrix
+        Transition count matrix of shape (nb_notes, nb_notes)
+    """
+    import scipy.sparse as sp
+
+    start, end = _valid_transitions(codes, nb_notes)
+    trans_matrix = sp.coo_matrix(
+        (np.ones(start.size, dtype=np.int64), (start, end)),
+        shape=(nb_notes, nb_notes),
+    ).tocsr()  # duplicate transitions are summed
+    trans_matrix.sort_indices()
+    return trans_matrix
+
+
+def _get_sparse_rows(
+    trans_matrix: "sp.spmatrix",
+) -> Tuple["sp.csr_matrix", np.ndarray]:
+    """
+    Get a canonical CSR copy of a sparse matrix and the row of each entry.
+
+    Parameters
+    ----------
+    trans_matrix : sp.spmatrix
+        Sparse transition matrix
+
+    Returns
+    -------
+    sp.csr_matrix
+        Matrix without explicit zeros, with sorted column indices
+    np.ndarray
+        Row index of each stored entry
+    """
+    import scipy.sparse as sp
+
+    trans_matrix = sp.csr_matrix(trans_matrix, copy=True)
+    trans_matrix.eliminate_zeros()
+    trans_matrix.sort_indices()
+    rows = np.repeat(
+        np.arange(trans_matrix.shape[0]), np.diff(trans_matrix.indptr)
+    )
+    return trans_matrix, rows
+
+
+def _count_grouped_transitions(
+    codes: np.ndarray,
+    lengths: np.ndarray,
+    nb_notes: int,
+    groups: Optional[np.ndarray] = None,
+    nb_groups: Optional[int] = None,
 ) -> np.ndarray:
+    """
+    Count transitions separately for consecutive groups of syllables.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded syllables of all sequences, concatenated
+    lengths : np.ndarray
+        Number of syllables in each sequence
+    nb_notes : int
+        Number of notes in the note sequence
+    groups : np.ndarray, optional
+        Group index of each sequence, by default one group per sequence.
+        Transitions never cross sequences, even within a group.
+    nb_groups : int, optional
+        Number of groups, by default ``groups.max() + 1``
+
+    Returns
+    -------
+    np.ndarray
+        Transition tensor of shape (n_groups, nb_notes, nb_notes)
+    """
+    nb_sequences = len(lengths)
+    sequence = np.repeat(np.arange(nb_sequences), lengths)
+    if groups is None:
+        group, nb_groups = sequence, nb_sequences
+    else:
+        groups = np.asarray(groups, dtype=np.int64)
+        if nb_groups is None:
+            nb_groups = int(groups.max()) + 1 if groups.size else 0
+        group = groups[sequence]
+
+    start, end = codes[:-1], codes[1:]
+    valid = (
+        (start >= 0)
+        & (end >= 0)
+        & (start < nb_notes - 1)
+        & (sequence[:-1] == sequence[1:])
+    )
+    flat_ind = (group[:-1][valid] * nb_notes + start[valid]) * nb_notes + end[valid]
+    counts = np.bincount(flat_ind, minlength=nb_groups * nb_notes * nb_notes)
+    return counts.astype(np.int64, copy=False).reshape(nb_groups, nb_notes, nb_notes)
+
+
+@profiled()
+@cached
+def get_trans_matrix(
+    syllables: Union[str, SyllableSequence],
+    note_seq: Optional[str] = None,
+    normalize: bool = False,
+    sparse: bool = False,
+) -> Union[np.ndarray, "sp.csr_matrix"]:
     """
     Build a syllable transition matrix.
+
+    Syllables are encoded once through a lookup table and the transitions
+    are counted in bulk. Transitions involving syllables not in ``note_seq``
+    are skipped, and transitions out of the stop syllable (last note) are
+    not counted.
+
+    With ``sparse=True`` a CSR matrix is returned, whose memory scales with
+    the number of observed transitions rather than the squared number of
+    notes. The network and metric functions accept it as is.
     
     Parameters
     ----------
-    syllables : str
-        String of syllables to analyze
-    note_seq : str
-        Reference note sequence
+    syllables : str or SyllableSequence
+        String of syllables to analyze, or an encoded sequence
+    note_seq : str, optional
+        Reference note sequence, by default the note sequence of an
+        encoded ``syllables``
     normalize : bool, optional
         Whether to normalize the matrix, by default False
+    sparse : bool, optional
+        Whether to return a sparse CSR matrix, by default False
         
     Returns
     -------
-    np.ndarray
-        Transition matrix
+    np.ndarray or sp.csr_matrix
+        Transition matrix (int64 counts, or float64 if normalized)
     """
-    trans_matrix = np.zeros((len(note_seq), len(note_seq)), dtype='int16')
-    
-    for i, note in enumerate(syllables):
-        if i < len(syllables) - 1:
-            if not (syllables[i] in note_seq) or not (syllables[i + 1] in note_seq):
-                continue
-            ind1 = note_seq.index(syllables[i])
-            ind2 = note_seq.index(syllables[i + 1])
-            if ind1 < len(note_seq) - 1:
-                trans_matrix[ind1, ind2] += 1
-                
+    if note_seq is None:
+        if not isinstance(syllables, SyllableSequence):
+            raise ValueError("note_seq is required for a syllable string")
+        note_seq = syllables.note_seq
+    codes = _encode_syllables(syllables, note_seq)
+    if sparse:
+        trans_matrix = _count_transitions_sparse(codes, len(note_seq))
+    else:
+        trans_matrix = _count_transitions(codes, len(note_seq))
+
     if normalize:
         trans_matrix = trans_matrix / trans_matrix.sum()
     return trans_matrix
 
 
-def get_syllable_network(trans_matrix: np.ndarray) -> List[Tuple[int, int, int]]:
+@profiled()
+@cached
+def get_trans_matrices(
+    syllables_list: Sequence[str],
+    note_seq: Optional[str] = None,
+    normalize: bool = False,
+    note_seqs: Optional[Sequence[str]] = None,
+) -> np.ndarray:
+    """
+    Build transition matrices for many syllable sequences at once.
+
+    All sequences are encoded and counted in a single pass, using a keyed
+    bincount over (session, start, end). Transitions never cross from one
+    sequence into the next.
+
+    Parameters
+    ----------
+    syllables_list : Sequence[str or SyllableSequence]
+        Syllable strings (or encoded sequences) to analyze, one per session
+    note_seq : str, optional
+        Reference note sequence shared by all sessions
+    normalize : bool, optional
+        Whether to normalize each matrix, by default False
+    note_seqs : Sequence[str], optional
+        Per-session note sequences, aligned to the same length.
+        Used instead of ``note_seq``.
+
+    Returns
+    -------
+    np.ndarray
+        Transition tensor of shape (n_sessions, k, k)
+    """
+    nb_sessions = len(syllables_list)
+    is_shared = note_seqs is None
+    if is_shared:
+        if note_seq is None:
+            raise ValueError("Either note_seq or note_seqs must be given")
+        nb_notes = len(note_seq)
+        note_seqs = [note_seq] * nb_sessions
+    else:
+        if len(note_seqs) != nb_sessions:
+            raise ValueError("note_seqs must have one entry per session")
+        nb_notes = len(note_seqs[0]) if nb_sessions else 0
+        if any(len(seq) != nb_notes for seq in note_seqs):
+            raise ValueError("note_seqs must all have the same length")
+
+    # Sessions are only joined before encoding when each character is a
+    # syllable; multi-character labels could otherwise straddle two sessions
+    is_single_char = not isinstance(note_seq, Alphabet) or note_seq.is_single_char
+    if (
+        is_shared
+        and is_single_char
+        and all(isinstance(syllables, str) for syllables in syllables_list)
+    ):
+        codes = _encode_syllables("".join(syllables_list), note_seq)
+        lengths = np.fromiter(
+            (len(syllables) for syllables in syllables_list),
+            dtype=np.int64,
+            count=nb_sessions,
+        )
+    else:
+        codes_list = [
+            _encode_syllables(syllables, seq)
+            for syllables, seq in zip(syllables_list, note_seqs)
+        ]
+        codes = np.concatenate([np.empty(0, dtype=np.int64)] + codes_list)
+        lengths = np.array(
+            [session_codes.size for session_codes in codes_list], dtype=np.int64
+        )
+    trans_matrices = _count_grouped_transitions(codes, lengths, nb_notes)
+
+    if normalize:
+        trans_matrices = trans_matrices / trans_matrices.sum(
+            axis=(1, 2), keepdims=True
+        )
+    return trans_matrices
+
+
+@profiled()
+@cached
+def get_syllable_network(
+    trans_matrix: Union[np.ndarray, "sp.spmatrix"]
+) -> List[Tuple[int, int, int]]:
     """
     Build sparse representation of a syllable network.
     
     Parameters
     ----------
-    trans_matrix : np.ndarray
-        Transition matrix
+    trans_matrix : np.ndarray or sp.spmatrix
+        Transition matrix, dense or sparse
         
     Returns
     -------
     List[Tuple[int, int, int]]
-        List of tuples (start node, end node, weight)
+        List of tuples (start node, end node, weight), in row-major order
     """
-    start_node = np.transpose(np.nonzero(trans_matrix))[:, 0].T.tolist()
-    end_node = np.transpose(np.nonzero(trans_matrix))[:, 1].T.tolist()
-    weight = []
-    
-    for ind in range(0, len(start_node)):
-        weight.append(int(trans_matrix[start_node[ind], end_node[ind]]))
-    
-    syl_network = list(zip(start_node, end_node, weight))
+    if is_sparse(trans_matrix):
+        trans_matrix, start_node = _get_sparse_rows(trans_matrix)
+        end_node = trans_matrix.indices
+        weight = trans_matrix.data
+    else:
+        start_node, end_node = np.nonzero(trans_matrix)
+        weight = trans_matrix[start_node, end_node]
+
+    syl_network = list(
+        zip(
+            start_node.tolist(),
+            end_node.tolist(),
+            weight.astype(np.int64).tolist(),
+        )
+    )
     return syl_network
 
 
-def get_trans_entropy(trans_matrix: np.ndarray) -> float:
+@profiled()
+def get_row_entropy(trans_matrix: Union[np.ndarray, "sp.spmatrix"]) -> np.ndarray:
+    """
+    Calculate the transition entropy of each row.
+
+    Works on a whole matrix or a stack of matrices at once. The log is only
+    taken on non-zero probabilities, so no log2(0) warnings are raised.
+    A sparse matrix is only read through its stored entries.
+
+    Parameters
+    ----------
+    trans_matrix : np.ndarray or sp.spmatrix
+        Transition matrix, or a stack of matrices of shape (n, k, k)
+
+    Returns
+    -------
+    np.ndarray
+        Entropy of each row, NaN for rows without any transition
+    """
+    if is_sparse(trans_matrix):
+        trans_matrix, rows = _get_sparse_rows(trans_matrix)
+        nb_rows = trans_matrix.shape[0]
+        # bincount of no entries is integer, so cast before filling NaN
+        row_sum = np.bincount(rows, trans_matrix.data, minlength=nb_rows)
+        row_sum = row_sum.astype(np.float64)
+        prob = trans_matrix.data / row_sum[rows]
+        row_entropy = np.bincount(rows, prob * np.log2(prob), minlength=nb_rows)
+        row_entropy = -row_entropy.astype(np.float64)
+        row_entropy[row_sum == 0] = np.nan
+        return row_entropy
+
+    trans_matrix = np.asarray(trans_matrix)
+    row_sum = trans_matrix.sum(axis=-1, keepdims=True)
+    has_transition = row_sum != 0
+    prob = np.divide(
+        trans_matrix,
+        row_sum,
+        out=np.zeros(trans_matrix.shape),
+        where=has_transition,
+    )
+    log_prob = np.log2(prob, out=np.zeros(prob.shape), where=prob > 0)
+    row_entropy = -np.sum(prob * log_prob, axis=-1)
+    row_entropy[~has_transition[..., 0]] = np.nan
+    return row_entropy
+
+
+@profiled()
+def get_typical_rows(trans_matrix: Union[np.ndarray, "sp.spmatrix"]) -> np.ndarray:
+    """
+    Find the rows with a typical transition.
+
+    A row has a typical transition if it has any transition and a single
+    most frequent target syllable.
+
+    Parameters
+    ----------
+    trans_matrix : np.ndarray or sp.spmatrix
+        Transition matrix, or a stack of matrices of shape (n, k, k)
+
+    Returns
+    -------
+    np.ndarray
+        Boolean mask of the rows with a typical transition
+    """
+    if is_sparse(trans_matrix):
+        trans_matrix, rows = _get_sparse_rows(trans_matrix)
+        nb_rows = trans_matrix.shape[0]
+        row_max = np.zeros(nb_rows, dtype=trans_matrix.dtype)
+        np.maximum.at(row_max, rows, trans_matrix.data)
+        nb_max = np.bincount(
+            rows[trans_matrix.data == row_max[rows]], minlength=nb_rows
+        )
+        return nb_max == 1
+
+    trans_matrix = np.asarray(trans_matrix)
+    row_max = np.amax(trans_matrix, axis=-1, keepdims=True)
+    nb_max = np.sum(trans_matrix == row_max, axis=-1)
+    return (nb_max == 1) & (np.sum(trans_matrix, axis=-1) != 0)
+
+
+@profiled()
+@cached
+def get_trans_entropy(
+    trans_matrix: Union[np.ndarray, "sp.spmatrix"], return_rows: bool = False
+) -> Union[float, np.ndarray, Tuple[np.ndarray, np.ndarray]]:
     """
     Calculate transition entropy.
     
     Entropy will be equal to zero if all notes transition to only one syllable.
+    Rows without any transition are not included in the mean.
     
     Parameters
     ----------
-    trans_matrix : np.ndarray
-        Transition matrix
+    trans_matrix : np.ndarray or sp.spmatrix
+        Transition matrix, or a stack of matrices of shape (n, k, k)
+    return_rows : bool, optional
+        Whether to also return the entropy of each row, by default False
         
     Returns
     -------
-    float
-        Mean transition entropy
-    """
-    trans_entropy = []
-    for row in trans_matrix:
-        if np.sum(row):
-            prob = row / np.sum(row)
-            entropy = -np.nansum(prob * np.log2(prob))
-            trans_entropy.append(entropy)
-    
-    trans_entropy = np.mean(trans_entropy)
+    float or np.ndarray
+        Mean transition entropy (one value per matrix for a stack)
+    np.ndarray
+        Entropy of each row (see ``get_row_entropy``), if ``return_rows``
+    """
+    row_entropy = get_row_entropy(trans_matrix)
+    has_transition = ~np.isnan(row_entropy)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        trans_entropy = np.sum(
+            row_entropy, axis=-1, where=has_transition
+        ) / np.sum(has_transition, axis=-1)
+    if return_rows:
+        return trans_entropy, row_entropy
     return trans_entropy
 
 
-def get_sequence_linearity(note_seq: str, syl_network: List[Tuple[int, int, int]]) -> float:
+def _is_matrix_stack(array: np.ndarray, nb_notes: int) -> bool:
+    """Whether an array is a (k, k) matrix or a stack of them, not an edge list."""
+    return array.ndim in (2, 3) and array.shape[-2:] == (nb_notes, nb_notes)
+
+
+@profiled(size_arg="syl_network")
+@cached
+def get_sequence_linearity(
+    note_seq: str,
+    syl_network: Union[List[Tuple[int, int, int]], np.ndarray, "sp.spmatrix"],
+) -> Union[float, np.ndarray]:
     """
     Calculate sequence linearity.
     
@@ -124,48 +500,65 @@ def get_sequence_linearity(note_seq: str, syl_network: List[Tuple[int, int, int]
     ----------
     note_seq : str
         Note sequence
-    syl_network : List[Tuple[int, int, int]]
-        Syllable network
+    syl_network : List[Tuple[int, int, int]], np.ndarray or sp.spmatrix
+        Syllable network, or a transition matrix / stack of matrices
+        of shape (n, k, k)
         
     Returns
     -------
-    float
-        Sequence linearity score
+    float or np.ndarray
+        Sequence linearity score (one value per matrix for a stack)
     """
-    nb_unique_transitions = len(syl_network)
+    if is_sparse(syl_network):
+        nb_unique_transitions = syl_network.count_nonzero()
+    elif isinstance(syl_network, np.ndarray) and _is_matrix_stack(
+        syl_network, len(note_seq)
+    ):
+        nb_unique_transitions = np.count_nonzero(syl_network, axis=(-2, -1))
+    else:
+        nb_unique_transitions = len(syl_network)
     nb_unique_syllables = len(note_seq) - 1  # stop syllable (*) not counted here
     sequence_linearity = nb_unique_syllables / nb_unique_transitions
     return sequence_linearity
 
 
-def get_sequence_consistency(note_seq: str, trans_matrix: np.ndarray) -> float:
+@profiled(size_arg="trans_matrix")
+@cached
+def get_sequence_consistency(
+    note_seq: str, trans_matrix: Union[np.ndarray, "sp.spmatrix"]
+) -> Union[float, np.ndarray]:
     """
     Calculate sequence consistency.
+
+    A row contributes a typical transition if it has any transition and
+    a single most frequent target syllable (see ``get_typical_rows``).
     
     Parameters
     ----------
     note_seq : str
         Note sequence
-    trans_matrix : np.ndarray
-        Transition matrix
+    trans_matrix : np.ndarray or sp.spmatrix
+        Transition matrix, or a stack of matrices of shape (n, k, k)
         
     Returns
     -------
-    float
-        Sequence consistency score
+    float or np.ndarray
+        Sequence consistency score (one value per matrix for a stack)
     """
-    typical_transition = []
-    for i, row in enumerate(trans_matrix):
-        max_ind = np.where(row == np.amax(row))
-        if ((max_ind[0].shape[0]) == 1) and (np.sum(row)):
-            typical_transition.append((note_seq[i], note_seq[max_ind[0][0]]))
-    
-    nb_typical_transition = len(typical_transition)
-    nb_total_transition = np.count_nonzero(trans_matrix)
+    if is_sparse(trans_matrix):
+        nb_total_transition = trans_matrix.count_nonzero()
+    else:
+        trans_matrix = np.asarray(trans_matrix)
+        if _is_matrix_stack(trans_matrix, len(note_seq)):
+            nb_total_transition = np.count_nonzero(trans_matrix, axis=(-2, -1))
+        else:
+            nb_total_transition = np.count_nonzero(trans_matrix)
+    nb_typical_transition = np.sum(get_typical_rows(trans_matrix), axis=-1)
     sequence_consistency = nb_typical_transition / nb_total_transition
     return sequence_consistency
 
 
+@profiled()
 def get_song_stereotypy(sequence_linearity: float, sequence_consistency: float) -> float:
     """
     Calculate song stereotypy.
@@ -183,4 +576,38 @@ def get_song_stereotypy(sequence_linearity: float, sequence_consistency: float)
         Song stereotypy score
     """
     song_stereotypy = (sequence_linearity + sequence_consistency) / 2
-    return song_stereotypy
\ No newline at end of file
+    return song_stereotypy
+
+
+@profiled(size_arg="trans_matrix")
+@cached
+def get_sequence_metrics(
+    note_seq: str, trans_matrix: Union[np.ndarray, "sp.spmatrix"]
+) -> Dict[str, Union[float, np.ndarray]]:
+    """
+    Calculate all sequence metrics from a transition matrix.
+
+    Parameters
+    ----------
+    note_seq : str
+        Note sequence
+    trans_matrix : np.ndarray or sp.spmatrix
+        Transition matrix, or a stack of matrices of shape (n, k, k)
+
+    Returns
+    -------
+    Dict[str, float or np.ndarray]
+        trans_entropy, sequence_linearity, sequence_consistency and
+        song_stereotypy (one value per matrix for a stack)
+    """
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sequence_linearity = get_sequence_linearity(note_seq, trans_matrix)
+        sequence_consistency = get_sequence_consistency(note_seq, trans_matrix)
+    return {
+        "trans_entropy": get_trans_entropy(trans_matrix),
+        "sequence_linearity": sequence_linearity,
+        "sequence_consistency": sequence_consistency,
+        "song_stereotypy": get_song_stereotypy(
+            sequence_linearity, sequence_consistency
+        ),
+    }
@@ -0,0 +1,304 @@
+"""
+Memory-mapped on-disk syllable corpus.
+
+A corpus is a directory holding flat columns that can be memory-mapped:
+
+- ``codes.npy``: one ``uint8`` code per syllable (see ``SyllableSequence``)
+- ``bout_offsets.npy``: CSR-style start of each bout, then the total length
+- ``bouts.npy``: per-bout metadata (bird, date, file, context)
+- ``meta.json``: note sequence and format version
+
+Bouts are stored sorted by bird, date and file, so selecting one bird on
+one day only touches a contiguous byte range of the code array.
+"""
+
+import json
+import pickle
+from datetime import datetime
+from pathlib import Path, PurePosixPath, PureWindowsPath
+from typing import Dict, Iterable, List, Optional, Union
+
+import numpy as np
+
+from .alphabet import Alphabet
+from .sequence import (
+    UNKNOWN_CODE,
+    SyllableSequence,
+    _encode_syllables,
+    _get_bout_bounds,
+)
+
+CORPUS_VERSION = 1
+METADATA_FIELDS = ("bird", "date", "file", "context")
+
+
+def write_corpus(
+    path: Union[str, Path],
+    records: Iterable[Dict[str, str]],
+    note_seq: str,
+) -> Path:
+    """
+    Write syllable records to an on-disk corpus.
+
+    Parameters
+    ----------
+    path : str or Path
+        Corpus directory (created if needed)
+    records : Iterable[Dict[str, str]]
+        One record per recording file, with a ``syllables`` string and the
+        bird, date, file and context metadata. Each record is split into
+        bouts at the stop syllable.
+    note_seq : str or Alphabet
+        Reference note sequence (stop syllable last)
+
+    Returns
+    -------
+    Path
+        Corpus directory
+
+    Raises
+    ------
+    ValueError
+        If ``note_seq`` has too many notes to be stored as bytes
+    """
+    if len(note_seq) >= UNKNOWN_CODE:
+        raise ValueError(f"note_seq must have fewer than {UNKNOWN_CODE} notes")
+    path = Path(path)
+    path.mkdir(parents=True, exist_ok=True)
+    records = sorted(
+        records,
+        key=lambda record: tuple(record.get(field, "") for field in METADATA_FIELDS),
+    )
+
+    codes_list = []
+    bout_lengths = []
+    metadata = {field: [] for field in METADATA_FIELDS}
+    for record in records:
+        codes = _encode_syllables(record["syllables"], note_seq)
+        codes[codes < 0] = UNKNOWN_CODE
+        bout_start, bout_stop = _get_bout_bounds(codes, len(note_seq))
+        codes_list.append(codes.astype(np.uint8))
+        bout_lengths.append(bout_stop - bout_start)
+        for field in METADATA_FIELDS:
+            metadata[field] += [str(record.get(field, ""))] * bout_start.size
+
+    codes = np.concatenate([np.empty(0, dtype=np.uint8)] + codes_list)
+    bout_lengths = np.concatenate([np.empty(0, dtype=np.int64)] + bout_lengths)
+    bout_offsets = np.concatenate(([0], np.cumsum(bout_lengths))).astype(np.int64)
+
+    dtype = [
+        (field, f"U{max([len(value) for value in values] + [1])}")
+        for field, values in metadata.items()
+    ]
+    bouts = np.empty(bout_lengths.size, dtype=dtype)
+    for field, values in metadata.items():
+        bouts[field] = values
+
+    np.save(path / "codes.npy", codes)
+    np.save(path / "bout_offsets.npy", bout_offsets)
+    np.save(path / "bouts.npy", bouts)
+    meta = {
+        "version": CORPUS_VERSION,
+        "note_seq": note_seq if isinstance(note_seq, str) else list(note_seq),
+    }
+    if isinstance(note_seq, Alphabet):
+        meta["alphabet"] = note_seq.to_dict()
+    with open(path / "meta.json", "w", encoding="utf-8") as fh:
+        json.dump(meta, fh)
+    return path
+
+
+class SyllableCorpus:
+    """
+    Read-only, memory-mapped syllable corpus.
+
+    Parameters
+    ----------
+    path : str or Path
+        Corpus directory written by ``write_corpus``
+    """
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        with open(self.path / "meta.json", encoding="utf-8") as fh:
+            meta = json.load(fh)
+        if meta["version"] != CORPUS_VERSION:
+            raise ValueError(f"Unsupported corpus version {meta['version']}")
+        note_seq = meta["note_seq"]
+        if "alphabet" in meta:
+            self.note_seq = Alphabet(**meta["alphabet"])
+        elif isinstance(note_seq, str):
+            self.note_seq = note_seq
+        else:
+            self.note_seq = tuple(note_seq)
+
+        self.codes = np.load(self.path / "codes.npy", mmap_mode="r")
+        self.bout_offsets = np.load(self.path / "bout_offsets.npy", mmap_mode="r")
+        self.bouts = np.load(self.path / "bouts.npy", mmap_mode="r")
+
+    def __repr__(self) -> str:
+        return (
+            f"SyllableCorpus(path={str(self.path)!r}, nb_bouts={self.nb_bouts}, "
+            f"nb_syllables={self.codes.size})"
+        )
+
+    @property
+    def nb_bouts(self) -> int:
+        """Number of bouts."""
+        return self.bout_offsets.size - 1
+
+    def select(self, **criteria: Union[str, List[str]]) -> np.ndarray:
+        """
+        Find the bouts matching metadata criteria.
+
+        Parameters
+        ----------
+        **criteria : str or List[str]
+            Value (or list of accepted values) per metadata field,
+            e.g. ``bird="g35r38", context="D"``
+
+        Returns
+        -------
+        np.ndarray
+            Indices of the matching bouts
+        """
+        is_selected = np.ones(self.nb_bouts, dtype=bool)
+        for field, value in criteria.items():
+            if field not in METADATA_FIELDS:
+                raise ValueError(f"Unknown metadata field {field!r}")
+            is_selected &= np.isin(self.bouts[field], np.atleast_1d(value))
+        return np.flatnonzero(is_selected)
+
+    def get_sequence(
+        self,
+        bout_ind: Optional[np.ndarray] = None,
+        **criteria: Union[str, List[str]],
+    ) -> SyllableSequence:
+        """
+        Get the selected bouts as a syllable sequence.
+
+        Only the byte ranges of the selected bouts are read. A contiguous
+        selection is returned as a view on the memory-mapped codes.
+
+        Parameters
+        ----------
+        bout_ind : np.ndarray, optional
+            Indices of the bouts, by default those matching ``criteria``
+        **criteria : str or List[str]
+            Metadata criteria (see ``select``)
+
+        Returns
+        -------
+        SyllableSequence
+            Sequence of the selected bouts
+        """
+        if bout_ind is None:
+            bout_ind = self.select(**criteria)
+        bout_ind = np.asarray(bout_ind, dtype=np.int64)
+        if not bout_ind.size:
+            return SyllableSequence(np.empty(0, dtype=np.uint8), self.note_seq)
+        bout_start = self.bout_offsets[bout_ind]
+        bout_stop = self.bout_offsets[bout_ind + 1]
+        bout_offsets = np.concatenate(([0], np.cumsum(bout_stop - bout_start)))
+
+        # Read each run of consecutive bouts as one slice
+        run_break = np.flatnonzero(np.diff(bout_ind) != 1) + 1
+        if not run_break.size:
+            codes = self.codes[bout_start[0] : bout_stop[-1]]
+        else:
+            run_first = np.concatenate(([0], run_break))
+            run_last = np.append(run_break, bout_ind.size) - 1
+            codes = np.concatenate(
+                [
+                    self.codes[bout_start[first] : bout_stop[last]]
+                    for first, last in zip(run_first, run_last)
+                ]
+            )
+        return SyllableSequence(codes, self.note_seq, bout_offsets)
+
+
+class _SongInfoUnpickler(pickle.Unpickler):
+    """Unpickler that reads paths saved on another operating system."""
+
+    def find_class(self, module, name):
+        if module == "pathlib" and name == "WindowsPath":
+            return PureWindowsPath
+        if module == "pathlib" and name == "PosixPath":
+            return PurePosixPath
+        return super().find_class(module, name)
+
+
+def load_song_info(path: Union[str, Path]) -> dict:
+    """
+    Load a pickled ``(SongInfo).npy`` file.
+
+    Parameters
+    ----------
+    path : str or Path
+        Path to the ``.npy`` file
+
+    Returns
+    -------
+    dict
+        Song info, with files, syllables and contexts per recording file
+    """
+    with open(path, "rb") as fh:
+        version = np.lib.format.read_magic(fh)
+        if version == (1, 0):
+            np.lib.format.read_array_header_1_0(fh)
+        else:
+            np.lib.format.read_array_header_2_0(fh)
+        song_info = _SongInfoUnpickler(fh).load()
+    return song_info.item() if isinstance(song_info, np.ndarray) else song_info
+
+
+def _parse_file_name(file_name: str) -> Dict[str, str]:
+    """Get the bird and date from a file name such as g35r38_190617_155056_Dir."""
+    parts = file_name.split("_")
+    bird = parts[0]
+    date = parts[1] if len(parts) > 1 else ""
+    try:
+        date = datetime.strptime(date, "%y%m%d").strftime("%Y-%m-%d")
+    except ValueError:
+        pass
+    return {"bird": bird, "date": date}
+
+
+def convert_song_info(
+    song_info_paths: Iterable[Union[str, Path]],
+    path: Union[str, Path],
+    note_seq: str,
+) -> Path:
+    """
+    Convert ``(SongInfo).npy`` files into an on-disk corpus.
+
+    Parameters
+    ----------
+    song_info_paths : Iterable[str or Path]
+        Paths to ``(SongInfo).npy`` files
+    path : str or Path
+        Corpus directory
+    note_seq : str or Alphabet
+        Reference note sequence (stop syllable last)
+
+    Returns
+    -------
+    Path
+        Corpus directory
+    """
+    records = []
+    for song_info_path in song_info_paths:
+        song_info = load_song_info(song_info_path)
+        for file, syllables, context in zip(
+            song_info["files"], song_info["syllables"], song_info["contexts"]
+        ):
+            file_name = PureWindowsPath(str(file)).name
+            records.append(
+                {
+                    **_parse_file_name(file_name.rsplit(".", 1)[0]),
+                    "file": file_name,
+                    "context": str(context),
+                    "syllables": syllables,
+                }
+            )
+    return write_corpus(path, records, note_seq)
@@ -0,0 +1,217 @@
+"""
+Pairwise divergence between transition networks.
+
+Each transition matrix is row-normalized into the next-syllable
+distribution of each syllable, and two matrices are compared row by row.
+The row divergences are averaged over the rows observed in both matrices,
+either uniformly or weighted by how often each syllable occurs.
+
+Pairs of matrices are processed in blocks, so memory is bounded by the
+block size rather than by the number of matrices.
+"""
+
+import numpy as np
+from typing import Optional, Sequence, Tuple, Union
+
+from ..utils.lazy import is_sparse
+from ..utils.profiling import profiled
+
+# Supported divergences
+METRICS = ("kl", "js", "l1")
+
+# Default number of values in the per-block intermediate arrays
+BLOCK_VALUES = 2**22
+
+
+def _get_row_probabilities(
+    trans_matrices: Union[np.ndarray, Sequence[np.ndarray]], smoothing: float
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Row-normalize a stack of transition matrices.
+
+    Returns the row probabilities (smoothed), whether each row has any
+    transition and the fraction of the transitions of each matrix that
+    start from each row.
+    """
+    if is_sparse(trans_matrices):
+        trans_matrices = trans_matrices.toarray()
+    elif not isinstance(trans_matrices, np.ndarray):
+        trans_matrices = np.stack(
+            [
+                matrix.toarray() if is_sparse(matrix) else np.asarray(matrix)
+                for matrix in trans_matrices
+            ]
+        )
+    trans_matrices = np.asarray(trans_matrices, dtype=np.float64)
+    if trans_matrices.ndim == 2:
+        trans_matrices = trans_matrices[None]
+    nb_notes = trans_matrices.shape[-1]
+
+    row_sum = trans_matrices.sum(axis=2)
+    has_row = row_sum > 0
+    prob = np.divide(
+        trans_matrices,
+        row_sum[..., None],
+        out=np.zeros(trans_matrices.shape),
+        where=has_row[..., None],
+    )
+    if smoothing:
+        # Additive smoothing: rows without transitions become uniform
+        row_total = has_row[..., None] + nb_notes * smoothing
+        prob = (prob + smoothing) / row_total
+
+    total = row_sum.sum(axis=1, keepdims=True)
+    occupancy = np.divide(
+        row_sum, total, out=np.zeros(row_sum.shape), where=total > 0
+    )
+    return prob, has_row, occupancy
+
+
+def _xlog2x(prob: np.ndarray) -> np.ndarray:
+    """Elementwise p * log2(p), with 0 * log2(0) = 0."""
+    return prob * np.log2(prob, out=np.zeros(prob.shape), where=prob > 0)
+
+
+def _get_row_divergence(
+    prob_a: np.ndarray, prob_b: np.ndarray, metric: str
+) -> np.ndarray:
+    """
+    Divergence between the rows of every pair of matrices of two blocks.
+
+    Parameters
+    ----------
+    prob_a, prob_b : np.ndarray
+        Row probabilities of shape (n_a, k, k) and (n_b, k, k)
+    metric : str
+        One of "kl", "js" and "l1"
+
+    Returns
+    -------
+    np.ndarray
+        Row divergences of shape (n_a, n_b, k)
+    """
+    if metric == "l1":
+        return np.abs(prob_a[:, None] - prob_b[None]).sum(axis=-1)
+
+    if metric == "js":
+        # JS = H(M) - (H(P) + H(Q)) / 2, with M the mean distribution
+        mean = (prob_a[:, None] + prob_b[None]) / 2
+        neg_entropy_a = _xlog2x(prob_a).sum(axis=-1)
+        neg_entropy_b = _xlog2x(prob_b).sum(axis=-1)
+        divergence = (neg_entropy_a[:, None] + neg_entropy_b[None]) / 2
+        divergence -= _xlog2x(mean).sum(axis=-1)
+        return np.maximum(divergence, 0)
+
+    # KL(P || Q) = sum P log P - sum P log Q: the cross term of every pair is
+    # a matrix product per row, and the divergence is infinite wherever P
+    # has mass on a zero of Q
+    log_b = np.log2(prob_b, out=np.zeros(prob_b.shape), where=prob_b > 0)
+    rows_a = prob_a.transpose(1, 0, 2)  # (k, n_a, k)
+    cross = rows_a @ log_b.transpose(1, 2, 0)  # (k, n_a, n_b)
+    nb_missing = (rows_a > 0).astype(np.float64) @ (prob_b == 0).transpose(1, 2, 0)
+    divergence = _xlog2x(prob_a).sum(axis=-1)[:, None] - cross.transpose(1, 2, 0)
+    divergence[nb_missing.transpose(1, 2, 0) > 0] = np.inf
+    return np.maximum(divergence, 0)
+
+
+@profiled(size_arg="trans_matrices")
+def get_pairwise_divergence(
+    trans_matrices: Union[np.ndarray, Sequence[np.ndarray]],
+    other: Optional[Union[np.ndarray, Sequence[np.ndarray]]] = None,
+    metric: str = "js",
+    smoothing: float = 0.0,
+    weighting: str = "occupancy",
+    block_size: Optional[int] = None,
+) -> np.ndarray:
+    """
+    Calculate the divergence between every pair of transition matrices.
+
+    Matrices may hold counts or be normalized (e.g. ``get_trans_matrix(...,
+    normalize=True)``); each row is normalized into a next-syllable
+    distribution. Rows are compared when they have transitions in both
+    matrices, or in either one when ``smoothing`` is positive (a row
+    without transitions is then uniform). The stop syllable row never has
+    transitions, so it is never compared.
+
+    Parameters
+    ----------
+    trans_matrices : np.ndarray or Sequence[np.ndarray]
+        Stack of N transition matrices of shape (N, k, k)
+    other : np.ndarray or Sequence[np.ndarray], optional
+        Stack of M matrices to compare against (e.g. a tutor's), by default
+        ``trans_matrices`` themselves
+    metric : str, optional
+        "kl" (Kullback-Leibler divergence of the first matrix from the
+        second, in bits), "js" (Jensen-Shannon divergence, in bits, between
+        0 and 1) or "l1" (L1 distance, between 0 and 2), by default "js"
+    smoothing : float, optional
+        Pseudo-probability added to every transition before renormalizing
+        each row, by default 0 (none). Without smoothing, the KL divergence
+        is infinite as soon as the first matrix has a transition the second
+        never makes.
+    weighting : str, optional
+        "occupancy" to weight each row by the mean fraction of the
+        transitions of both matrices that start from it, or "uniform",
+        by default "occupancy"
+    block_size : int, optional
+        Number of matrices of each side of a block, by default chosen so
+        that intermediate arrays hold about 4 million values
+
+    Returns
+    -------
+    np.ndarray
+        Divergence matrix of shape (N, M) (N x N without ``other``), NaN
+        for pairs without any row to compare
+    """
+    if metric not in METRICS:
+        raise ValueError(f"metric must be one of {METRICS}, not {metric!r}")
+    if weighting not in ("occupancy", "uniform"):
+        raise ValueError(
+            f"weighting must be 'occupancy' or 'uniform', not {weighting!r}"
+        )
+    if smoothing < 0:
+        raise ValueError("smoothing must be non-negative")
+
+    prob_a, has_row_a, occupancy_a = _get_row_probabilities(trans_matrices, smoothing)
+    is_symmetric = other is None and metric != "kl"
+    if other is None:
+        prob_b, has_row_b, occupancy_b = prob_a, has_row_a, occupancy_a
+    else:
+        prob_b, has_row_b, occupancy_b = _get_row_probabilities(other, smoothing)
+    if prob_a.shape[1:] != prob_b.shape[1:]:
+        raise ValueError("All matrices must have the same shape")
+
+    nb_a, nb_b, nb_notes = prob_a.shape[0], prob_b.shape[0], prob_a.shape[1]
+    if block_size is None:
+        block_size = max(int(np.sqrt(BLOCK_VALUES / nb_notes**2)), 1)
+
+    divergence = np.full((nb_a, nb_b), np.nan)
+    for start_a in range(0, nb_a, block_size):
+        block_a = slice(start_a, start_a + block_size)
+        first_b = start_a if is_symmetric else 0
+        for start_b in range(first_b, nb_b, block_size):
+            block_b = slice(start_b, start_b + block_size)
+            row_divergence = _get_row_divergence(
+                prob_a[block_a], prob_b[block_b], metric
+            )
+
+            if smoothing:
+                is_compared = has_row_a[block_a, None] | has_row_b[None, block_b]
+            else:
+                is_compared = has_row_a[block_a, None] & has_row_b[None, block_b]
+            if weighting == "occupancy":
+                weights = (occupancy_a[block_a, None] + occupancy_b[None, block_b]) / 2
+                weights = weights * is_compared
+            else:
+                weights = is_compared.astype(np.float64)
+            weight_sum = weights.sum(axis=-1)
+
+            # Rows that are not compared do not count, even if infinite
+            row_divergence = np.where(weights > 0, row_divergence, 0)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                block = (weights * row_divergence).sum(axis=-1) / weight_sum
+            block[weight_sum == 0] = np.nan
+            divergence[block_a, block_b] = block
+            if is_symmetric:
+                divergence[block_b, block_a] = block.T
+    return divergence
@@ -0,0 +1,189 @@
+"""
+Group-by aggregation of sequence metrics (e.g. bird x date x context).
+
+All bouts are encoded once and the transitions of every group are counted
+in a single keyed bincount over (group, start, end), so the metrics of
+thousands of groups come out of one vectorized call.
+"""
+
+import numpy as np
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Dict,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from ..utils.profiling import profiled
+from .alphabet import Alphabet
+from .core import _count_grouped_transitions, get_sequence_metrics
+from .corpus import SyllableCorpus, _parse_file_name
+from .sequence import _encode_syllables
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Default grouping columns
+GROUP_KEYS = ("bird", "date", "context")
+
+# Context encoded at the end of a file name such as g35r38_190617_155056_Dir
+FILE_CONTEXTS = {"dir": "D", "undir": "U"}
+
+
+def _get_file_keys(file_names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Get the bird, date and context encoded in each file name."""
+    keys = {field: [] for field in GROUP_KEYS}
+    for file_name in file_names:
+        stem = str(file_name).rsplit(".", 1)[0]
+        parsed = _parse_file_name(stem)
+        parsed["context"] = FILE_CONTEXTS.get(stem.rsplit("_", 1)[-1].lower(), "")
+        for field in GROUP_KEYS:
+            keys[field].append(parsed[field])
+    return {field: np.array(values) for field, values in keys.items()}
+
+
+def _get_bout_table(
+    bouts: Union[SyllableCorpus, "pd.DataFrame", Mapping[str, Sequence[Any]]],
+    by: Sequence[str],
+    note_seq: Optional[Union[str, Alphabet]],
+) -> Tuple[np.ndarray, np.ndarray, Dict[str, np.ndarray], Union[str, Alphabet]]:
+    """Get the codes, lengths and key columns of a bout table."""
+    if isinstance(bouts, SyllableCorpus):
+        codes = np.asarray(bouts.codes).astype(np.int64)
+        codes[codes >= len(bouts.note_seq)] = -1
+        lengths = np.diff(bouts.bout_offsets)
+        keys = {field: np.asarray(bouts.bouts[field]) for field in by}
+        return codes, lengths, keys, bouts.note_seq
+
+    if note_seq is None:
+        raise ValueError("note_seq is required for a bout table")
+    syllables = list(bouts["syllables"])
+    columns = getattr(bouts, "columns", bouts.keys())
+    keys = {field: np.asarray(bouts[field]) for field in by if field in columns}
+    missing = [field for field in by if field not in keys]
+    if missing:
+        if "file" not in columns or any(field not in GROUP_KEYS for field in missing):
+            raise ValueError(f"Missing key columns {missing}")
+        file_keys = _get_file_keys(list(bouts["file"]))
+        keys.update({field: file_keys[field] for field in missing})
+
+    is_single_char = isinstance(note_seq, str) or note_seq.is_single_char
+    if is_single_char and all(isinstance(bout, str) for bout in syllables):
+        codes = _encode_syllables("".join(syllables), note_seq)
+        lengths = np.fromiter(map(len, syllables), dtype=np.int64, count=len(syllables))
+    else:
+        codes_list = [_encode_syllables(bout, note_seq) for bout in syllables]
+        codes = np.concatenate([np.empty(0, dtype=np.int64)] + codes_list)
+        lengths = np.array([bout_codes.size for bout_codes in codes_list], np.int64)
+    return codes, lengths, keys, note_seq
+
+
+@profiled()
+def get_grouped_trans_matrices(
+    bouts: Union[SyllableCorpus, "pd.DataFrame", Mapping[str, Sequence[Any]]],
+    by: Sequence[str] = GROUP_KEYS,
+    note_seq: Optional[Union[str, Alphabet]] = None,
+) -> Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build the transition matrix of each group of bouts.
+
+    Parameters
+    ----------
+    bouts : SyllableCorpus, pd.DataFrame or Mapping[str, Sequence]
+        A corpus, or a bout table with a ``syllables`` column and the key
+        columns. Bird, date and context columns that are missing are
+        parsed from a ``file`` column (e.g. ``g35r38_190617_155056_Dir.wav``).
+        Transitions never cross from one row into the next.
+    by : Sequence[str], optional
+        Key columns, by default bird, date and context
+    note_seq : str or Alphabet, optional
+        Reference note sequence, by default that of the corpus
+
+    Returns
+    -------
+    Tuple[Dict[str, np.ndarray], np.ndarray, np.ndarray, np.ndarray]
+        Key values of each group (sorted), the number of bouts and
+        syllables of each group and the transition tensor of shape
+        (n_groups, k, k)
+    """
+    by = list(by)
+    codes, lengths, keys, note_seq = _get_bout_table(bouts, by, note_seq)
+    keys = {
+        field: values.astype(str) if values.dtype == object else values
+        for field, values in keys.items()
+    }
+
+    # Group index of each bout: each key column is factorized on its own,
+    # then the rows of column codes are keyed as mixed-radix integers
+    values, bout_key = [], np.zeros(lengths.size, dtype=np.int64)
+    for field in by:
+        field_values, field_codes = np.unique(keys[field], return_inverse=True)
+        values.append(field_values)
+        bout_key = bout_key * field_values.size + field_codes.ravel()
+    group_key, bout_group = np.unique(bout_key, return_inverse=True)
+    bout_group = bout_group.ravel()
+    nb_groups = group_key.size
+
+    trans_matrices = _count_grouped_transitions(
+        codes, lengths, len(note_seq), bout_group, nb_groups
+    )
+    nb_bouts = np.bincount(bout_group, minlength=nb_groups)
+    nb_syllables = np.bincount(bout_group, weights=lengths, minlength=nb_groups)
+    group_keys = {}
+    for field, field_values in reversed(list(zip(by, values))):
+        group_key, field_codes = np.divmod(group_key, field_values.size)
+        group_keys[field] = field_values[field_codes]
+    group_keys = {field: group_keys[field] for field in by}
+    return group_keys, nb_bouts, nb_syllables.astype(np.int64), trans_matrices
+
+
+def get_grouped_metrics(
+    bouts: Union[SyllableCorpus, "pd.DataFrame", Mapping[str, Sequence[Any]]],
+    by: Sequence[str] = GROUP_KEYS,
+    note_seq: Optional[Union[str, Alphabet]] = None,
+    min_bouts: int = 1,
+) -> "pd.DataFrame":
+    """
+    Calculate the sequence metrics of each group of bouts.
+
+    Parameters
+    ----------
+    bouts : SyllableCorpus, pd.DataFrame or Mapping[str, Sequence]
+        A corpus, or a bout table (see ``get_grouped_trans_matrices``)
+    by : Sequence[str], optional
+        Key columns, by default bird, date and context
+    note_seq : str or Alphabet, optional
+        Reference note sequence, by default that of the corpus
+    min_bouts : int, optional
+        Groups with fewer bouts are left out, by default 1
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per group: the key columns, nb_bouts, nb_syllables,
+        nb_transitions, trans_entropy, sequence_linearity,
+        sequence_consistency and song_stereotypy
+    """
+    import pandas as pd
+
+    if note_seq is None and isinstance(bouts, SyllableCorpus):
+        note_seq = bouts.note_seq
+    group_keys, nb_bouts, nb_syllables, trans_matrices = get_grouped_trans_matrices(
+        bouts, by, note_seq
+    )
+    is_kept = nb_bouts >= min_bouts
+    trans_matrices = trans_matrices[is_kept]
+    metrics = get_sequence_metrics(note_seq, trans_matrices)
+    return pd.DataFrame(
+        {
+            **{field: values[is_kept] for field, values in group_keys.items()},
+            "nb_bouts": nb_bouts[is_kept],
+            "nb_syllables": nb_syllables[is_kept],
+            "nb_transitions": trans_matrices.sum(axis=(1, 2)),
+            **metrics,
+        }
+    )
@@ -0,0 +1,227 @@
+"""
+Higher-order (Markov order-n) transition counting.
+
+A transition of order ``n`` goes from the context of the ``n`` previous
+syllables to the next syllable. Contexts are encoded as mixed-radix integers
+(one digit per syllable, in base ``len(note_seq)``), built by rolling the
+order ``n - 1`` keys forward, so all orders are counted from a single
+encoding of the syllables. Counts are kept in a sparse table with one row
+per observed context.
+"""
+
+import numpy as np
+from typing import TYPE_CHECKING, Dict, NamedTuple, Optional, Sequence, Union
+
+from .cache import cached
+from .core import get_row_entropy
+from .sequence import SyllableSequence, _encode_syllables
+
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+
+
+class MarkovCounts(NamedTuple):
+    """
+    Transition counts of one Markov order.
+
+    Attributes
+    ----------
+    order : int
+        Number of syllables in each context
+    contexts : np.ndarray
+        Note indices of each observed context, shape (n_contexts, order),
+        oldest syllable first
+    counts : sp.csr_matrix
+        Transition counts, shape (n_contexts, nb_notes)
+    """
+
+    order: int
+    contexts: np.ndarray
+    counts: "sp.csr_matrix"
+
+
+def _count_contexts(
+    context_keys: np.ndarray, targets: np.ndarray, order: int, nb_notes: int
+) -> MarkovCounts:
+    """
+    Build the sparse count table of encoded (context, target) pairs.
+
+    Parameters
+    ----------
+    context_keys : np.ndarray
+        Mixed-radix key of the context of each transition
+    targets : np.ndarray
+        Note index of the target of each transition
+    order : int
+        Markov order
+    nb_notes : int
+        Number of notes in the note sequence
+
+    Returns
+    -------
+    MarkovCounts
+        Count table
+    """
+    import scipy.sparse as sp
+
+    keys = context_keys * nb_notes + targets
+    nb_keys = nb_notes ** (order + 1)
+    if nb_keys <= max(keys.size, 2**20):
+        # Small key space: a dense bincount is cheaper than sorting
+        counts = np.bincount(keys, minlength=nb_keys)
+        keys = np.flatnonzero(counts)
+        counts = counts[keys]
+    else:
+        keys, counts = np.unique(keys, return_counts=True)
+    context_keys, targets = np.divmod(keys, nb_notes)
+
+    # Keys are sorted, so each context is a run of consecutive keys
+    is_new = np.empty(keys.size, dtype=bool)
+    is_new[:1] = True
+    np.not_equal(context_keys[1:], context_keys[:-1], out=is_new[1:])
+    row_start = np.flatnonzero(is_new)
+    indptr = np.append(row_start, keys.size)
+    count_table = sp.csr_matrix(
+        (counts.astype(np.int64), targets, indptr),
+        shape=(row_start.size, nb_notes),
+    )
+
+    place_values = nb_notes ** np.arange(order - 1, -1, -1, dtype=np.int64)
+    contexts = context_keys[row_start, None] // place_values % nb_notes
+    return MarkovCounts(order, contexts, count_table)
+
+
+@cached
+def get_markov_counts(
+    syllables: Union[str, SyllableSequence],
+    note_seq: Optional[str] = None,
+    orders: Sequence[int] = (1, 2, 3, 4, 5),
+) -> Dict[int, MarkovCounts]:
+    """
+    Count transitions conditioned on the previous syllables.
+
+    The rules of ``get_trans_matrix`` carry over to every order: contexts
+    never contain the stop syllable (last note), so transitions do not
+    cross bouts, and transitions involving syllables not in ``note_seq``
+    are skipped. Order 1 gives the first-order transition counts and order 0
+    the count of each syllable.
+
+    Parameters
+    ----------
+    syllables : str or SyllableSequence
+        String of syllables to analyze, or an encoded sequence
+    note_seq : str, optional
+        Reference note sequence, by default the note sequence of an
+        encoded ``syllables``
+    orders : Sequence[int], optional
+        Markov orders to count, by default 1 to 5
+
+    Returns
+    -------
+    Dict[int, MarkovCounts]
+        Count table of each order
+    """
+    if note_seq is None:
+        if not isinstance(syllables, SyllableSequence):
+            raise ValueError("note_seq is required for a syllable string")
+        note_seq = syllables.note_seq
+    orders = sorted(set(orders))
+    nb_notes = len(note_seq)
+    if orders and orders[0] < 0:
+        raise ValueError("orders must be non-negative")
+    if orders and nb_notes ** (orders[-1] + 1) >= 2**63:
+        raise ValueError(
+            f"order {orders[-1]} is too high for {nb_notes} notes "
+            "(context keys would overflow int64)"
+        )
+
+    codes = _encode_syllables(syllables, note_seq)
+    is_known = codes >= 0
+    in_context = is_known & (codes != nb_notes - 1)
+    digits = np.where(is_known, codes, 0)
+
+    # Key and validity of the context starting at each syllable, rolled
+    # forward one syllable per order
+    context_keys = np.zeros(codes.size + 1, dtype=np.int64)
+    is_valid = np.ones(codes.size + 1, dtype=bool)
+    markov_counts = {}
+    for order in range(orders[-1] + 1 if orders else 0):
+        if order:
+            context_keys = context_keys[:-1] * nb_notes + digits[order - 1 :]
+            is_valid = is_valid[:-1] & in_context[order - 1 :]
+        if order not in orders:
+            continue
+        # Contexts followed by a target syllable
+        has_target = is_valid[:-1] & is_known[order:]
+        markov_counts[order] = _count_contexts(
+            context_keys[:-1][has_target],
+            codes[order:][has_target],
+            order,
+            nb_notes,
+        )
+    return markov_counts
+
+
+def get_conditional_entropy(markov_counts: MarkovCounts) -> float:
+    """
+    Calculate the entropy of the next syllable given its context.
+
+    The entropy of each context is weighted by how often the context
+    occurs, i.e. H(X | context) in bits.
+
+    Parameters
+    ----------
+    markov_counts : MarkovCounts
+        Count table of one order (see ``get_markov_counts``)
+
+    Returns
+    -------
+    float
+        Conditional entropy, NaN if there are no transitions
+    """
+    counts = markov_counts.counts
+    context_total = np.asarray(counts.sum(axis=1)).ravel()
+    if not context_total.sum():
+        return np.nan
+    row_entropy = get_row_entropy(counts)
+    return float(np.dot(context_total, row_entropy) / context_total.sum())
+
+
+def get_entropy_by_order(
+    syllables: Union[str, SyllableSequence],
+    note_seq: Optional[str] = None,
+    max_order: int = 5,
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate the conditional entropy curve over Markov orders.
+
+    Parameters
+    ----------
+    syllables : str or SyllableSequence
+        String of syllables to analyze, or an encoded sequence
+    note_seq : str, optional
+        Reference note sequence, by default the note sequence of an
+        encoded ``syllables``
+    max_order : int, optional
+        Highest Markov order, by default 5
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        order (0 to ``max_order``), conditional_entropy and
+        entropy_reduction (drop in entropy from the previous order,
+        NaN for order 0)
+    """
+    orders = tuple(range(max_order + 1))
+    markov_counts = get_markov_counts(syllables, note_seq, orders=orders)
+    conditional_entropy = np.array(
+        [get_conditional_entropy(markov_counts[order]) for order in orders]
+    )
+    entropy_reduction = np.concatenate(
+        ([np.nan], conditional_entropy[:-1] - conditional_entropy[1:])
+    )
+    return {
+        "order": np.array(orders),
+        "conditional_entropy": conditional_entropy,
+        "entropy_reduction": entropy_reduction,
+    }
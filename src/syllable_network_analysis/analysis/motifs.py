@@ -0,0 +1,256 @@
+"""
+Motif occurrence index over encoded syllable sequences.
+
+The index is a suffix array over the ``uint8`` syllable codes: the start of
+every suffix, sorted by the suffix. All occurrences of a pattern are then a
+contiguous range of the array, found by binary search in
+O(len(pattern) * log(n)) instead of a scan of the whole sequence.
+
+Suffixes are sorted by prefix doubling, on their first ``max_length``
+syllables only; longer patterns are matched on that prefix, then checked
+on the few candidate positions.
+"""
+
+import numpy as np
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+from .alphabet import Alphabet
+from .sequence import UNKNOWN_CODE, SyllableSequence, _encode_syllables
+
+
+def _build_suffix_array(codes: np.ndarray, max_length: int) -> np.ndarray:
+    """
+    Sort the suffixes of a code array on their first ``max_length`` codes.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        ``uint8`` syllable codes
+    max_length : int
+        Number of leading codes the suffixes are sorted on
+
+    Returns
+    -------
+    np.ndarray
+        Start of each suffix, in suffix order (shorter suffixes first on ties)
+    """
+    nb_codes = codes.size
+    index_dtype = np.int32 if nb_codes < 2**31 else np.int64
+    if not nb_codes:
+        return np.empty(0, dtype=index_dtype)
+
+    # Rank of each suffix by its first `length` codes, doubled at each step
+    rank = codes.astype(np.int64)
+    suffix_array = np.argsort(rank, kind="stable")
+    length = 1
+    while length < max_length:
+        next_rank = np.full(nb_codes, -1, dtype=np.int64)
+        next_rank[:-length] = rank[length:]
+        sort_key = rank * (int(rank.max()) + 2) + next_rank + 1
+        suffix_array = np.argsort(sort_key, kind="stable")
+        sorted_key = sort_key[suffix_array]
+        is_new = np.empty(nb_codes, dtype=bool)
+        is_new[0] = False
+        np.not_equal(sorted_key[1:], sorted_key[:-1], out=is_new[1:])
+        rank = np.empty(nb_codes, dtype=np.int64)
+        rank[suffix_array] = np.cumsum(is_new)
+        length *= 2
+        if is_new[1:].all():  # every suffix is distinct
+            break
+    return suffix_array.astype(index_dtype)
+
+
+class MotifIndex:
+    """
+    Occurrence index of syllable patterns.
+
+    Parameters
+    ----------
+    syllables : str or SyllableSequence
+        String of syllables, or an encoded sequence (e.g. a corpus
+        selection from ``SyllableCorpus.get_sequence``)
+    note_seq : str or Alphabet, optional
+        Reference note sequence, by default the note sequence of an
+        encoded ``syllables``
+    max_length : int, optional
+        Suffixes are sorted on this many leading syllables, by default 64.
+        Longer patterns are supported, but checked position by position.
+    """
+
+    def __init__(
+        self,
+        syllables: Union[str, SyllableSequence],
+        note_seq: Optional[Union[str, Alphabet]] = None,
+        max_length: int = 64,
+    ):
+        if not isinstance(syllables, SyllableSequence):
+            if note_seq is None:
+                raise ValueError("note_seq is required for a syllable string")
+            syllables = SyllableSequence.from_string(syllables, note_seq)
+        elif note_seq is not None and note_seq != syllables.note_seq:
+            raise ValueError("note_seq differs from the note sequence of syllables")
+        if max_length < 1:
+            raise ValueError("max_length must be positive")
+
+        self.note_seq = syllables.note_seq
+        self.codes = np.ascontiguousarray(syllables.codes, dtype=np.uint8)
+        self.bout_offsets = np.asarray(syllables.bout_offsets, dtype=np.int64)
+        self.max_length = max_length
+        self.suffix_array = _build_suffix_array(self.codes, max_length)
+        self._bytes = self.codes.tobytes()
+
+    def __repr__(self) -> str:
+        return (
+            f"MotifIndex(nb_syllables={self.codes.size}, "
+            f"nb_bouts={self.nb_bouts}, max_length={self.max_length})"
+        )
+
+    @property
+    def nb_bouts(self) -> int:
+        """Number of bouts."""
+        return self.bout_offsets.size - 1
+
+    def _encode(self, pattern: Union[str, Sequence[int]]) -> Optional[bytes]:
+        """Encode a pattern, None if it has syllables not in the note sequence."""
+        if isinstance(pattern, str):
+            codes = _encode_syllables(pattern, self.note_seq)
+        else:
+            codes = np.asarray(pattern, dtype=np.int64)
+        if not codes.size:
+            raise ValueError("pattern must not be empty")
+        if np.any((codes < 0) | (codes >= UNKNOWN_CODE)):
+            return None
+        return codes.astype(np.uint8).tobytes()
+
+    def _get_range(self, key: bytes) -> Tuple[int, int]:
+        """Range of the suffix array whose suffixes start with ``key``."""
+        suffix_array, data, size = self.suffix_array, self._bytes, len(key)
+        low, high = 0, suffix_array.size
+        while low < high:  # first suffix >= key
+            mid = (low + high) // 2
+            start = suffix_array[mid]
+            if data[start : start + size] < key:
+                low = mid + 1
+            else:
+                high = mid
+        first, high = low, suffix_array.size
+        while low < high:  # first suffix not starting with key
+            mid = (low + high) // 2
+            start = suffix_array[mid]
+            if data[start : start + size] <= key:
+                low = mid + 1
+            else:
+                high = mid
+        return first, low
+
+    def find(self, pattern: Union[str, Sequence[int]]) -> np.ndarray:
+        """
+        Find the occurrences of a pattern.
+
+        Occurrences may overlap (e.g. "ii" occurs twice in "iii") and may
+        span several bouts if the pattern contains the stop syllable.
+
+        Parameters
+        ----------
+        pattern : str or Sequence[int]
+            Syllable pattern (e.g. "abcd"), or its note indices
+
+        Returns
+        -------
+        np.ndarray
+            Sorted start position of each occurrence
+        """
+        key = self._encode(pattern)
+        if key is None:
+            return np.empty(0, dtype=np.int64)
+        first, last = self._get_range(key[: self.max_length])
+        positions = np.sort(self.suffix_array[first:last]).astype(np.int64)
+        if len(key) > self.max_length:
+            data = self._bytes
+            is_match = [data[pos : pos + len(key)] == key for pos in positions]
+            positions = positions[np.array(is_match, dtype=bool)]
+        return positions
+
+    def count(self, pattern: Union[str, Sequence[int]]) -> int:
+        """
+        Count the occurrences of a pattern.
+
+        Parameters
+        ----------
+        pattern : str or Sequence[int]
+            Syllable pattern, or its note indices
+
+        Returns
+        -------
+        int
+            Number of (possibly overlapping) occurrences
+        """
+        key = self._encode(pattern)
+        if key is None:
+            return 0
+        if len(key) > self.max_length:
+            return int(self.find(pattern).size)
+        first, last = self._get_range(key)
+        return last - first
+
+    def get_bout_counts(self, pattern: Union[str, Sequence[int]]) -> np.ndarray:
+        """
+        Count the occurrences of a pattern within each bout.
+
+        Occurrences crossing the end of a bout are not counted.
+
+        Parameters
+        ----------
+        pattern : str or Sequence[int]
+            Syllable pattern, or its note indices
+
+        Returns
+        -------
+        np.ndarray
+            Number of occurrences in each bout
+        """
+        positions = self.find(pattern)
+        bout = np.searchsorted(self.bout_offsets, positions, side="right") - 1
+        size = len(self._encode(pattern) or b"")
+        is_within = positions + size <= self.bout_offsets[bout + 1]
+        return np.bincount(bout[is_within], minlength=self.nb_bouts)
+
+    def get_motif_stats(
+        self, motif: Union[str, Sequence[int]]
+    ) -> Dict[str, np.ndarray]:
+        """
+        Calculate motif statistics of each bout.
+
+        Parameters
+        ----------
+        motif : str or Sequence[int]
+            Motif (e.g. "abcd"), or its note indices
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            Per bout: nb_motifs (complete motifs), max_prefix (longest
+            motif prefix sung, e.g. 3 for "abc" of "abcd") and completeness
+            (max_prefix over the motif length)
+        """
+        if isinstance(motif, str):
+            motif_codes = _encode_syllables(motif, self.note_seq)
+        else:
+            motif_codes = np.asarray(motif, dtype=np.int64)
+
+        # A bout holding a prefix holds all shorter prefixes, so the longest
+        # prefix is the number of prefixes found in the bout
+        max_prefix = np.zeros(self.nb_bouts, dtype=np.int64)
+        nb_motifs = np.zeros(self.nb_bouts, dtype=np.int64)
+        for length in range(1, motif_codes.size + 1):
+            bout_counts = self.get_bout_counts(motif_codes[:length])
+            if not bout_counts.any():
+                break
+            max_prefix += bout_counts > 0
+            if length == motif_codes.size:
+                nb_motifs = bout_counts
+        return {
+            "nb_motifs": nb_motifs,
+            "max_prefix": max_prefix,
+            "completeness": max_prefix / max(motif_codes.size, 1),
+        }
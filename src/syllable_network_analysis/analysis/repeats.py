@@ -0,0 +1,171 @@
+"""
+Run-length view of syllable sequences and repeat statistics.
+
+Repeated syllables (such as long intro note runs) are collapsed into runs
+of one code and a run length. Intro-heavy sequences shrink a lot in this
+form, and repeat statistics come straight from the run lengths.
+"""
+
+import numpy as np
+from typing import Dict, NamedTuple, Optional, Union
+
+from .core import _count_transitions
+from .sequence import SyllableSequence, _encode_syllables
+
+
+class SyllableRuns(NamedTuple):
+    """
+    Run-length encoded syllables.
+
+    Attributes
+    ----------
+    codes : np.ndarray
+        Note index of each run, -1 for syllables not in the note sequence
+    lengths : np.ndarray
+        Number of syllables in each run
+    """
+
+    codes: np.ndarray
+    lengths: np.ndarray
+
+
+def get_syllable_runs(
+    syllables: Union[str, SyllableSequence, SyllableRuns],
+    note_seq: Optional[str] = None,
+) -> SyllableRuns:
+    """
+    Run-length encode a syllable sequence.
+
+    Parameters
+    ----------
+    syllables : str, SyllableSequence or SyllableRuns
+        String of syllables, or an encoded sequence. Runs are returned as is.
+    note_seq : str, optional
+        Reference note sequence, by default the note sequence of an
+        encoded ``syllables``
+
+    Returns
+    -------
+    SyllableRuns
+        Code and length of each run of identical syllables
+    """
+    if isinstance(syllables, SyllableRuns):
+        return syllables
+    if note_seq is None:
+        if not isinstance(syllables, SyllableSequence):
+            raise ValueError("note_seq is required for a syllable string")
+        note_seq = syllables.note_seq
+    codes = _encode_syllables(syllables, note_seq)
+    if not codes.size:
+        return SyllableRuns(codes, np.empty(0, dtype=np.int64))
+    run_start = np.flatnonzero(np.concatenate(([True], codes[1:] != codes[:-1])))
+    lengths = np.diff(np.append(run_start, codes.size))
+    return SyllableRuns(codes[run_start], lengths)
+
+
+def get_repeat_counts(
+    syllables: Union[str, SyllableSequence, SyllableRuns],
+    note_seq: str,
+) -> np.ndarray:
+    """
+    Count the runs of each syllable by run length.
+
+    Parameters
+    ----------
+    syllables : str, SyllableSequence or SyllableRuns
+        String of syllables, an encoded sequence or its runs
+    note_seq : str
+        Reference note sequence
+
+    Returns
+    -------
+    np.ndarray
+        Repeat count distribution of shape (nb_notes, max_length + 1):
+        entry (i, n) is the number of runs of note i with n syllables
+    """
+    runs = get_syllable_runs(syllables, note_seq)
+    is_known = runs.codes >= 0
+    codes, lengths = runs.codes[is_known], runs.lengths[is_known]
+    max_length = int(lengths.max()) if lengths.size else 0
+    counts = np.bincount(
+        codes * (max_length + 1) + lengths,
+        minlength=len(note_seq) * (max_length + 1),
+    )
+    return counts.astype(np.int64, copy=False).reshape(len(note_seq), max_length + 1)
+
+
+def get_repeat_stats(
+    syllables: Union[str, SyllableSequence, SyllableRuns],
+    note_seq: str,
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate repeat statistics of each syllable.
+
+    Parameters
+    ----------
+    syllables : str, SyllableSequence or SyllableRuns
+        String of syllables, an encoded sequence or its runs
+    note_seq : str
+        Reference note sequence
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Per note: nb_runs, mean_repeat (mean run length, NaN if the note
+        never occurs), max_repeat and repeat_fraction (fraction of runs
+        with more than one syllable)
+    """
+    repeat_counts = get_repeat_counts(syllables, note_seq)
+    run_length = np.arange(repeat_counts.shape[1])
+    nb_runs = repeat_counts.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean_repeat = (repeat_counts @ run_length) / nb_runs
+        repeat_fraction = repeat_counts[:, 2:].sum(axis=1) / nb_runs
+    max_repeat = np.max(np.where(repeat_counts > 0, run_length, 0), axis=1)
+    return {
+        "nb_runs": nb_runs,
+        "mean_repeat": mean_repeat,
+        "max_repeat": max_repeat,
+        "repeat_fraction": repeat_fraction,
+    }
+
+
+def get_repeat_trans_matrix(
+    syllables: Union[str, SyllableSequence, SyllableRuns],
+    note_seq: str,
+    normalize: bool = False,
+) -> np.ndarray:
+    """
+    Build a repeat-aware transition matrix.
+
+    Off-diagonal entries count transitions between different syllables, as
+    in ``get_trans_matrix``. A run of repeated syllables counts as a single
+    repeat on the diagonal instead of one self-transition per step. The
+    stop syllable is never counted as a repeat.
+
+    Parameters
+    ----------
+    syllables : str, SyllableSequence or SyllableRuns
+        String of syllables, an encoded sequence or its runs
+    note_seq : str
+        Reference note sequence
+    normalize : bool, optional
+        Whether to normalize the matrix, by default False
+
+    Returns
+    -------
+    np.ndarray
+        Transition matrix (int64 counts, or float64 if normalized)
+    """
+    runs = get_syllable_runs(syllables, note_seq)
+    nb_notes = len(note_seq)
+    trans_matrix = _count_transitions(runs.codes, nb_notes)
+
+    is_repeat = (runs.lengths > 1) & (runs.codes >= 0) & (runs.codes < nb_notes - 1)
+    trans_matrix[np.diag_indices(nb_notes)] = np.bincount(
+        runs.codes[is_repeat], minlength=nb_notes
+    )
+
+    if normalize:
+        trans_matrix = trans_matrix / trans_matrix.sum()
+    return trans_matrix
@@ -0,0 +1,260 @@
+"""
+Bootstrap and permutation significance testing for sequence metrics.
+"""
+
+import numpy as np
+from typing import Dict, List, Tuple, Union
+
+from .cache import cached
+from .core import _count_grouped_transitions, get_sequence_metrics
+from .sequence import SyllableSequence, _encode_syllables, _get_bout_bounds
+
+# Per-worker state, set once by ``_init_worker``
+_worker_state = {}
+
+# Number of values in the per-chunk (replicates x syllables) arrays of a shuffle
+SHUFFLE_VALUES = 2**22
+
+
+@cached
+def get_bout_trans_matrices(
+    syllables: Union[str, SyllableSequence], note_seq: str
+) -> np.ndarray:
+    """
+    Build one transition matrix per bout.
+
+    A bout ends with the stop syllable (last note). Since no transitions are
+    counted out of the stop syllable, the bout matrices sum up to the
+    transition matrix of the whole string.
+
+    Parameters
+    ----------
+    syllables : str or SyllableSequence
+        String of syllables to analyze, or an encoded sequence whose bout
+        offsets are used
+    note_seq : str
+        Reference note sequence
+
+    Returns
+    -------
+    np.ndarray
+        Transition tensor of shape (n_bouts, k, k)
+    """
+    codes = _encode_syllables(syllables, note_seq)
+    if isinstance(syllables, SyllableSequence):
+        bout_lengths = np.diff(syllables.bout_offsets)
+    else:
+        bout_start, bout_stop = _get_bout_bounds(codes, len(note_seq))
+        bout_lengths = bout_stop - bout_start
+    return _count_grouped_transitions(codes, bout_lengths, len(note_seq))
+
+
+def _init_worker(state: dict) -> None:
+    """Store the data shared by every replicate of a worker."""
+    _worker_state.clear()
+    _worker_state.update(state)
+
+
+def _bootstrap_batch(
+    nb_replicates: int, seed: np.random.SeedSequence
+) -> Dict[str, np.ndarray]:
+    """Metrics of bout-level bootstrap replicates."""
+    bout_matrices = _worker_state["bout_matrices"]
+    nb_bouts, nb_notes, _ = bout_matrices.shape
+
+    # Each replicate is a weighted sum of the bout matrices, the weights being
+    # the number of times each bout is drawn
+    rng = np.random.default_rng(seed)
+    weights = rng.multinomial(
+        nb_bouts, np.full(nb_bouts, 1 / nb_bouts), size=nb_replicates
+    )
+    trans_matrices = weights.astype(float) @ bout_matrices.reshape(nb_bouts, -1)
+    trans_matrices = trans_matrices.reshape(nb_replicates, nb_notes, nb_notes)
+    return get_sequence_metrics(_worker_state["note_seq"], trans_matrices)
+
+
+def _shuffle_batch(
+    nb_replicates: int, seed: np.random.SeedSequence
+) -> Dict[str, np.ndarray]:
+    """Metrics of sequences shuffled within bouts."""
+    codes = _worker_state["codes"]
+    sort_key = _worker_state["sort_key"]
+    nb_notes = len(_worker_state["note_seq"])
+
+    # Random order within each bout, the stop syllable staying last. Replicates
+    # are shuffled in chunks, so memory is bounded whatever the batch size.
+    rng = np.random.default_rng(seed)
+    chunk_size = max(SHUFFLE_VALUES // max(codes.size, 1), 1)
+    trans_matrices = []
+    for start in range(0, nb_replicates, chunk_size):
+        nb_chunk = min(chunk_size, nb_replicates - start)
+        order = np.argsort(sort_key + rng.random((nb_chunk, codes.size)), axis=1)
+        shuffled = codes[order].ravel()
+        lengths = np.full(nb_chunk, codes.size)
+        trans_matrices.append(_count_grouped_transitions(shuffled, lengths, nb_notes))
+    trans_matrices = np.concatenate(trans_matrices)
+    return get_sequence_metrics(_worker_state["note_seq"], trans_matrices)
+
+
+def _run_replicates(
+    batch_func,
+    state: dict,
+    nb_replicates: int,
+    seed: int,
+    n_jobs: int,
+    batch_size: int,
+) -> Dict[str, np.ndarray]:
+    """
+    Run replicates in batches, optionally across a process pool.
+
+    Each batch gets its own child seed, so results only depend on ``seed``
+    and ``batch_size``, not on the number of workers.
+    """
+    batch_sizes = [batch_size] * (nb_replicates // batch_size)
+    if nb_replicates % batch_size:
+        batch_sizes.append(nb_replicates % batch_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(batch_sizes))
+
+    if n_jobs == 1:
+        _init_worker(state)
+        results = list(map(batch_func, batch_sizes, seeds))
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        with ProcessPoolExecutor(
+            max_workers=n_jobs, initializer=_init_worker, initargs=(state,)
+        ) as executor:
+            results = list(executor.map(batch_func, batch_sizes, seeds))
+
+    return _concat_results(results)
+
+
+def _concat_results(
+    results: List[Dict[str, np.ndarray]]
+) -> Dict[str, np.ndarray]:
+    """Concatenate per-batch metric arrays."""
+    keys = results[0].keys() if results else []
+    return {
+        key: np.concatenate([result[key] for result in results]) for key in keys
+    }
+
+
+def bootstrap_metrics(
+    syllables: str,
+    note_seq: str,
+    nb_replicates: int = 1000,
+    seed: int = 0,
+    n_jobs: int = 1,
+    batch_size: int = 500,
+) -> Dict[str, np.ndarray]:
+    """
+    Bootstrap sequence metrics by resampling bouts with replacement.
+
+    Per-bout transition matrices are computed once; each replicate is then a
+    weighted sum of those matrices, computed for a whole batch of replicates
+    with a single matrix product.
+
+    Parameters
+    ----------
+    syllables : str
+        String of syllables to analyze
+    note_seq : str
+        Reference note sequence
+    nb_replicates : int, optional
+        Number of bootstrap replicates, by default 1000
+    seed : int, optional
+        Random seed, by default 0
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    batch_size : int, optional
+        Number of replicates per batch, by default 500
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        One array of replicate values per metric (see ``get_sequence_metrics``)
+    """
+    bout_matrices = get_bout_trans_matrices(syllables, note_seq)
+    if not len(bout_matrices):
+        raise ValueError("No bout to resample")
+
+    # Float counts are exact here and let the matrix product use BLAS
+    state = {"bout_matrices": bout_matrices.astype(float), "note_seq": note_seq}
+    return _run_replicates(
+        _bootstrap_batch, state, nb_replicates, seed, n_jobs, batch_size
+    )
+
+
+def shuffle_null_metrics(
+    syllables: str,
+    note_seq: str,
+    nb_replicates: int = 1000,
+    seed: int = 0,
+    n_jobs: int = 1,
+    batch_size: int = 100,
+) -> Dict[str, np.ndarray]:
+    """
+    Build null distributions of sequence metrics by shuffling syllables.
+
+    Syllables are shuffled within each bout, keeping the bout composition
+    and the stop syllable at the end of the bout.
+
+    Parameters
+    ----------
+    syllables : str
+        String of syllables to analyze
+    note_seq : str
+        Reference note sequence
+    nb_replicates : int, optional
+        Number of shuffled replicates, by default 1000
+    seed : int, optional
+        Random seed, by default 0
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    batch_size : int, optional
+        Number of replicates per batch, by default 100. Within a batch,
+        replicates are shuffled in chunks of at most ``SHUFFLE_VALUES``
+        syllables, so memory does not grow with the batch size.
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        One array of null values per metric (see ``get_sequence_metrics``)
+    """
+    codes = _encode_syllables(syllables, note_seq)
+    bout_start, bout_stop = _get_bout_bounds(codes, len(note_seq))
+    bout = np.repeat(np.arange(bout_start.size), bout_stop - bout_start)
+    is_stop = codes == len(note_seq) - 1
+
+    # Adding a uniform [0, 1) draw to this key shuffles syllables within bouts
+    state = {
+        "codes": codes,
+        "sort_key": 2.0 * bout + is_stop,
+        "note_seq": note_seq,
+    }
+    return _run_replicates(
+        _shuffle_batch, state, nb_replicates, seed, n_jobs, batch_size
+    )
+
+
+def get_confidence_interval(
+    values: np.ndarray, confidence: float = 0.95
+) -> Tuple[float, float]:
+    """
+    Percentile confidence interval of resampled values.
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Replicate values
+    confidence : float, optional
+        Confidence level, by default 0.95
+
+    Returns
+    -------
+    Tuple[float, float]
+        Lower and upper bounds
+    """
+    alpha = (1 - confidence) / 2
+    lower, upper = np.nanquantile(values, [alpha, 1 - alpha])
+    return float(lower), float(upper)
@@ -0,0 +1,254 @@
+"""
+Integer-encoded syllable sequences.
+"""
+
+import numpy as np
+from typing import Iterator, Optional, Tuple
+
+from .alphabet import Alphabet
+
+# Code of the syllables that are not in the note sequence
+UNKNOWN_CODE = 255
+
+
+class SyllableSequence:
+    """
+    Compact integer-encoded syllable dataset.
+
+    Syllables are stored as one ``uint8`` code per syllable, indexing into
+    the note sequence, and bouts are delimited by a CSR-style offset array:
+    bout ``i`` spans ``codes[bout_offsets[i]:bout_offsets[i + 1]]``.
+    Syllables not in the note sequence are stored as ``UNKNOWN_CODE``.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded syllables
+    note_seq : str or Alphabet
+        Reference note sequence (stop syllable last), at most 255 notes
+    bout_offsets : np.ndarray, optional
+        Start of each bout followed by the number of syllables.
+        Found from the stop syllable if not given.
+    """
+
+    def __init__(
+        self,
+        codes: np.ndarray,
+        note_seq: str,
+        bout_offsets: Optional[np.ndarray] = None,
+    ):
+        if len(note_seq) >= UNKNOWN_CODE:
+            raise ValueError(f"note_seq must have fewer than {UNKNOWN_CODE} notes")
+        self.codes = np.asarray(codes, dtype=np.uint8)
+        self.note_seq = note_seq
+        if bout_offsets is None:
+            bout_start, bout_stop = _get_bout_bounds(self.codes, len(note_seq))
+            bout_offsets = np.append(bout_start, bout_stop[-1:])
+            if not bout_offsets.size:
+                bout_offsets = np.zeros(1, dtype=np.int64)
+        self.bout_offsets = np.asarray(bout_offsets, dtype=np.int64)
+
+    @classmethod
+    def from_string(cls, syllables: str, note_seq: str) -> "SyllableSequence":
+        """
+        Encode a syllable string.
+
+        Parameters
+        ----------
+        syllables : str
+            String of syllables
+        note_seq : str
+            Reference note sequence
+
+        Returns
+        -------
+        SyllableSequence
+            Encoded sequence
+        """
+        codes = _encode_syllables(syllables, note_seq)
+        codes[codes < 0] = UNKNOWN_CODE
+        return cls(codes, note_seq)
+
+    def __len__(self) -> int:
+        return self.codes.size
+
+    def __repr__(self) -> str:
+        return (
+            f"SyllableSequence(nb_syllables={len(self)}, "
+            f"nb_bouts={self.nb_bouts}, note_seq={self.note_seq!r})"
+        )
+
+    @property
+    def nb_bouts(self) -> int:
+        """Number of bouts."""
+        return self.bout_offsets.size - 1
+
+    def bouts(self, start: int, stop: int) -> "SyllableSequence":
+        """
+        Get a range of bouts.
+
+        The codes of the returned sequence are a view on this one.
+
+        Parameters
+        ----------
+        start : int
+            First bout
+        stop : int
+            Bout after the last one
+
+        Returns
+        -------
+        SyllableSequence
+            Sequence of the selected bouts
+        """
+        offsets = self.bout_offsets[start : stop + 1]
+        codes = self.codes[offsets[0] : offsets[-1]]
+        return SyllableSequence(codes, self.note_seq, offsets - offsets[0])
+
+    def bout(self, ind: int) -> "SyllableSequence":
+        """
+        Get a single bout (a view on this sequence).
+
+        Parameters
+        ----------
+        ind : int
+            Bout index
+
+        Returns
+        -------
+        SyllableSequence
+            Sequence of the bout
+        """
+        if ind < 0:
+            ind += self.nb_bouts
+        if not 0 <= ind < self.nb_bouts:
+            raise IndexError("bout index out of range")
+        return self.bouts(ind, ind + 1)
+
+    def iter_bouts(self) -> Iterator["SyllableSequence"]:
+        """Iterate over the bouts, each being a view on this sequence."""
+        for ind in range(self.nb_bouts):
+            yield self.bout(ind)
+
+    def get_codes(self, note_seq: Optional[str] = None) -> np.ndarray:
+        """
+        Get the syllable codes as indices in a note sequence.
+
+        Parameters
+        ----------
+        note_seq : str, optional
+            Note sequence to index into, by default the sequence's own
+
+        Returns
+        -------
+        np.ndarray
+            Index of each syllable in ``note_seq``, -1 for unknown syllables
+        """
+        if note_seq is None or note_seq == self.note_seq:
+            lut = np.arange(UNKNOWN_CODE + 1, dtype=np.int64)
+        else:
+            lut = np.full(UNKNOWN_CODE + 1, -1, dtype=np.int64)
+            lut[: len(self.note_seq)] = _encode_syllables(
+                list(self.note_seq), note_seq
+            )
+        lut[UNKNOWN_CODE] = -1
+        return lut[self.codes]
+
+    def to_string(self, unknown: str = "?") -> str:
+        """
+        Decode the sequence back into a string.
+
+        Parameters
+        ----------
+        unknown : str, optional
+            Symbol for syllables not in the note sequence, by default "?"
+
+        Returns
+        -------
+        str
+            Syllable string, with labels separated by spaces if some labels
+            have several characters
+        """
+        symbols = list(self.note_seq)
+        separator = "" if all(len(symbol) == 1 for symbol in symbols) else " "
+        symbols += [unknown] * (UNKNOWN_CODE + 1 - len(symbols))
+        return separator.join(np.array(symbols)[self.codes])
+
+
+def _encode_syllables(syllables: str, note_seq: str) -> np.ndarray:
+    """
+    Encode syllables into their indices in the note sequence.
+
+    An ``Alphabet`` encodes through its precomputed lookup table.
+
+    Parameters
+    ----------
+    syllables : str or SyllableSequence
+        String (or sequence of labels) of syllables to encode
+    note_seq : str or Alphabet
+        Reference note sequence
+
+    Returns
+    -------
+    np.ndarray
+        Index of each syllable in ``note_seq`` (first occurrence),
+        -1 for syllables not in ``note_seq``
+    """
+    if isinstance(syllables, SyllableSequence):
+        return syllables.get_codes(note_seq)
+    if isinstance(note_seq, Alphabet):
+        return note_seq.encode(syllables)
+
+    lookup = {}
+    for ind, note in enumerate(note_seq):
+        lookup.setdefault(note, ind)
+
+    if not isinstance(syllables, str):
+        return np.fromiter(
+            (lookup.get(syllable, -1) for syllable in syllables),
+            dtype=np.int64,
+            count=len(syllables),
+        )
+
+    # Look up code points against the sorted single-character symbols
+    symbols = sorted(
+        (ord(note), ind) for note, ind in lookup.items() if len(note) == 1
+    )
+    points = np.frombuffer(syllables.encode("utf-32-le"), dtype=np.uint32)
+    codes = np.full(points.shape[0], -1, dtype=np.int64)
+    if not symbols:
+        return codes
+    keys = np.array([point for point, _ in symbols], dtype=np.uint32)
+    values = np.array([ind for _, ind in symbols], dtype=np.int64)
+    pos = np.searchsorted(keys, points).clip(max=len(keys) - 1)
+    found = keys[pos] == points
+    codes[found] = values[pos[found]]
+    return codes
+
+
+def _get_bout_bounds(
+    codes: np.ndarray, nb_notes: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Find the bouts of an encoded syllable sequence.
+
+    A bout ends with the stop syllable (last note). Syllables after the
+    last stop syllable form a final, unterminated bout.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Encoded syllables
+    nb_notes : int
+        Number of notes in the note sequence
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray]
+        Start (inclusive) and stop (exclusive) syllable index of each bout
+    """
+    bout_stop = np.flatnonzero(codes == nb_notes - 1) + 1
+    if codes.size and (not bout_stop.size or bout_stop[-1] != codes.size):
+        bout_stop = np.append(bout_stop, codes.size)
+    bout_start = np.concatenate(([0], bout_stop[:-1])).astype(np.int64)
+    return bout_start, bout_stop
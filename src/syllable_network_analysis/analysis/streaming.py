@@ -0,0 +1,134 @@
+"""
+Incremental transition counting for live recordings.
+"""
+
+import numpy as np
+from typing import List, Tuple
+
+from .core import (
+    _valid_transitions,
+    get_row_entropy,
+    get_song_stereotypy,
+    get_syllable_network,
+    get_typical_rows,
+)
+from .sequence import _encode_syllables
+
+
+class TransitionCounter:
+    """
+    Stateful syllable transition counter.
+
+    Syllables are fed in chunks as they come off the recording rig. The
+    last syllable of each chunk is carried over, so bouts crossing chunk
+    boundaries are counted exactly as ``get_trans_matrix`` would count the
+    concatenated string. Per-row entropy and typical transitions are cached
+    and only recomputed for rows that changed since the last query.
+
+    Parameters
+    ----------
+    note_seq : str
+        Reference note sequence (stop syllable last)
+    """
+
+    def __init__(self, note_seq: str):
+        self.note_seq = note_seq
+        nb_notes = len(note_seq)
+        self._counts = np.zeros((nb_notes, nb_notes), dtype=np.int64)
+        self._last_code = -1
+        self._nb_syllables = 0
+
+        # Per-row caches, refreshed lazily for rows marked as dirty
+        self._row_entropy = np.zeros(nb_notes)
+        self._row_is_typical = np.zeros(nb_notes, dtype=bool)
+        self._row_nb_nonzero = np.zeros(nb_notes, dtype=np.int64)
+        self._dirty = np.zeros(nb_notes, dtype=bool)
+
+    def update(self, syllables: str) -> "TransitionCounter":
+        """
+        Add a chunk of syllables.
+
+        Parameters
+        ----------
+        syllables : str
+            Next chunk of syllables
+
+        Returns
+        -------
+        TransitionCounter
+            The counter itself, for chaining
+        """
+        codes = _encode_syllables(syllables, self.note_seq)
+        if not codes.size:
+            return self
+
+        codes = np.concatenate(([self._last_code], codes))
+        start, end = _valid_transitions(codes, len(self.note_seq))
+        np.add.at(self._counts, (start, end), 1)
+        self._dirty[start] = True
+
+        self._last_code = codes[-1]
+        self._nb_syllables += codes.size - 1
+        return self
+
+    def reset(self) -> None:
+        """Discard all counts."""
+        self._counts[:] = 0
+        self._last_code = -1
+        self._nb_syllables = 0
+        self._dirty[:] = True
+
+    def _refresh(self) -> None:
+        """Recompute the cached per-row results of changed rows."""
+        if not self._dirty.any():
+            return
+        rows = np.flatnonzero(self._dirty)
+        counts = self._counts[rows]
+        self._row_entropy[rows] = get_row_entropy(counts)
+        self._row_is_typical[rows] = get_typical_rows(counts)
+        self._row_nb_nonzero[rows] = np.count_nonzero(counts, axis=1)
+        self._dirty[:] = False
+
+    @property
+    def nb_syllables(self) -> int:
+        """Number of syllables seen so far."""
+        return self._nb_syllables
+
+    @property
+    def trans_matrix(self) -> np.ndarray:
+        """Copy of the current transition matrix."""
+        return self._counts.copy()
+
+    @property
+    def syl_network(self) -> List[Tuple[int, int, int]]:
+        """Current syllable network."""
+        return get_syllable_network(self._counts)
+
+    @property
+    def trans_entropy(self) -> float:
+        """Current mean transition entropy."""
+        self._refresh()
+        has_transition = self._row_nb_nonzero != 0
+        if not has_transition.any():
+            return np.nan
+        return float(np.mean(self._row_entropy[has_transition]))
+
+    @property
+    def sequence_linearity(self) -> float:
+        """Current sequence linearity."""
+        self._refresh()
+        nb_unique_syllables = len(self.note_seq) - 1  # stop syllable not counted
+        return nb_unique_syllables / self._row_nb_nonzero.sum()
+
+    @property
+    def sequence_consistency(self) -> float:
+        """Current sequence consistency."""
+        self._refresh()
+        return self._row_is_typical.sum() / self._row_nb_nonzero.sum()
+
+    @property
+    def song_stereotypy(self) -> float:
+        """Current song stereotypy."""
+        return get_song_stereotypy(
+            self.sequence_linearity, self.sequence_consistency
+        )
@@ -0,0 +1,123 @@
+"""
+Sliding-window analysis of syllable sequence metrics over time.
+"""
+
+import numpy as np
+from typing import Dict, Tuple
+
+from .core import get_sequence_metrics
+from .sequence import _encode_syllables, _get_bout_bounds
+
+
+def get_windowed_trans_matrices(
+    syllables: str,
+    note_seq: str,
+    window: int,
+    step: int = 1,
+    unit: str = "bout",
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Build transition matrices over a sliding window.
+
+    The count matrix is updated incrementally by adding the transitions
+    that enter the window and subtracting the ones that leave it, so the
+    whole sequence is covered in a single linear pass.
+
+    Parameters
+    ----------
+    syllables : str
+        String of syllables to analyze
+    note_seq : str
+        Reference note sequence
+    window : int
+        Window size, in bouts or syllables
+    step : int, optional
+        Step between consecutive windows, by default 1
+    unit : str, optional
+        Either "bout" or "syllable", by default "bout"
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray]
+        Start and stop syllable index of each window and the transition
+        tensor of shape (n_windows, k, k)
+    """
+    if window < 1 or step < 1:
+        raise ValueError("window and step must be positive")
+
+    nb_notes = len(note_seq)
+    codes = _encode_syllables(syllables, note_seq)
+
+    if unit == "syllable":
+        win_start = np.arange(0, codes.size - window + 1, step, dtype=np.int64)
+        win_stop = win_start + window
+    elif unit == "bout":
+        bout_start, bout_stop = _get_bout_bounds(codes, nb_notes)
+        first_bout = np.arange(0, bout_start.size - window + 1, step)
+        win_start = bout_start[first_bout]
+        win_stop = bout_stop[first_bout + window - 1]
+    else:
+        raise ValueError(f"unit must be 'bout' or 'syllable', not {unit!r}")
+
+    # Transition p links syllables p and p + 1
+    start, end = codes[:-1], codes[1:]
+    valid = (start >= 0) & (end >= 0) & (start < nb_notes - 1)
+    trans_pos = np.flatnonzero(valid)
+    trans_flat = start[valid] * nb_notes + end[valid]
+
+    # Transitions inside a window are those with p in [win_start, win_stop - 1)
+    first_trans = np.searchsorted(trans_pos, win_start)
+    last_trans = np.searchsorted(trans_pos, win_stop - 1)
+
+    trans_matrices = np.zeros((win_start.size, nb_notes**2), dtype=np.int64)
+    counts = np.zeros(nb_notes**2, dtype=np.int64)
+    lo = hi = 0
+    for ind, (new_lo, new_hi) in enumerate(zip(first_trans, last_trans)):
+        # Only the leaving and entering transitions are touched, not all k**2
+        np.subtract.at(counts, trans_flat[lo : min(new_lo, hi)], 1)
+        np.add.at(counts, trans_flat[max(new_lo, hi) : new_hi], 1)
+        lo, hi = new_lo, new_hi
+        trans_matrices[ind] = counts
+
+    trans_matrices = trans_matrices.reshape(-1, nb_notes, nb_notes)
+    return win_start, win_stop, trans_matrices
+
+
+def get_windowed_metrics(
+    syllables: str,
+    note_seq: str,
+    window: int,
+    step: int = 1,
+    unit: str = "bout",
+) -> Dict[str, np.ndarray]:
+    """
+    Calculate sequence metrics over a sliding window.
+
+    Parameters
+    ----------
+    syllables : str
+        String of syllables to analyze
+    note_seq : str
+        Reference note sequence
+    window : int
+        Window size, in bouts or syllables
+    step : int, optional
+        Step between consecutive windows, by default 1
+    unit : str, optional
+        Either "bout" or "syllable", by default "bout"
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Window start and stop syllable index and one array per metric
+        (trans_entropy, sequence_linearity, sequence_consistency,
+        song_stereotypy)
+    """
+    win_start, win_stop, trans_matrices = get_windowed_trans_matrices(
+        syllables, note_seq, window, step=step, unit=unit
+    )
+    return {
+        "start": win_start,
+        "stop": win_stop,
+        **get_sequence_metrics(note_seq, trans_matrices),
+    }
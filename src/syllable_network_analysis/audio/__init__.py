@@ -0,0 +1,45 @@
+"""
+Audio processing module for syllable network analysis.
+"""
+
+from .labeling import (
+    SyllableTemplates,
+    cluster_segments,
+    fit_templates,
+    get_bird_templates,
+    get_segment_features,
+    get_syllable_string,
+    label_file,
+    label_files,
+    label_segments,
+    load_templates,
+    read_segments,
+    save_templates,
+)
+from .segmentation import (
+    SyllableSegmenter,
+    segment_blocks,
+    segment_file,
+    segment_files,
+    write_segments,
+)
+
+__all__ = [
+    "SyllableSegmenter",
+    "segment_blocks",
+    "segment_file",
+    "segment_files",
+    "write_segments",
+    "SyllableTemplates",
+    "get_segment_features",
+    "fit_templates",
+    "cluster_segments",
+    "label_segments",
+    "save_templates",
+    "load_templates",
+    "get_bird_templates",
+    "read_segments",
+    "get_syllable_string",
+    "label_file",
+    "label_files",
+]
@@ -0,0 +1,624 @@
+"""
+Spectral features of syllable segments and nearest-centroid labeling.
+
+Segments are stacked into zero-padded batches of similar length, so the
+short-time Fourier transform of a whole batch is a single ``rfft`` over a
+strided frame view. Each segment is summarized by its log power in
+log-spaced frequency bands, averaged over a few equal parts of the segment,
+and its log duration.
+
+Labels come from per-bird templates: the centroid of the features of each
+syllable type, fitted once from hand-labeled segments and stored as one
+``.npz`` file per bird. Template files are read once per process.
+"""
+
+import functools
+import json
+from itertools import islice
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+
+from ..utils.profiling import profile_stage
+from .segmentation import segment_file
+
+# Default parameters of the segment features
+FEATURE_PARAMS = {
+    "n_fft": 512,
+    "n_bands": 24,
+    "n_time_bins": 3,
+    "freq_range": (500.0, 12000.0),
+    "max_duration": 0.5,
+}
+
+# Per-process memo of loaded template files: path -> (mtime, templates)
+_templates = {}
+
+
+class SyllableTemplates(NamedTuple):
+    """
+    Nearest-centroid model of the syllable types of a bird.
+
+    Attributes
+    ----------
+    labels : Tuple[str, ...]
+        Syllable label of each centroid
+    centroids : np.ndarray
+        Standardized feature centroids, shape (n_labels, n_features)
+    mean : np.ndarray
+        Feature mean used for standardization
+    scale : np.ndarray
+        Feature scale used for standardization
+    sample_rate : int
+        Sampling rate (Hz) of the training segments
+    feature_params : Dict[str, Any]
+        Parameters of ``get_segment_features``
+    """
+
+    labels: Tuple[str, ...]
+    centroids: np.ndarray
+    mean: np.ndarray
+    scale: np.ndarray
+    sample_rate: int
+    feature_params: Dict[str, Any]
+
+
+def _get_band_matrix(
+    n_fft: int, sample_rate: int, n_bands: int, freq_range: Tuple[float, float]
+) -> np.ndarray:
+    """Pooling matrix of FFT bins into log-spaced bands."""
+    freqs = np.fft.rfftfreq(n_fft, 1 / sample_rate)
+    max_freq = min(freq_range[1], sample_rate / 2)
+    edges = np.geomspace(freq_range[0], max_freq, n_bands + 1)
+    band = np.searchsorted(edges, freqs, side="right") - 1
+    is_in = (band >= 0) & (band < n_bands)
+    band_matrix = np.zeros((freqs.size, n_bands))
+    band_matrix[np.flatnonzero(is_in), band[is_in]] = 1
+    # Bands narrower than a bin take the nearest bin
+    is_empty = band_matrix.sum(axis=0) == 0
+    centers = np.sqrt(edges[:-1] * edges[1:])
+    nearest = np.abs(freqs[:, None] - centers[None, is_empty]).argmin(axis=0)
+    band_matrix[nearest, np.flatnonzero(is_empty)] = 1
+    return band_matrix / band_matrix.sum(axis=0)
+
+
+def get_segment_features(
+    segments: Sequence[np.ndarray],
+    sample_rate: int,
+    n_fft: int = 512,
+    n_bands: int = 24,
+    n_time_bins: int = 3,
+    freq_range: Tuple[float, float] = (500.0, 12000.0),
+    max_duration: float = 0.5,
+    batch_size: int = 256,
+) -> np.ndarray:
+    """
+    Calculate spectral features of syllable segments.
+
+    Parameters
+    ----------
+    segments : Sequence[np.ndarray]
+        Mono samples of each segment
+    sample_rate : int
+        Sampling rate (Hz)
+    n_fft : int, optional
+        STFT frame length, by default 512 (hop of half a frame)
+    n_bands : int, optional
+        Number of log-spaced frequency bands, by default 24
+    n_time_bins : int, optional
+        Number of equal parts of a segment averaged separately, by default 3
+    freq_range : Tuple[float, float], optional
+        Frequency range of the bands (Hz), by default (500, 12000)
+    max_duration : float, optional
+        Segments are truncated to this duration (s), by default 0.5
+    batch_size : int, optional
+        Number of segments transformed at once, by default 256
+
+    Returns
+    -------
+    np.ndarray
+        Features of shape (n_segments, n_time_bins * n_bands + 1): log band
+        power of each part of the segment, then log duration
+    """
+    hop_length = n_fft // 2
+    max_length = max(int(max_duration * sample_rate), n_fft)
+    lengths = np.array([len(segment) for segment in segments], dtype=np.int64)
+    clipped = np.clip(lengths, 0, max_length)
+    nb_frames = np.maximum(1 + (clipped - n_fft) // hop_length, 1)
+
+    window = np.hanning(n_fft + 1)[:-1].astype(np.float32)
+    band_matrix = _get_band_matrix(n_fft, sample_rate, n_bands, freq_range)
+    features = np.empty((lengths.size, n_time_bins * n_bands + 1))
+    features[:, -1] = np.log(np.maximum(lengths, 1) / sample_rate)
+
+    # Batches of segments of similar length, to limit padding
+    order = np.argsort(lengths, kind="stable")
+    for start in range(0, order.size, batch_size):
+        batch = order[start : start + batch_size]
+        length = max(int(clipped[batch].max()), n_fft)
+        stack = np.zeros((batch.size, length), dtype=np.float32)
+        for row, ind in enumerate(batch):
+            stack[row, : clipped[ind]] = segments[ind][: clipped[ind]]
+
+        frames = np.lib.stride_tricks.sliding_window_view(stack, n_fft, axis=1)
+        frames = frames[:, ::hop_length] * window
+        power = np.abs(np.fft.rfft(frames, axis=2)) ** 2
+        log_power = np.log10(power @ band_matrix + 1e-10)
+
+        # Average the frames of each part; every part has at least one frame
+        frame_ind = np.arange(frames.shape[1])[None, :, None]
+        part = np.arange(n_time_bins)[None, None, :]
+        n_valid = nb_frames[batch][:, None, None]
+        part_start = part * n_valid // n_time_bins
+        part_stop = np.maximum((part + 1) * n_valid // n_time_bins, part_start + 1)
+        weights = (frame_ind >= part_start) & (frame_ind < part_stop)
+        weights = weights / (part_stop - part_start)
+        part_power = np.einsum("bft,bfk->btk", weights, log_power)
+        features[batch, :-1] = part_power.reshape(batch.size, -1)
+    return features
+
+
+def _get_scale(features: np.ndarray) -> np.ndarray:
+    """
+    Feature scale: the band powers share one scale (so that bands that only
+    hold background noise are not inflated), the duration has its own.
+    """
+    variance = features.var(axis=0)
+    scale = np.full(features.shape[1], np.sqrt(variance[:-1].mean()))
+    scale[-1] = np.sqrt(variance[-1])
+    scale[scale == 0] = 1
+    return scale
+
+
+def _standardize(
+    features: np.ndarray, mean: np.ndarray, scale: np.ndarray
+) -> np.ndarray:
+    return (features - mean) / scale
+
+
+def _get_nearest(
+    features: np.ndarray, centroids: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Index of and distance to the nearest centroid of each feature row."""
+    sq_dist = (
+        np.sum(features**2, axis=1)[:, None]
+        - 2 * features @ centroids.T
+        + np.sum(centroids**2, axis=1)[None, :]
+    )
+    nearest = sq_dist.argmin(axis=1)
+    dist = np.sqrt(np.maximum(sq_dist[np.arange(nearest.size), nearest], 0))
+    return nearest, dist
+
+
+def fit_templates(
+    segments: Sequence[np.ndarray],
+    labels: Sequence[str],
+    sample_rate: int,
+    **feature_params,
+) -> SyllableTemplates:
+    """
+    Fit syllable templates to labeled segments.
+
+    Parameters
+    ----------
+    segments : Sequence[np.ndarray]
+        Mono samples of each segment
+    labels : Sequence[str]
+        Syllable label of each segment (alphabet symbols)
+    sample_rate : int
+        Sampling rate (Hz)
+    **feature_params
+        Parameters of ``get_segment_features``
+
+    Returns
+    -------
+    SyllableTemplates
+        Centroid of each syllable label, in order of first appearance
+    """
+    feature_params = {**FEATURE_PARAMS, **feature_params}
+    features = get_segment_features(segments, sample_rate, **feature_params)
+    unique_labels = tuple(dict.fromkeys(labels))
+    label_index = {label: code for code, label in enumerate(unique_labels)}
+    label_codes = np.array([label_index[label] for label in labels])
+
+    mean = features.mean(axis=0)
+    scale = _get_scale(features)
+    features = _standardize(features, mean, scale)
+    centroids = np.zeros((len(unique_labels), features.shape[1]))
+    np.add.at(centroids, label_codes, features)
+    centroids /= np.bincount(label_codes)[:, None]
+    return SyllableTemplates(
+        unique_labels, centroids, mean, scale, sample_rate, feature_params
+    )
+
+
+def cluster_segments(
+    segments: Sequence[np.ndarray],
+    sample_rate: int,
+    n_clusters: int,
+    n_iter: int = 50,
+    seed: int = 0,
+    **feature_params,
+) -> np.ndarray:
+    """
+    Group segments into syllable types with k-means.
+
+    Meant to bootstrap the labeling of a new bird: clusters are labeled by
+    hand, then used to fit its templates.
+
+    Parameters
+    ----------
+    segments : Sequence[np.ndarray]
+        Mono samples of each segment
+    sample_rate : int
+        Sampling rate (Hz)
+    n_clusters : int
+        Number of clusters
+    n_iter : int, optional
+        Maximum number of k-means iterations, by default 50
+    seed : int, optional
+        Random seed of the k-means++ initialization, by default 0
+    **feature_params
+        Parameters of ``get_segment_features``
+
+    Returns
+    -------
+    np.ndarray
+        Cluster index of each segment
+    """
+    feature_params = {**FEATURE_PARAMS, **feature_params}
+    features = get_segment_features(segments, sample_rate, **feature_params)
+    features = _standardize(features, features.mean(axis=0), _get_scale(features))
+
+    # k-means++ initialization
+    rng = np.random.default_rng(seed)
+    centroids = features[[rng.integers(len(features))]]
+    for _ in range(1, n_clusters):
+        dist = _get_nearest(features, centroids)[1] ** 2
+        prob = dist / dist.sum() if dist.sum() else None
+        centroids = np.vstack((centroids, features[rng.choice(len(features), p=prob)]))
+
+    clusters = None
+    for _ in range(n_iter):
+        new_clusters = _get_nearest(features, centroids)[0]
+        if clusters is not None and np.array_equal(new_clusters, clusters):
+            break
+        clusters = new_clusters
+        for cluster in range(n_clusters):
+            if np.any(clusters == cluster):
+                centroids[cluster] = features[clusters == cluster].mean(axis=0)
+    return clusters
+
+
+def label_segments(
+    segments: Sequence[np.ndarray],
+    templates: SyllableTemplates,
+    max_distance: Optional[float] = None,
+    unknown: str = "?",
+) -> List[str]:
+    """
+    Label segments with their nearest syllable template.
+
+    Parameters
+    ----------
+    segments : Sequence[np.ndarray]
+        Mono samples of each segment, at the templates sampling rate
+    templates : SyllableTemplates
+        Syllable templates of the bird
+    max_distance : float, optional
+        Segments farther than this from every template (in standardized
+        feature units) are labeled ``unknown``, by default never
+    unknown : str, optional
+        Label of unrecognized segments, by default "?" (not in the alphabet,
+        so skipped by the transition counts)
+
+    Returns
+    -------
+    List[str]
+        Label of each segment
+    """
+    features = get_segment_features(
+        segments, templates.sample_rate, **templates.feature_params
+    )
+    features = _standardize(features, templates.mean, templates.scale)
+    nearest, dist = _get_nearest(features, templates.centroids)
+    labels = np.array(templates.labels + (unknown,), dtype=object)
+    if max_distance is not None:
+        nearest[dist > max_distance] = len(templates.labels)
+    return labels[nearest].tolist()
+
+
+def save_templates(path: Union[str, Path], templates: SyllableTemplates) -> None:
+    """
+    Save syllable templates.
+
+    Parameters
+    ----------
+    path : str or Path
+        Output ``.npz`` file
+    templates : SyllableTemplates
+        Syllable templates
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "wb") as fh:
+        np.savez(
+            fh,
+            labels=np.array(templates.labels),
+            centroids=templates.centroids,
+            mean=templates.mean,
+            scale=templates.scale,
+            sample_rate=templates.sample_rate,
+            feature_params=json.dumps(templates.feature_params),
+        )
+
+
+def load_templates(path: Union[str, Path]) -> SyllableTemplates:
+    """
+    Load syllable templates, reading each file once per process.
+
+    The file is read again if it changed since it was loaded.
+
+    Parameters
+    ----------
+    path : str or Path
+        Templates ``.npz`` file
+
+    Returns
+    -------
+    SyllableTemplates
+        Syllable templates
+    """
+    path = Path(path).resolve()
+    mtime = path.stat().st_mtime_ns
+    if path in _templates and _templates[path][0] == mtime:
+        return _templates[path][1]
+
+    with np.load(path) as data:
+        feature_params = json.loads(str(data["feature_params"]))
+        feature_params["freq_range"] = tuple(feature_params["freq_range"])
+        templates = SyllableTemplates(
+            tuple(data["labels"].tolist()),
+            data["centroids"],
+            data["mean"],
+            data["scale"],
+            int(data["sample_rate"]),
+            feature_params,
+        )
+    _templates[path] = (mtime, templates)
+    return templates
+
+
+def get_bird_templates(
+    bird_id: str, template_dir: Union[str, Path]
+) -> SyllableTemplates:
+    """
+    Load the syllable templates of a bird (``<template_dir>/<bird_id>.npz``).
+
+    Parameters
+    ----------
+    bird_id : str
+        Bird identifier
+    template_dir : str or Path
+        Directory of the template files
+
+    Returns
+    -------
+    SyllableTemplates
+        Syllable templates
+    """
+    return load_templates(Path(template_dir) / f"{bird_id}.npz")
+
+
+def _check_sample_rate(file_rate: int, expected_rate: Optional[int]) -> None:
+    """Raise an error if a file is not sampled at the expected rate."""
+    if expected_rate is not None and file_rate != expected_rate:
+        raise ValueError(
+            f"Audio sampled at {file_rate} Hz, but templates expect {expected_rate} Hz"
+        )
+
+
+def read_segments(
+    path: Union[str, Path, BinaryIO],
+    table: Dict[str, np.ndarray],
+    max_duration: Optional[float] = None,
+    sample_rate: Optional[int] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Read the samples of each segment of an audio file, one at a time.
+
+    Parameters
+    ----------
+    path : str, Path or file object
+        Audio file
+    table : Dict[str, np.ndarray]
+        Segment table (see ``segment_file``)
+    max_duration : float, optional
+        Segments are truncated to this duration (s), by default not
+    sample_rate : int, optional
+        Expected sampling rate (Hz), e.g. that of the templates, by default
+        any
+
+    Yields
+    ------
+    np.ndarray
+        Mono samples of a segment
+
+    Raises
+    ------
+    ValueError
+        If the file is not sampled at ``sample_rate``
+    """
+    import soundfile as sf
+
+    with sf.SoundFile(path) as audio:
+        _check_sample_rate(audio.samplerate, sample_rate)
+        sample_rate = audio.samplerate
+        for onset, offset in zip(table["onset"], table["offset"]):
+            if max_duration is not None:
+                offset = min(offset, onset + max_duration)
+            audio.seek(int(round(onset * sample_rate)))
+            nb_samples = int(round((offset - onset) * sample_rate))
+            yield audio.read(nb_samples, dtype="float32", always_2d=True).mean(axis=1)
+
+
+def get_syllable_string(
+    table: Dict[str, np.ndarray],
+    labels: Sequence[str],
+    stop_symbol: str = "*",
+    bout_gap: float = 0.5,
+) -> str:
+    """
+    Join segment labels into a syllable string.
+
+    A bout ends, with ``stop_symbol``, at each silence longer than
+    ``bout_gap`` and at the end of the recording.
+
+    Parameters
+    ----------
+    table : Dict[str, np.ndarray]
+        Segment table
+    labels : Sequence[str]
+        Label of each segment
+    stop_symbol : str, optional
+        Bout stop symbol, by default "*"
+    bout_gap : float, optional
+        Shortest silence between bouts (s), by default 0.5
+
+    Returns
+    -------
+    str
+        Syllable string; labels are separated by spaces when some have
+        several characters (the format read by an ``Alphabet``)
+    """
+    if not len(labels):
+        return ""
+    is_bout_end = np.append(table["onset"][1:] - table["offset"][:-1] > bout_gap, True)
+    symbols = []
+    for label, is_end in zip(labels, is_bout_end):
+        symbols.append(label)
+        if is_end:
+            symbols.append(stop_symbol)
+    separator = "" if all(len(symbol) == 1 for symbol in symbols) else " "
+    return separator.join(symbols)
+
+
+def label_file(
+    path: Union[str, Path, BinaryIO],
+    templates: SyllableTemplates,
+    stop_symbol: str = "*",
+    bout_gap: float = 0.5,
+    max_distance: Optional[float] = None,
+    batch_size: int = 1024,
+    block_size: int = 65536,
+    **segment_params,
+) -> str:
+    """
+    Segment and label a recording.
+
+    The recording is streamed for segmentation, then its segments are read
+    and labeled in batches, so memory is bounded by ``block_size`` and
+    ``batch_size`` whatever the length of the recording.
+
+    Parameters
+    ----------
+    path : str, Path or file object
+        Audio file
+    templates : SyllableTemplates
+        Syllable templates of the bird
+    stop_symbol : str, optional
+        Bout stop symbol, by default "*"
+    bout_gap : float, optional
+        Shortest silence between bouts (s), by default 0.5
+    max_distance : float, optional
+        Distance beyond which segments are left unlabeled, by default none
+    batch_size : int, optional
+        Number of segments labeled at once, by default 1024
+    block_size : int, optional
+        Number of samples read at once for segmentation, by default 65536
+    **segment_params
+        Detection parameters (see ``SyllableSegmenter``)
+
+    Returns
+    -------
+    str
+        Syllable string
+
+    Raises
+    ------
+    ValueError
+        If the recording is not sampled at the rate of the templates
+    """
+    import soundfile as sf
+
+    _check_sample_rate(sf.info(path).samplerate, templates.sample_rate)
+    if hasattr(path, "seek"):
+        path.seek(0)
+    with profile_stage("segment_file"):
+        table = segment_file(path, block_size, **segment_params)
+    if hasattr(path, "seek"):
+        path.seek(0)
+
+    labels = []
+    with profile_stage("label_segments", table["onset"].size):
+        segments = read_segments(
+            path,
+            table,
+            templates.feature_params.get("max_duration"),
+            templates.sample_rate,
+        )
+        while True:
+            batch = list(islice(segments, batch_size))
+            if not batch:
+                break
+            labels += label_segments(batch, templates, max_distance)
+    return get_syllable_string(table, labels, stop_symbol, bout_gap)
+
+
+def label_files(
+    paths: Sequence[Union[str, Path]],
+    templates: Union[SyllableTemplates, Sequence[SyllableTemplates]],
+    n_jobs: int = 1,
+    **kwargs,
+) -> List[str]:
+    """
+    Segment and label many recordings across a process pool.
+
+    Parameters
+    ----------
+    paths : Sequence[str or Path]
+        Audio files
+    templates : SyllableTemplates or Sequence[SyllableTemplates]
+        Syllable templates, shared by all files or one per file
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    **kwargs
+        Parameters of ``label_file``
+
+    Returns
+    -------
+    List[str]
+        Syllable string of each file, in the order of ``paths``
+    """
+    if isinstance(templates, SyllableTemplates):
+        templates = [templates] * len(paths)
+    func = functools.partial(label_file, **kwargs)
+    if n_jobs == 1:
+        return list(map(func, paths, templates))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return list(executor.map(func, paths, templates))
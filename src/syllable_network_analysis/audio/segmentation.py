@@ -0,0 +1,336 @@
+"""
+Streaming segmentation of song recordings into syllables.
+
+Audio is read in fixed-size blocks and reduced to a short-time envelope,
+one value per frame. Syllables are the runs of frames whose envelope
+exceeds a threshold, once runs separated by short gaps are merged and short
+runs are dropped. Only the samples of the current block and a few integers
+of detection state are kept, so memory does not grow with the recording.
+"""
+
+import csv
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from ..utils.profiling import profile_stage
+
+# Columns of a segment table
+SEGMENT_FIELDS = ["onset", "offset", "duration"]
+
+
+def _make_table(onsets: np.ndarray, offsets: np.ndarray) -> Dict[str, np.ndarray]:
+    """Build a segment table from onset and offset times (s)."""
+    return {"onset": onsets, "offset": offsets, "duration": offsets - onsets}
+
+
+def _concat_tables(tables: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Concatenate segment tables."""
+    return {
+        field: np.concatenate([table[field] for table in tables] + [np.empty(0)])
+        for field in SEGMENT_FIELDS
+    }
+
+
+class SyllableSegmenter:
+    """
+    Stateful syllable onset and offset detector.
+
+    Blocks of samples are fed as they are read. Frames and detection state
+    are carried over block boundaries, so the segments do not depend on the
+    block size. Segments are returned as soon as they can no longer be
+    merged with a later syllable.
+
+    Parameters
+    ----------
+    sample_rate : int
+        Sampling rate (Hz)
+    threshold : float, optional
+        Envelope threshold (RMS amplitude of the samples in full scale),
+        by default 0.01
+    frame_duration : float, optional
+        Duration of an envelope frame (s), by default 0.002
+    freq_range : Tuple[float, float], optional
+        Frequency band (Hz) of a spectral envelope, by default the
+        amplitude envelope of the whole band is used. A band above the
+        cage and rig noise makes detection more robust, at the cost of an
+        FFT per frame.
+    min_gap : float, optional
+        Shortest silence between two syllables (s); syllables separated by
+        shorter gaps are merged, by default 0.005
+    min_duration : float, optional
+        Shortest syllable (s), by default 0.01
+    """
+
+    def __init__(
+        self,
+        sample_rate: int,
+        threshold: float = 0.01,
+        frame_duration: float = 0.002,
+        freq_range: Optional[Tuple[float, float]] = None,
+        min_gap: float = 0.005,
+        min_duration: float = 0.01,
+    ):
+        self.sample_rate = sample_rate
+        self.threshold = threshold
+        self.frame_length = max(int(round(frame_duration * sample_rate)), 1)
+        self.freq_range = freq_range
+        self.min_gap = int(np.ceil(min_gap * sample_rate / self.frame_length))
+        self.min_duration = int(np.ceil(min_duration * sample_rate / self.frame_length))
+
+        self._band = None
+        if freq_range is not None:
+            freqs = np.fft.rfftfreq(self.frame_length, 1 / sample_rate)
+            self._band = (freqs >= freq_range[0]) & (freqs <= freq_range[1])
+        self.reset()
+
+    def reset(self) -> None:
+        """Discard the detection state, to start a new recording."""
+        self._remainder = np.empty(0, dtype=np.float32)
+        self._nb_frames = 0
+        self._open_onset = None  # frame of the syllable still above threshold
+        self._pending = None  # last syllable, until no later one can merge
+
+    def get_envelope(self, samples: np.ndarray) -> np.ndarray:
+        """
+        Calculate the envelope of whole frames of samples.
+
+        Parameters
+        ----------
+        samples : np.ndarray
+            Mono samples, a multiple of ``frame_length`` long
+
+        Returns
+        -------
+        np.ndarray
+            RMS amplitude of each frame (within ``freq_range`` if set)
+        """
+        frames = samples.reshape(-1, self.frame_length)
+        if self._band is None:
+            return np.sqrt(np.mean(np.square(frames, dtype=np.float64), axis=1))
+        # Parseval: band power from the one-sided spectrum
+        power = np.abs(np.fft.rfft(frames, axis=1)[:, self._band]) ** 2
+        return np.sqrt(2 * power.sum(axis=1)) / self.frame_length
+
+    def update(self, block: np.ndarray) -> Dict[str, np.ndarray]:
+        """
+        Add a block of samples.
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Samples, of shape (n_samples,) or (n_samples, n_channels);
+            channels are averaged
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            Segments completed by this block: onset, offset and duration (s)
+        """
+        block = np.asarray(block, dtype=np.float32)
+        if block.ndim == 2:
+            block = block.mean(axis=1)
+        samples = np.concatenate((self._remainder, block))
+        nb_frames = samples.size // self.frame_length
+        self._remainder = samples[nb_frames * self.frame_length :]
+        if not nb_frames:
+            return _make_table(np.empty(0), np.empty(0))
+
+        is_above = self.get_envelope(samples[: nb_frames * self.frame_length])
+        is_above = is_above > self.threshold
+        was_above = np.concatenate(([self._open_onset is not None], is_above[:-1]))
+        first_frame = self._nb_frames
+        self._nb_frames += nb_frames
+
+        onsets = np.flatnonzero(is_above & ~was_above) + first_frame
+        offsets = np.flatnonzero(~is_above & was_above) + first_frame
+        if self._open_onset is not None:
+            onsets = np.concatenate(([self._open_onset], onsets))
+        self._open_onset = None
+        if is_above[-1]:
+            self._open_onset, onsets = onsets[-1], onsets[:-1]
+        return self._merge(onsets, offsets)
+
+    def finish(self) -> Dict[str, np.ndarray]:
+        """
+        Close the recording.
+
+        A syllable still above threshold ends at the last whole frame; the
+        samples of a trailing partial frame are dropped.
+
+        Returns
+        -------
+        Dict[str, np.ndarray]
+            The remaining segments
+        """
+        onsets, offsets = np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+        if self._open_onset is not None:
+            onsets, offsets = np.array([self._open_onset]), np.array([self._nb_frames])
+            self._open_onset = None
+        table = self._merge(onsets, offsets, is_final=True)
+        self.reset()
+        return table
+
+    def _merge(
+        self, onsets: np.ndarray, offsets: np.ndarray, is_final: bool = False
+    ) -> Dict[str, np.ndarray]:
+        """Merge close syllables and return those that are complete."""
+        if self._pending is not None:
+            onsets = np.concatenate(([self._pending[0]], onsets))
+            offsets = np.concatenate(([self._pending[1]], offsets))
+            self._pending = None
+
+        if onsets.size:
+            is_gap = onsets[1:] - offsets[:-1] >= self.min_gap
+            onsets = onsets[np.concatenate(([True], is_gap))]
+            offsets = offsets[np.concatenate((is_gap, [True]))]
+
+        # A syllable close to the open one becomes part of it
+        if (
+            self._open_onset is not None
+            and onsets.size
+            and self._open_onset - offsets[-1] < self.min_gap
+        ):
+            self._open_onset, onsets, offsets = onsets[-1], onsets[:-1], offsets[:-1]
+
+        # The last syllable waits until a later onset can no longer merge with it
+        if (
+            not is_final
+            and self._open_onset is None
+            and onsets.size
+            and self._nb_frames - offsets[-1] < self.min_gap
+        ):
+            self._pending = (onsets[-1], offsets[-1])
+            onsets, offsets = onsets[:-1], offsets[:-1]
+
+        is_long = offsets - onsets >= self.min_duration
+        frame_time = self.frame_length / self.sample_rate
+        return _make_table(onsets[is_long] * frame_time, offsets[is_long] * frame_time)
+
+
+def segment_blocks(
+    blocks: Iterable[np.ndarray], sample_rate: int, **kwargs
+) -> Dict[str, np.ndarray]:
+    """
+    Segment a recording given as a sequence of sample blocks.
+
+    Parameters
+    ----------
+    blocks : Iterable[np.ndarray]
+        Blocks of samples, in recording order
+    sample_rate : int
+        Sampling rate (Hz)
+    **kwargs
+        Detection parameters (see ``SyllableSegmenter``)
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Segment table: onset, offset and duration (s) of each syllable
+    """
+    segmenter = SyllableSegmenter(sample_rate, **kwargs)
+    tables = [segmenter.update(block) for block in blocks]
+    tables.append(segmenter.finish())
+    return _concat_tables(tables)
+
+
+def segment_file(
+    path: Union[str, Path, BinaryIO], block_size: int = 65536, **kwargs
+) -> Dict[str, np.ndarray]:
+    """
+    Segment an audio file, reading it block by block.
+
+    Parameters
+    ----------
+    path : str, Path or file object
+        Audio file (any format read by soundfile, e.g. WAV or FLAC), or an
+        open file such as a member of a zip archive
+    block_size : int, optional
+        Number of samples read at once, by default 65536
+    **kwargs
+        Detection parameters (see ``SyllableSegmenter``)
+
+    Returns
+    -------
+    Dict[str, np.ndarray]
+        Segment table: onset, offset and duration (s) of each syllable
+    """
+    import soundfile as sf
+
+    with sf.SoundFile(path) as audio:
+        blocks = audio.blocks(blocksize=block_size, dtype="float32", always_2d=True)
+        return segment_blocks(blocks, audio.samplerate, **kwargs)
+
+
+def write_segments(path: Union[str, Path], table: Dict[str, np.ndarray]) -> None:
+    """
+    Write a segment table to a CSV file.
+
+    Parameters
+    ----------
+    path : str or Path
+        Output file
+    table : Dict[str, np.ndarray]
+        Segment table
+    """
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        writer = csv.writer(fh)
+        writer.writerow(SEGMENT_FIELDS)
+        writer.writerows(
+            zip(*(np.round(table[field], 6).tolist() for field in SEGMENT_FIELDS))
+        )
+
+
+def _segment_task(task: Tuple[Path, Path, int, dict]) -> Path:
+    """Segment one file and write its table."""
+    path, output_path, block_size, kwargs = task
+    with profile_stage("segment_file"):
+        write_segments(output_path, segment_file(path, block_size, **kwargs))
+    return output_path
+
+
+def segment_files(
+    paths: Sequence[Union[str, Path]],
+    output_dir: Union[str, Path],
+    n_jobs: int = 1,
+    block_size: int = 65536,
+    **kwargs,
+) -> List[Path]:
+    """
+    Segment many recordings, one file per worker process at a time.
+
+    Each recording is streamed, so the memory of a worker is bounded by
+    ``block_size`` whatever the length of the recording.
+
+    Parameters
+    ----------
+    paths : Sequence[str or Path]
+        Audio files
+    output_dir : str or Path
+        Directory of the segment tables, one ``<file stem>.csv`` per file
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    block_size : int, optional
+        Number of samples read at once, by default 65536
+    **kwargs
+        Detection parameters (see ``SyllableSegmenter``)
+
+    Returns
+    -------
+    List[Path]
+        Paths of the segment tables, in the order of ``paths``
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    tasks = [
+        (Path(path), output_dir / f"{Path(path).stem}.csv", block_size, kwargs)
+        for path in paths
+    ]
+    if n_jobs == 1:
+        return list(map(_segment_task, tasks))
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+        return list(executor.map(_segment_task, tasks))
@@ -0,0 +1,417 @@
+"""
+Command-line entry point for batch syllable network analysis.
+
+Sessions are read from one of:
+
+- a manifest CSV with ``bird``, ``session`` and ``path`` columns (and an
+  optional ``note_seq`` column), each path being a text file of syllables
+- a directory laid out as ``<bird>/<session>.txt``
+- an on-disk corpus (see ``analysis.corpus``), one session per bird and date
+
+Per-session metrics are computed across a process pool and streamed to a
+single CSV or Parquet table. Sessions already in the output are skipped, so
+an interrupted run can be resumed by running the same command again. CSV rows
+are flushed one at a time; Parquet rows are saved in row groups as they
+complete (Parquet output needs pyarrow).
+"""
+
+import argparse
+import csv
+import functools
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+
+from .analysis import (
+    Alphabet,
+    SyllableCorpus,
+    SyllableSequence,
+    get_sequence_metrics,
+    get_trans_matrix,
+)
+from .utils import load_config
+from .utils.profiling import (
+    disable_profiling,
+    enable_profiling,
+    get_profiler,
+    merge_records,
+    profile_stage,
+)
+
+OUTPUT_COLUMNS = [
+    "bird",
+    "session",
+    "nb_syllables",
+    "nb_bouts",
+    "trans_entropy",
+    "sequence_linearity",
+    "sequence_consistency",
+    "song_stereotypy",
+]
+
+# A session task: bird, session, source kind, source path, note sequence and
+# the [start, stop) range of the session bouts in a corpus
+Task = Tuple[str, str, str, str, str, Optional[Tuple[int, int]]]
+
+# Corpora opened by a worker, by path
+_corpora = {}
+
+
+def find_sessions(input_path: Path, note_seq: Union[str, Alphabet]) -> List[Task]:
+    """
+    List the sessions to analyze.
+
+    Parameters
+    ----------
+    input_path : Path
+        Manifest CSV, session directory or corpus directory
+    note_seq : str or Alphabet
+        Default note sequence
+
+    Returns
+    -------
+    List[Task]
+        One task per session
+    """
+    if input_path.is_file():
+        with open(input_path, newline="", encoding="utf-8") as fh:
+            return [
+                (
+                    row["bird"],
+                    row["session"],
+                    "text",
+                    str(input_path.parent / row["path"]),
+                    row.get("note_seq") or note_seq,
+                    None,
+                )
+                for row in csv.DictReader(fh)
+            ]
+
+    if (input_path / "meta.json").exists():
+        # Bouts are stored sorted by bird and date, so each session is one
+        # range of bouts, found in a single pass over the index
+        corpus = SyllableCorpus(input_path)
+        birds = np.asarray(corpus.bouts["bird"])
+        dates = np.asarray(corpus.bouts["date"])
+        is_new = (birds[1:] != birds[:-1]) | (dates[1:] != dates[:-1])
+        starts = np.concatenate(([0], np.flatnonzero(is_new) + 1))[: birds.size]
+        stops = np.append(starts[1:], birds.size)
+        keys = list(zip(birds[starts].tolist(), dates[starts].tolist()))
+        if len(set(keys)) != len(keys):
+            raise ValueError("Corpus bouts are not grouped by bird and date")
+        return [
+            (bird, date, "corpus", str(input_path), corpus.note_seq, (start, stop))
+            for (bird, date), start, stop in zip(keys, starts.tolist(), stops.tolist())
+        ]
+
+    return [
+        (path.parent.name, path.stem, "text", str(path), note_seq, None)
+        for path in sorted(input_path.glob("*/*.txt"))
+    ]
+
+
+def analyze_session(task: Task, normalize: bool = False) -> Dict[str, object]:
+    """
+    Compute the metrics of a single session.
+
+    Parameters
+    ----------
+    task : Task
+        Session task (see ``find_sessions``)
+    normalize : bool, optional
+        Whether to normalize the transition matrix, by default False
+
+    Returns
+    -------
+    Dict[str, object]
+        Output row
+    """
+    bird, session, kind, source, note_seq, bout_range = task
+    with profile_stage("load_session"):
+        if kind == "corpus":
+            if source not in _corpora:
+                _corpora[source] = SyllableCorpus(source)
+            syllables = _corpora[source].get_sequence(np.arange(*bout_range))
+        else:
+            syllables = Path(source).read_text(encoding="utf-8").strip()
+            # Encoded once, so that multi-character labels count as one syllable
+            syllables = SyllableSequence.from_string(syllables, note_seq)
+    # A trailing bout without stop syllable counts as a bout in both modes
+    nb_bouts = syllables.nb_bouts
+
+    trans_matrix = get_trans_matrix(syllables, note_seq, normalize=normalize)
+    metrics = get_sequence_metrics(note_seq, trans_matrix)
+    return {
+        "bird": bird,
+        "session": session,
+        "nb_syllables": len(syllables),
+        "nb_bouts": nb_bouts,
+        **{key: float(value) for key, value in metrics.items()},
+    }
+
+
+def _analyze_session_normalized(task: Task) -> Dict[str, object]:
+    return analyze_session(task, normalize=True)
+
+
+def _init_profiling(trace_memory: bool) -> None:
+    enable_profiling(trace_memory=trace_memory)
+
+
+def _run_profiled(func, task: Task) -> Tuple[Dict[str, object], list]:
+    """Analyze a session in a worker and send its profiling records back."""
+    profiler = get_profiler()
+    profiler.clear()
+    row = func(task)
+    return row, profiler.records
+
+
+def _import_pyarrow():
+    """Import pyarrow, needed for Parquet tables only."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError(
+            "Parquet output requires pyarrow: install it with "
+            "`pip install syllable_network_analysis[parquet]`, or write a .csv table"
+        ) from error
+    return pa, pq
+
+
+def _get_parquet_parts(output_path: Path) -> List[Path]:
+    """Row groups of a Parquet table written but not merged yet."""
+    parts_dir = output_path.with_name(output_path.name + ".parts")
+    return sorted(parts_dir.glob("part-*.parquet"))
+
+
+def read_done_sessions(output_path: Path) -> set:
+    """Get the (bird, session) keys already in an output table."""
+    if output_path.suffix == ".parquet":
+        _, pq = _import_pyarrow()
+        paths = [output_path] if output_path.exists() else []
+        done = set()
+        for path in paths + _get_parquet_parts(output_path):
+            table = pq.read_table(path, columns=["bird", "session"])
+            done.update(zip(table["bird"].to_pylist(), table["session"].to_pylist()))
+        return done
+    if not output_path.exists():
+        return set()
+    with open(output_path, newline="", encoding="utf-8") as fh:
+        return {(row["bird"], row["session"]) for row in csv.DictReader(fh)}
+
+
+class _CsvWriter:
+    """Append rows to a CSV table, flushing each one."""
+
+    def __init__(self, path: Path):
+        is_new = not path.exists() or not path.stat().st_size
+        self._fh = open(path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._fh, fieldnames=OUTPUT_COLUMNS)
+        if is_new:
+            self._writer.writeheader()
+
+    def write(self, row: Dict[str, object]) -> None:
+        self._writer.writerow(row)
+        self._fh.flush()
+
+    def close(self) -> None:
+        self._fh.close()
+
+
+class _ParquetWriter:
+    """
+    Write rows to a Parquet table, keeping previous rows.
+
+    Each completed row group is written to its own file in
+    ``<table>.parts/`` as soon as it fills up, so a killed run keeps the
+    sessions done so far. The parts are merged into the table on close (or
+    by the next run).
+    """
+
+    def __init__(self, path: Path, row_group_size: int = 100):
+        self._pa, self._pq = _import_pyarrow()
+        self._path = path
+        self._parts_dir = path.with_name(path.name + ".parts")
+        self._parts_dir.mkdir(exist_ok=True)
+        self._nb_parts = len(_get_parquet_parts(path))
+        self._row_group_size = row_group_size
+        self._rows = []
+
+    def write(self, row: Dict[str, object]) -> None:
+        self._rows.append(row)
+        if len(self._rows) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._rows:
+            return
+        part_path = self._parts_dir / f"part-{self._nb_parts:06d}.parquet"
+        tmp_path = part_path.with_suffix(".tmp")
+        self._pq.write_table(self._pa.Table.from_pylist(self._rows), tmp_path)
+        os.replace(tmp_path, part_path)
+        self._nb_parts += 1
+        self._rows = []
+
+    def close(self) -> None:
+        self._flush()
+        parts = _get_parquet_parts(self._path)
+        if parts:
+            # Streamed one row group at a time into a new table
+            paths = ([self._path] if self._path.exists() else []) + parts
+            tmp_path = self._path.with_name(f"{self._path.name}.tmp{os.getpid()}")
+            schema = self._pq.read_schema(paths[0])
+            with self._pq.ParquetWriter(tmp_path, schema) as writer:
+                for path in paths:
+                    writer.write_table(self._pq.read_table(path).cast(schema))
+            os.replace(tmp_path, self._path)
+            for part_path in parts:
+                part_path.unlink()
+        for tmp_path in self._parts_dir.glob("*.tmp"):  # left by a killed run
+            tmp_path.unlink()
+        self._parts_dir.rmdir()
+
+
+def run_batch(
+    tasks: Sequence[Task],
+    output_path: Path,
+    n_jobs: int = 1,
+    normalize: bool = False,
+    chunksize: int = 16,
+) -> int:
+    """
+    Analyze sessions across a process pool and stream the results.
+
+    Parameters
+    ----------
+    tasks : Sequence[Task]
+        Sessions to analyze (see ``find_sessions``)
+    output_path : Path
+        Output table (.csv or .parquet)
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    normalize : bool, optional
+        Whether to normalize the transition matrices, by default False
+    chunksize : int, optional
+        Number of sessions sent to a worker at once, by default 16
+
+    Returns
+    -------
+    int
+        Number of sessions analyzed
+    """
+    done = read_done_sessions(output_path)
+    tasks = [task for task in tasks if (task[0], task[1]) not in done]
+    if not tasks:
+        return 0
+
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    if output_path.suffix == ".parquet":
+        writer = _ParquetWriter(output_path)
+    else:
+        writer = _CsvWriter(output_path)
+    func = _analyze_session_normalized if normalize else analyze_session
+    profiler = get_profiler()
+
+    try:
+        if n_jobs == 1:
+            for row in map(func, tasks):
+                writer.write(row)
+        elif profiler is None:
+            with ProcessPoolExecutor(max_workers=n_jobs) as executor:
+                for row in executor.map(func, tasks, chunksize=chunksize):
+                    writer.write(row)
+        else:
+            # Workers profile their own calls and return the records
+            with ProcessPoolExecutor(
+                max_workers=n_jobs,
+                initializer=_init_profiling,
+                initargs=(profiler.trace_memory,),
+            ) as executor:
+                for row, records in executor.map(
+                    functools.partial(_run_profiled, func), tasks, chunksize=chunksize
+                ):
+                    writer.write(row)
+                    merge_records(records)
+    finally:
+        writer.close()
+    return len(tasks)
+
+
+def _parse_args(argv: Optional[Sequence[str]]) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Batch syllable network analysis of many birds and sessions."
+    )
+    parser.add_argument(
+        "input", type=Path, help="manifest CSV, session directory or corpus directory"
+    )
+    parser.add_argument("output", type=Path, help="output table (.csv or .parquet)")
+    parser.add_argument(
+        "--config",
+        type=Path,
+        required=True,
+        help="configuration file (e.g. configs/config.yaml of the repository)",
+    )
+    parser.add_argument(
+        "--note-seq", help="note sequence, by default built from the configuration"
+    )
+    parser.add_argument(
+        "-j",
+        "--n-jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="number of worker processes (default: all cores)",
+    )
+    parser.add_argument(
+        "--profile",
+        type=Path,
+        help="write a timing report of each stage (.json or .csv)",
+    )
+    parser.add_argument(
+        "--trace-memory",
+        action="store_true",
+        help="also record peak allocations in the timing report (slower)",
+    )
+    args = parser.parse_args(argv)
+    if not args.config.is_file():
+        parser.error(f"configuration file {args.config} not found")
+    return args
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """Run the batch analysis from the command line."""
+    args = _parse_args(argv)
+    profiler = None
+    if args.profile is not None:
+        profiler = enable_profiling(trace_memory=args.trace_memory)
+    try:
+        config = load_config(args.config)
+        note_seq = args.note_seq or Alphabet.from_config(config)
+        analysis_config = config.get("analysis", {})
+        normalize = bool(analysis_config.get("normalize_transitions", False))
+
+        with profile_stage("find_sessions"):
+            tasks = find_sessions(args.input, note_seq)
+        with profile_stage("run_batch", size=len(tasks)):
+            nb_done = run_batch(
+                tasks, args.output, n_jobs=args.n_jobs, normalize=normalize
+            )
+    finally:
+        if profiler is not None:
+            disable_profiling()
+    print(
+        f"Analyzed {nb_done} of {len(tasks)} sessions "
+        f"({len(tasks) - nb_done} already done) -> {args.output}"
+    )
+    if profiler is not None:
+        profiler.save(args.profile)
+        print(profiler.format_summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
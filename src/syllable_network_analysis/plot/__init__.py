@@ -2,6 +2,7 @@
 Plotting module for syllable network analysis.
 """
 
+from .batch import DiagramJob, render_transition_diagrams
 from .plots import plot_transition_diag
 
-__all__ = ["plot_transition_diag"]
+__all__ = ["plot_transition_diag", "DiagramJob", "render_transition_diagrams"]
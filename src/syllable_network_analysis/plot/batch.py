@@ -0,0 +1,145 @@
+"""
+Batch rendering of transition diagrams.
+"""
+
+import json
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import (
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from ..analysis.cache import get_cache_key
+from .plots import plot_transition_diag
+
+# Hash of the inputs of each rendered figure, stored in the output directory
+MANIFEST_NAME = ".transition_diag_manifest.json"
+
+
+class DiagramJob(NamedTuple):
+    """Inputs of a single transition diagram."""
+
+    name: str
+    note_seq: str
+    syl_network: List[Tuple[int, int, int]]
+    syl_color: Dict[str, str]
+    title: Optional[str] = None
+
+
+# Per-worker figure template, created once by ``_init_worker``
+_template = {}
+
+
+def _init_worker(figsize: Sequence[float]) -> None:
+    """Create the figure reused for every diagram of a worker."""
+    fig = Figure(figsize=figsize)
+    FigureCanvasAgg(fig)
+    _template["fig"] = fig
+    _template["ax"] = fig.add_subplot(1, 1, 1)
+
+
+def _render(job: DiagramJob, path: Path, dpi: int) -> Path:
+    """Draw a diagram on the worker's figure and save it."""
+    fig, ax = _template["fig"], _template["ax"]
+    ax.clear()
+    plot_transition_diag(ax, job.note_seq, job.syl_network, job.syl_color)
+    if job.title:
+        ax.set_title(job.title, fontsize=16)
+    fig.savefig(path, dpi=dpi, bbox_inches="tight")
+    return path
+
+
+def _render_task(task: Tuple[DiagramJob, Path, int]) -> Path:
+    return _render(*task)
+
+
+def render_transition_diagrams(
+    jobs: Iterable[DiagramJob],
+    output_dir: Union[str, Path],
+    n_jobs: int = 1,
+    figsize: Sequence[float] = (10, 10),
+    dpi: int = 300,
+    save_format: str = "png",
+    force: bool = False,
+) -> List[Path]:
+    """
+    Render many transition diagrams with the Agg backend.
+
+    Each worker process draws every figure on the same figure and axes.
+    Figures whose inputs have the same hash as in the last run, and whose
+    file still exists, are skipped.
+
+    Parameters
+    ----------
+    jobs : Iterable[DiagramJob]
+        Diagrams to render, one file per job name
+    output_dir : str or Path
+        Output directory
+    n_jobs : int, optional
+        Number of worker processes, by default 1
+    figsize : Sequence[float], optional
+        Figure size in inches, by default (10, 10)
+    dpi : int, optional
+        Resolution of the saved figures, by default 300
+    save_format : str, optional
+        File format, by default "png"
+    force : bool, optional
+        Whether to render unchanged figures too, by default False
+
+    Returns
+    -------
+    List[Path]
+        Paths of the rendered figures
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = output_dir / MANIFEST_NAME
+    manifest = {}
+    if manifest_path.exists():
+        with open(manifest_path, encoding="utf-8") as fh:
+            manifest = json.load(fh)
+
+    tasks, hashes = [], {}
+    for job in jobs:
+        path = output_dir / f"{job.name}.{save_format}"
+        job_hash = get_cache_key(
+            "transition_diag", tuple(job), tuple(figsize), dpi, save_format
+        )
+        if not force and manifest.get(job.name) == job_hash and path.exists():
+            continue
+        tasks.append((job, path, dpi))
+        hashes[job.name] = job_hash
+
+    # Record the hash of each figure as soon as it is saved, so an interrupted
+    # run does not render it again
+    rendered = []
+    try:
+        if n_jobs == 1:
+            _init_worker(figsize)
+            results = map(_render_task, tasks)
+            for (job, _, _), path in zip(tasks, results):
+                rendered.append(path)
+                manifest[job.name] = hashes[job.name]
+        else:
+            with ProcessPoolExecutor(
+                max_workers=n_jobs, initializer=_init_worker, initargs=(figsize,)
+            ) as executor:
+                results = executor.map(_render_task, tasks, chunksize=8)
+                for (job, _, _), path in zip(tasks, results):
+                    rendered.append(path)
+                    manifest[job.name] = hashes[job.name]
+    finally:
+        _template.clear()
+        with open(manifest_path, "w", encoding="utf-8") as fh:
+            json.dump(manifest, fh, indent=1, sort_keys=True)
+    return rendered
@@ -4,16 +4,26 @@ Plotting functions for syllable network analysis.
 
 import numpy as np
 import matplotlib.pyplot as plt
-from typing import List, Tuple, Dict, Any
+from matplotlib.collections import EllipseCollection, LineCollection
+from typing import TYPE_CHECKING, List, Tuple, Dict, Optional, Union
 
+from ..analysis.core import get_syllable_network
+from ..utils.lazy import is_sparse
+from ..utils.profiling import profiled
 
+if TYPE_CHECKING:
+    import scipy.sparse as sp
+
+
+@profiled(size_arg="syl_network")
 def plot_transition_diag(
     ax: plt.Axes,
     note_seq: str,
-    syl_network: List[Tuple[int, int, int]],
+    syl_network: Union[List[Tuple[int, int, int]], np.ndarray, "sp.spmatrix"],
     syl_color: Dict[str, str],
     syl_circ_size: int = 450,
-    line_width: float = 0.5
+    line_width: float = 0.5,
+    repeat_counts: Optional[np.ndarray] = None,
 ) -> None:
     """
     Plot syllable transition diagram.
@@ -24,23 +34,30 @@ def plot_transition_diag(
         Matplotlib axes object
     note_seq : str
         Note sequence
-    syl_network : List[Tuple[int, int, int]]
-        Syllable network
+    syl_network : List[Tuple[int, int, int]], np.ndarray or sp.spmatrix
+        Syllable network, or a dense or sparse transition matrix
     syl_color : Dict[str, str]
         Color mapping for syllables
     syl_circ_size : int, optional
         Size of syllable circles, by default 450
     line_width : float, optional
         Width of transition lines, by default 0.5
+    repeat_counts : np.ndarray, optional
+        Repeat count distribution (see ``get_repeat_counts``). If given, a
+        repeat loop is drawn once per observed run length of a syllable
+        instead of once per self-transition.
     """
-    import math
+    if isinstance(syl_network, np.ndarray) or is_sparse(syl_network):
+        syl_network = get_syllable_network(syl_network)
+
     np.random.seed(0)
 
     # Set node location
-    theta = np.linspace(-math.pi, math.pi, num=len(note_seq) + 1)
+    theta = np.linspace(-np.pi, np.pi, num=len(note_seq) + 1)
 
-    node_xpos = [math.cos(node) for node in theta]
-    node_ypos = [math.sin(node) for node in theta][::-1]
+    node_xpos = np.cos(theta)
+    node_ypos = np.sin(theta)[::-1]
+    colors = list(syl_color.values())
 
     # Plot the syllable node
     ax.axis('off')
@@ -50,7 +67,7 @@ def plot_transition_diag(
         node_ypos[:-1], 
         s=syl_circ_size, 
         facecolors='w',
-        edgecolors=list(syl_color.values()),
+        edgecolors=colors,
         zorder=2.5,
         linewidth=2.5
     )
@@ -58,8 +75,13 @@ def plot_transition_diag(
     ax.set_ylim([-1.2, 1.2])
 
     circle_size = 0.25  # circle size for the repeat syllable
+    factor = 1.25  # adjust center of the circle for the repeat
 
-    for i, (start_node, end_node, weight) in enumerate(syl_network):
+    # Draw the jitter of every transition instance (in network order, so the
+    # random positions are the same as drawing one artist per instance)
+    segments, segment_colors = [], []
+    loop_centers, loop_colors = [], []
+    for start_node, end_node, weight in syl_network:
         if start_node != end_node:
             start_nodex = node_xpos[start_node] + (np.random.uniform(-1, 1, weight) / 10)
             start_nodey = node_ypos[start_node] + (np.random.uniform(-1, 1, weight) / 10)
@@ -67,48 +89,62 @@ def plot_transition_diag(
             end_nodex = node_xpos[end_node] + (np.random.uniform(-1, 1, weight) / 10)
             end_nodey = node_ypos[end_node] + (np.random.uniform(-1, 1, weight) / 10)
 
-            ax.scatter(start_nodex, start_nodey, s=0, facecolors='k')
-            ax.scatter(end_nodex, end_nodey, s=0, facecolors='k')
-
-            ax.plot(
-                [start_nodex, end_nodex], 
-                [start_nodey, end_nodey], 
-                'k',
-                color=list(syl_color.values())[start_node],
-                linewidth=line_width
+            segments.append(
+                np.stack(
+                    [
+                        np.column_stack([start_nodex, start_nodey]),
+                        np.column_stack([end_nodex, end_nodey]),
+                    ],
+                    axis=1,
+                )
             )
+            segment_colors += [colors[start_node]] * weight
         else:  # repeating syllables
-            factor = 1.25  # adjust center of the circle for the repeat
-            syl_loc = (
-                (np.array(node_xpos) * factor).tolist(), 
-                (np.array(node_ypos) * factor).tolist()
+            if repeat_counts is not None:
+                weight = np.count_nonzero(repeat_counts[start_node, 2:])
+            start_nodex = node_xpos[start_node] * factor + (
+                np.random.uniform(-1, 1, weight) / 8
             )
+            start_nodey = node_ypos[start_node] * factor + (
+                np.random.uniform(-1, 1, weight) / 8
+            )
+            loop_centers.append(np.column_stack([start_nodex, start_nodey]))
+            loop_colors += [colors[start_node]] * weight
 
-            start_nodex = syl_loc[0][start_node] + (np.random.uniform(-1, 1, weight) / 8)
-            start_nodey = syl_loc[1][start_node] + (np.random.uniform(-1, 1, weight) / 8)
-
-            for x, y in zip(start_nodex, start_nodey):
-                circle = plt.Circle(
-                    (x, y), 
-                    circle_size, 
-                    color=list(syl_color.values())[start_node], 
-                    fill=False,
-                    clip_on=False,
-                    linewidth=0.3
-                )
-                ax.add_artist(circle)
-
-        # Set text labeling location
-        factor = 1.7
-        text_loc = (
-            (np.array(node_xpos) * factor).tolist(), 
-            (np.array(node_ypos) * factor).tolist()
+    # One artist for all transitions and one for all repeat loops
+    if segments:
+        ax.add_collection(
+            LineCollection(
+                np.concatenate(segments),
+                colors=segment_colors,
+                linewidths=line_width,
+                zorder=2,
+            ),
+            autolim=False,
+        )
+    if loop_centers:
+        ax.add_collection(
+            EllipseCollection(
+                widths=2 * circle_size,
+                heights=2 * circle_size,
+                angles=0,
+                units='xy',
+                offsets=np.concatenate(loop_centers),
+                offset_transform=ax.transData,
+                facecolors='none',
+                edgecolors=loop_colors,
+                linewidths=0.3,
+                clip_on=False,
+            ),
+            autolim=False,
         )
 
-        for ind, note in enumerate(note_seq):
-            ax.text(
-                text_loc[0][ind], 
-                text_loc[1][ind], 
-                note_seq[ind], 
-                fontsize=15
-            )
\ No newline at end of file
+    # Set text labeling location
+    factor = 1.7
+    for ind, note in enumerate(note_seq):
+        ax.text(
+            node_xpos[ind] * factor, 
+            node_ypos[ind] * factor, 
+            note, 
+            fontsize=15
+        )
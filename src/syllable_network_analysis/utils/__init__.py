@@ -2,6 +2,33 @@
 Utility functions for syllable network analysis.
 """
 
-from .helpers import get_syl_color
+from .helpers import get_note_seq, load_config
+from .metadata import (
+    clear_metadata_cache,
+    get_alphabet,
+    get_syl_color,
+    load_bird_table,
+)
+from .profiling import (
+    Profiler,
+    disable_profiling,
+    enable_profiling,
+    get_profiler,
+    profile_stage,
+    profiled,
+)
 
-__all__ = ["get_syl_color"]
\ No newline at end of file
+__all__ = [
+    "get_syl_color",
+    "load_config",
+    "get_note_seq",
+    "get_alphabet",
+    "load_bird_table",
+    "clear_metadata_cache",
+    "Profiler",
+    "enable_profiling",
+    "disable_profiling",
+    "get_profiler",
+    "profile_stage",
+    "profiled",
+]
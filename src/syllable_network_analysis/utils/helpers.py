@@ -2,58 +2,68 @@
 Helper utility functions for syllable network analysis.
 """
 
-from typing import Dict, Tuple
-import copy
+from pathlib import Path
+from typing import Any, Dict, Union
 
+# Default configuration file of a source checkout; it is not installed with
+# the package, so installed code must be given a configuration file
+DEFAULT_CONFIG_PATH = Path(__file__).resolve().parents[3] / "configs" / "config.yaml"
 
-def get_syl_color(bird_id: str) -> Tuple[str, Dict[str, str]]:
+
+def load_config(path: Union[str, Path] = DEFAULT_CONFIG_PATH) -> Dict[str, Any]:
     """
-    Map colors to each syllable.
-    
+    Load a YAML configuration file.
+
     Parameters
     ----------
-    bird_id : str
-        Bird identifier
-        
+    path : str or Path, optional
+        Path to the configuration file, by default configs/config.yaml of
+        the source checkout
+
     Returns
     -------
-    Tuple[str, Dict[str, str]]
-        Note sequence and color mapping for syllables
+    Dict[str, Any]
+        Configuration
+
+    Raises
+    ------
+    FileNotFoundError
+        If the configuration file does not exist
     """
-    # Note: This function references external dependencies that would need to be
-    # properly imported or refactored based on your specific setup
-    try:
-        from analysis.parameters import sequence_color
-        from database.load import ProjectLoader
-    except ImportError:
-        # Fallback for when dependencies aren't available
-        print("Warning: External dependencies not available. Using default colors.")
-        return "", {}
-    
-    # Load database
-    db = ProjectLoader().load_db()
-    df = db.to_dataframe(
-        f"""SELECT (introNotes || songNote || calls || '*') AS note_sequence, 
-        introNotes, songNote, calls FROM bird WHERE birdID='{bird_id}'"""
-    )
+    import yaml
+
+    if not Path(path).is_file():
+        if Path(path) == DEFAULT_CONFIG_PATH:
+            raise FileNotFoundError(
+                f"Default configuration {path} not found (it is only available "
+                "in a source checkout); pass a configuration file explicitly"
+            )
+        raise FileNotFoundError(f"Configuration file {path} not found")
+
+    with open(path, "r", encoding="utf-8") as fh:
+        return yaml.safe_load(fh)
+
+
+def get_note_seq(config: Dict[str, Any]) -> str:
+    """
+    Build the note sequence from the syllables section of a configuration.
+
+    Notes are ordered as intro notes, song notes, calls and the stop symbol.
+
+    Parameters
+    ----------
+    config : Dict[str, Any]
+        Configuration (see ``load_config``)
 
-    note_seq = df['note_sequence'][0]
-    intro_notes = df['introNotes'][0]
-    song_notes = df['songNote'][0]
-    calls = df['calls'][0]
-
-    syl_color = dict()
-    sequence_color2 = copy.deepcopy(sequence_color)
-
-    for i, note in enumerate(note_seq[:-1]):
-        if note in song_notes:
-            syl_color[note] = sequence_color2['song_note'].pop(0)
-        elif note in intro_notes:
-            syl_color[note] = sequence_color2['intro'].pop(0)
-        elif note in calls:
-            syl_color[note] = sequence_color2['call'].pop(0)
-        else:
-            syl_color[note] = sequence_color2['intro'].pop(0)
-    syl_color['*'] = 'y'  # syllable stop
-
-    return note_seq, syl_color
\ No newline at end of file
+    Returns
+    -------
+    str
+        Note sequence
+    """
+    syllables = config["syllables"]
+    return "".join(
+        list(syllables.get("intro_notes", []))
+        + list(syllables.get("song_notes", []))
+        + list(syllables.get("calls", []))
+        + [syllables.get("stop_symbol", "*")]
+    )
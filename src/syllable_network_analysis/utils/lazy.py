@@ -0,0 +1,28 @@
+"""
+Helpers to keep heavy optional modules out of the import path.
+"""
+
+import sys
+from typing import Any
+
+
+def is_sparse(obj: Any) -> bool:
+    """
+    Check whether an object is a SciPy sparse matrix or array.
+
+    SciPy is only imported if it has already been loaded, since no sparse
+    object can exist otherwise.
+
+    Parameters
+    ----------
+    obj : Any
+        Object to check
+
+    Returns
+    -------
+    bool
+        Whether ``obj`` is sparse
+    """
+    if "scipy.sparse" not in sys.modules:
+        return False
+    return sys.modules["scipy.sparse"].issparse(obj)
@@ -0,0 +1,231 @@
+"""
+Cached resolution of syllable alphabets and colors.
+
+Alphabets come from the syllables section of a configuration, or from a
+bird-metadata table (``bird`` table with ``birdID``, ``introNotes``,
+``songNote`` and ``calls`` columns, as in the lab SQLite database). The
+table is loaded in bulk with a single query and kept for the lifetime of
+the process, so resolving the colors of one figure costs a dictionary
+lookup in batch jobs.
+
+There is no default configuration: installed code has no configs/ folder.
+Without a configuration, alphabets come from the bird table only, with the
+default stop symbol and colors.
+"""
+
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Optional, Sequence, Tuple, Union
+
+from .helpers import load_config
+
+if TYPE_CHECKING:
+    import sqlite3
+
+    from ..analysis.alphabet import Alphabet
+
+# Bird-metadata source: path to a SQLite file, or an open DB-API connection
+Database = Union[str, Path, "sqlite3.Connection"]
+
+# Color of the stop symbol when the configuration has no stop color
+DEFAULT_STOP_COLOR = "y"
+
+# Per-process memos: loaded configurations, bird tables and alphabets
+_configs: Dict[str, Dict[str, Any]] = {}
+_bird_tables: Dict[Hashable, Dict[str, Dict[str, str]]] = {}
+_alphabets: Dict[Hashable, "Alphabet"] = {}
+
+
+def clear_metadata_cache() -> None:
+    """Forget the configurations, bird tables and alphabets loaded so far."""
+    _configs.clear()
+    _bird_tables.clear()
+    _alphabets.clear()
+
+
+def _get_config(config: Union[None, str, Path, Dict[str, Any]]) -> Dict[str, Any]:
+    """Get a configuration, loading (once) a configuration file."""
+    if config is None:
+        return {}
+    if isinstance(config, dict):
+        return config
+    path = str(Path(config).resolve())
+    if path not in _configs:
+        _configs[path] = load_config(path)
+    return _configs[path]
+
+
+def _get_source_key(database: Database) -> Hashable:
+    """Get the memo key of a bird-metadata source."""
+    if isinstance(database, (str, Path)):
+        return str(Path(database).resolve())
+    return database
+
+
+def load_bird_table(
+    database: Database, bird_ids: Optional[Sequence[str]] = None
+) -> Dict[str, Dict[str, str]]:
+    """
+    Load the syllable labels of birds from a bird-metadata table.
+
+    The whole table is read with a single query the first time a source is
+    used; later calls are served from memory.
+
+    Parameters
+    ----------
+    database : str, Path or sqlite3.Connection
+        SQLite database file, or an open connection (e.g. an in-memory
+        database standing in for the lab database)
+    bird_ids : Sequence[str], optional
+        Only load these birds (with a single parameterized query, not
+        memoized), by default all birds
+
+    Returns
+    -------
+    Dict[str, Dict[str, str]]
+        Per bird ID: intro_notes, song_notes and calls
+    """
+    key = _get_source_key(database)
+    if bird_ids is None and key in _bird_tables:
+        return _bird_tables[key]
+
+    query = "SELECT birdID, introNotes, songNote, calls FROM bird"
+    params = ()
+    if bird_ids is not None:
+        bird_ids = list(bird_ids)
+        query += f" WHERE birdID IN ({', '.join('?' * len(bird_ids))})"
+        params = tuple(bird_ids)
+
+    if isinstance(database, (str, Path)):
+        import sqlite3
+
+        connection = sqlite3.connect(
+            f"{Path(key).as_uri()}?mode=ro", uri=True
+        )
+    else:
+        connection = database
+    try:
+        rows = connection.execute(query, params).fetchall()
+    finally:
+        if connection is not database:
+            connection.close()
+
+    bird_table = {
+        bird_id: {
+            "intro_notes": intro_notes or "",
+            "song_notes": song_notes or "",
+            "calls": calls or "",
+        }
+        for bird_id, intro_notes, song_notes, calls in rows
+    }
+    if bird_ids is None:
+        _bird_tables[key] = bird_table
+    return bird_table
+
+
+def get_alphabet(
+    bird_id: Optional[str] = None,
+    database: Optional[Database] = None,
+    config: Union[None, str, Path, Dict[str, Any]] = None,
+) -> "Alphabet":
+    """
+    Resolve the syllable alphabet of a bird.
+
+    Parameters
+    ----------
+    bird_id : str, optional
+        Bird identifier, looked up in ``database``
+    database : str, Path or sqlite3.Connection, optional
+        Bird-metadata source, by default the syllables section of the
+        configuration is used for all birds
+    config : str, Path or Dict[str, Any], optional
+        Configuration or configuration file (its stop symbol is also used
+        for database alphabets), required without ``database``
+
+    Returns
+    -------
+    Alphabet
+        Syllable alphabet
+
+    Raises
+    ------
+    ValueError
+        If neither a configuration nor a bird table and bird ID are given,
+        or if the bird is not in the bird table
+    """
+    from ..analysis.alphabet import Alphabet
+
+    use_database = database is not None and bird_id is not None
+    if config is None and not use_database:
+        raise ValueError(
+            "A configuration, or a bird table and bird ID, is required to "
+            "resolve an alphabet"
+        )
+    if not isinstance(config, dict):
+        key = (
+            _get_source_key(database) if use_database else None,
+            bird_id if use_database else None,
+            str(config),
+        )
+        if key in _alphabets:
+            return _alphabets[key]
+
+    syllables = _get_config(config).get("syllables", {})
+    if use_database:
+        bird_table = load_bird_table(database)
+        if bird_id not in bird_table:
+            raise ValueError(f"Bird {bird_id!r} not found in the bird table")
+        alphabet = Alphabet(
+            stop_symbol=syllables.get("stop_symbol", "*"), **bird_table[bird_id]
+        )
+    else:
+        alphabet = Alphabet.from_config(syllables)
+
+    if not isinstance(config, dict):
+        _alphabets[key] = alphabet
+    return alphabet
+
+
+def get_syl_color(
+    bird_id: Optional[str] = None,
+    database: Optional[Database] = None,
+    config: Union[None, str, Path, Dict[str, Any]] = None,
+) -> Tuple[str, Dict[str, str]]:
+    """
+    Map colors to each syllable.
+
+    Notes take the colors of their category (``motif`` for song notes,
+    ``intro`` and ``call``) in the colors section of the configuration, in
+    note sequence order; a palette is reused from its start when a
+    category has more notes than colors.
+
+    Parameters
+    ----------
+    bird_id : str, optional
+        Bird identifier, looked up in ``database``
+    database : str, Path or sqlite3.Connection, optional
+        Bird-metadata source, by default the syllables section of the
+        configuration is used
+    config : str, Path or Dict[str, Any], optional
+        Configuration or configuration file, required without ``database``;
+        without one, the default colors are used
+
+    Returns
+    -------
+    Tuple[str, Dict[str, str]]
+        Note sequence and color mapping for syllables
+    """
+    alphabet = get_alphabet(bird_id, database, config)
+    colors = _get_config(config).get("colors", {})
+    palettes = {
+        "intro": colors.get("intro") or ["black"],
+        "song": colors.get("motif") or ["red"],
+        "call": colors.get("call") or ["teal"],
+        "stop": colors.get("stop") or [DEFAULT_STOP_COLOR],
+    }
+
+    syl_color, used = {}, dict.fromkeys(palettes, 0)
+    for symbol, category in zip(alphabet.symbols, alphabet.categories):
+        palette = palettes[category]
+        syl_color[symbol] = palette[used[category] % len(palette)]
+        used[category] += 1
+    return alphabet.note_seq, syl_color
@@ -0,0 +1,301 @@
+"""
+Opt-in timing and memory instrumentation of the analysis pipeline.
+
+Instrumented functions and stages record their wall time, input size and,
+optionally, peak allocations while profiling is enabled. While it is
+disabled, an instrumented call costs a single global lookup.
+"""
+
+import contextlib
+import csv
+import functools
+import json
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+
+# Columns of a profiling record
+RECORD_FIELDS = ["stage", "parent", "wall_time", "size", "peak_memory"]
+
+# Active profiler, None when profiling is disabled
+_profiler = None
+
+
+def _get_size(obj: Any) -> Optional[int]:
+    """Get the size of a stage input (stored entries, or length)."""
+    if hasattr(obj, "nnz"):
+        return int(obj.nnz)
+    if hasattr(obj, "size") and isinstance(getattr(obj, "size"), int):
+        return obj.size
+    try:
+        return len(obj)
+    except TypeError:
+        return None
+
+
+class Profiler:
+    """
+    Recorder of per-stage profiling records.
+
+    Parameters
+    ----------
+    trace_memory : bool, optional
+        Whether to record the peak memory allocated in each stage with
+        ``tracemalloc``, by default False (it slows down allocations)
+    """
+
+    def __init__(self, trace_memory: bool = False):
+        self.trace_memory = trace_memory
+        self.records = []
+        self._stack = []  # open stages: [name, start memory, max memory]
+
+    @contextlib.contextmanager
+    def stage(self, name: str, size: Optional[int] = None) -> Iterator[None]:
+        """
+        Record a stage.
+
+        Parameters
+        ----------
+        name : str
+            Stage name
+        size : int, optional
+            Size of the stage input, by default unknown
+        """
+        parent = self._stack[-1][0] if self._stack else None
+        frame = [name, 0, 0]
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            current, peak = tracemalloc.get_traced_memory()
+            self._reset_peak(peak)
+            frame[1:] = [current, current]
+        self._stack.append(frame)
+
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            wall_time = time.perf_counter() - start_time
+            self._stack.pop()
+            peak_memory = None
+            if self.trace_memory:
+                frame[2] = max(frame[2], tracemalloc.get_traced_memory()[1])
+                peak_memory = frame[2] - frame[1]
+                self._reset_peak(frame[2])
+            self.records.append(
+                {
+                    "stage": name,
+                    "parent": parent,
+                    "wall_time": wall_time,
+                    "size": size,
+                    "peak_memory": peak_memory,
+                }
+            )
+
+    def _reset_peak(self, peak: int) -> None:
+        """Carry the peak so far over to the open stages, then reset it."""
+        for frame in self._stack:
+            frame[2] = max(frame[2], peak)
+        if hasattr(tracemalloc, "reset_peak"):  # Python >= 3.9
+            tracemalloc.reset_peak()
+
+    def clear(self) -> None:
+        """Discard all records."""
+        self.records = []
+
+    def get_summary(self) -> Dict[str, Dict[str, float]]:
+        """
+        Aggregate the records of each stage.
+
+        Returns
+        -------
+        Dict[str, Dict[str, float]]
+            Per stage, in order of first call: calls, total_time,
+            mean_time, max_time, total_size and max_peak_memory
+        """
+        summary = {}
+        for record in self.records:
+            stats = summary.setdefault(
+                record["stage"],
+                {
+                    "calls": 0,
+                    "total_time": 0.0,
+                    "mean_time": 0.0,
+                    "max_time": 0.0,
+                    "total_size": 0,
+                    "max_peak_memory": None,
+                },
+            )
+            stats["calls"] += 1
+            stats["total_time"] += record["wall_time"]
+            stats["max_time"] = max(stats["max_time"], record["wall_time"])
+            stats["total_size"] += record["size"] or 0
+            if record["peak_memory"] is not None:
+                stats["max_peak_memory"] = max(
+                    stats["max_peak_memory"] or 0, record["peak_memory"]
+                )
+        for stats in summary.values():
+            stats["mean_time"] = stats["total_time"] / stats["calls"]
+        return summary
+
+    def format_summary(self) -> str:
+        """
+        Format the summary as a text table, slowest stages first.
+
+        Returns
+        -------
+        str
+            Summary table
+        """
+        summary = self.get_summary()
+        header = (
+            f"{'stage':<32} {'calls':>8} {'total (s)':>11} {'mean (ms)':>11} "
+            f"{'size':>12} {'peak (MB)':>10}"
+        )
+        lines = [header, "-" * len(header)]
+        for stage, stats in sorted(
+            summary.items(), key=lambda item: -item[1]["total_time"]
+        ):
+            peak = stats["max_peak_memory"]
+            peak = "" if peak is None else f"{peak / 2**20:.1f}"
+            lines.append(
+                f"{stage:<32} {stats['calls']:>8} {stats['total_time']:>11.3f} "
+                f"{1000 * stats['mean_time']:>11.3f} {stats['total_size']:>12} "
+                f"{peak:>10}"
+            )
+        return "\n".join(lines)
+
+    def save(self, path: Union[str, Path]) -> None:
+        """
+        Export the records and summary.
+
+        Parameters
+        ----------
+        path : str or Path
+            Output file: ``.csv`` for one row per record, otherwise JSON
+            with the records and the per-stage summary
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.suffix == ".csv":
+            with open(path, "w", newline="", encoding="utf-8") as fh:
+                writer = csv.DictWriter(fh, fieldnames=RECORD_FIELDS)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, "w", encoding="utf-8") as fh:
+                json.dump(
+                    {"records": self.records, "summary": self.get_summary()},
+                    fh,
+                    indent=1,
+                )
+
+
+def enable_profiling(trace_memory: bool = False) -> Profiler:
+    """
+    Turn on profiling of the instrumented functions.
+
+    Parameters
+    ----------
+    trace_memory : bool, optional
+        Whether to record peak allocations, by default False
+
+    Returns
+    -------
+    Profiler
+        The active profiler
+    """
+    global _profiler
+    _profiler = Profiler(trace_memory=trace_memory)
+    return _profiler
+
+
+def disable_profiling() -> None:
+    """Turn off profiling (records of the last profiler are kept in it)."""
+    global _profiler
+    if _profiler is not None and _profiler.trace_memory and tracemalloc.is_tracing():
+        tracemalloc.stop()
+    _profiler = None
+
+
+def get_profiler() -> Optional[Profiler]:
+    """Get the active profiler, None if profiling is disabled."""
+    return _profiler
+
+
+@contextlib.contextmanager
+def profile_stage(name: str, size: Optional[int] = None) -> Iterator[None]:
+    """
+    Record a stage of a pipeline when profiling is enabled.
+
+    Parameters
+    ----------
+    name : str
+        Stage name
+    size : int, optional
+        Size of the stage input, by default unknown
+    """
+    profiler = _profiler
+    if profiler is None:
+        yield
+        return
+    with profiler.stage(name, size):
+        yield
+
+
+def profiled(
+    stage: Optional[str] = None, size_arg: Union[int, str] = 0
+) -> Callable[[Callable], Callable]:
+    """
+    Record the calls of a function when profiling is enabled.
+
+    Parameters
+    ----------
+    stage : str, optional
+        Stage name, by default the function name
+    size_arg : int or str, optional
+        Position or name of the argument whose size is recorded,
+        by default the first argument
+    """
+
+    def decorator(func: Callable) -> Callable:
+        name = stage or func.__name__
+        code = func
+        while hasattr(code, "__wrapped__"):  # e.g. a cached function
+            code = code.__wrapped__
+        code = code.__code__
+        params = list(code.co_varnames[: code.co_argcount + code.co_kwonlyargcount])
+        if isinstance(size_arg, str):
+            position, keyword = params.index(size_arg), size_arg
+        else:
+            position, keyword = size_arg, params[size_arg]
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            profiler = _profiler
+            if profiler is None:
+                return func(*args, **kwargs)
+            if position < len(args):
+                size = _get_size(args[position])
+            else:
+                size = _get_size(kwargs[keyword]) if keyword in kwargs else None
+            with profiler.stage(name, size):
+                return func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def merge_records(records: List[Dict[str, Any]]) -> None:
+    """
+    Add records made elsewhere (e.g. in worker processes) to the profiler.
+
+    Parameters
+    ----------
+    records : List[Dict[str, Any]]
+        Profiling records
+    """
+    if _profiler is not None:
+        _profiler.records.extend(records)
@@ -0,0 +1,116 @@
+"""
+Tests for the alphabet module.
+"""
+
+import pickle
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    Alphabet,
+    SyllableCorpus,
+    SyllableSequence,
+    get_trans_matrices,
+    get_trans_matrix,
+    write_corpus,
+)
+from syllable_network_analysis.analysis.cache import get_cache_key
+from syllable_network_analysis.cli import analyze_session
+from syllable_network_analysis.utils import load_config
+
+
+class TestAlphabet:
+    """Test class for the syllable alphabet."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiiixbb*"
+    alphabet = Alphabet(intro_notes="ik", song_notes="abcdj", calls="m")
+
+    def test_symbols(self):
+        """Test symbol order, categories and lookups."""
+        assert self.alphabet.note_seq == "ikabcdjm*"
+        assert len(self.alphabet) == 9
+        assert self.alphabet[-1] == "*"
+        assert self.alphabet.index("a") == 2
+        assert self.alphabet.index("x") == -1
+        assert "m" in self.alphabet and "x" not in self.alphabet
+        np.testing.assert_array_equal(
+            self.alphabet.get_category_mask("intro"), [1, 1, 0, 0, 0, 0, 0, 0, 0]
+        )
+        with pytest.raises(ValueError):
+            Alphabet(song_notes="aba")
+
+    def test_from_config(self):
+        """Test building the alphabet of the configuration file."""
+        alphabet = Alphabet.from_config(load_config())
+        assert alphabet.note_seq == "iabcdm*"
+        assert alphabet.categories == ("intro",) + ("song",) * 4 + ("call", "stop")
+        assert Alphabet(**alphabet.to_dict()) == alphabet
+        assert pickle.loads(pickle.dumps(alphabet)) == alphabet
+
+    def test_encode(self):
+        """Test that encoding matches the note sequence lookup."""
+        note_seq = self.alphabet.note_seq
+        expected = [note_seq.find(syllable) for syllable in self.syllables]
+        np.testing.assert_array_equal(self.alphabet.encode(self.syllables), expected)
+        np.testing.assert_array_equal(
+            self.alphabet.encode("aé一b*"), [2, -1, -1, 3, 8]
+        )
+        np.testing.assert_array_equal(self.alphabet.encode(["a", "zz"]), [2, -1])
+        assert self.alphabet.decode([2, -1, 8]) == ("a", "?", "*")
+
+    def test_multi_character_labels(self):
+        """Test labels of several characters."""
+        alphabet = Alphabet(intro_notes=["i1", "i2"], song_notes=["a", "b1"])
+        np.testing.assert_array_equal(
+            alphabet.encode("i1 i2 a b1 * zz"), [0, 1, 2, 3, 4, -1]
+        )
+        trans_matrix = get_trans_matrix("i1 i2 a b1 * i1 a b1 *", alphabet)
+        assert trans_matrix[0, 1] == trans_matrix[0, 2] == 1
+        assert trans_matrix[2, 3] == 2
+
+        seq = SyllableSequence.from_string("i1 a b1 * i2 a", alphabet)
+        assert seq.nb_bouts == 2
+        assert seq.to_string() == "i1 a b1 * i2 a"
+
+    def test_multi_character_sessions(self, tmp_path):
+        """Test batched matrices and CLI counts with multi-character labels."""
+        alphabet = Alphabet(song_notes=["a1", "b2"])
+        syllables_list = ["a1 b2 * a1", "b2 a1 *", ""]
+        result = get_trans_matrices(syllables_list, alphabet)
+        assert result.shape == (3, 3, 3)
+        for syllables, trans_matrix in zip(syllables_list, result):
+            np.testing.assert_array_equal(
+                trans_matrix, get_trans_matrix(syllables, alphabet)
+            )
+
+        path = tmp_path / "d1.txt"
+        path.write_text(syllables_list[0])
+        row = analyze_session(("b1", "d1", "text", str(path), alphabet, None))
+        assert row["nb_syllables"] == 4
+        assert row["nb_bouts"] == 2  # the trailing "a1" is a bout too
+
+    def test_hot_path(self, tmp_path):
+        """Test that analysis functions accept an alphabet."""
+        note_seq = self.alphabet.note_seq
+        np.testing.assert_array_equal(
+            get_trans_matrix(self.syllables, self.alphabet),
+            get_trans_matrix(self.syllables, note_seq),
+        )
+        assert get_cache_key("f", self.alphabet) != get_cache_key(
+            "f", Alphabet(song_notes="ikabcdjm")
+        )
+
+        corpus_path = write_corpus(
+            tmp_path / "corpus", [{"syllables": self.syllables}], self.alphabet
+        )
+        corpus = SyllableCorpus(corpus_path)
+        assert corpus.note_seq == self.alphabet
+        np.testing.assert_array_equal(
+            get_trans_matrix(corpus.get_sequence()),
+            get_trans_matrix(self.syllables, note_seq),
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
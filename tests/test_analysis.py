@@ -2,12 +2,19 @@
 Tests for the analysis module.
 """
 
+import warnings
+
 import pytest
 import numpy as np
+import scipy.sparse as sp
 from syllable_network_analysis.analysis import (
+    get_sequence_metrics,
     get_trans_matrix,
+    get_trans_matrices,
     get_syllable_network,
     get_trans_entropy,
+    get_row_entropy,
+    get_typical_rows,
     get_sequence_linearity,
     get_sequence_consistency,
     get_song_stereotypy,
@@ -41,6 +48,71 @@ class TestAnalysis:
         expected = np.array([[0, 1, 0], [0, 0, 1], [1, 0, 0]], dtype='float64')
         np.testing.assert_array_almost_equal(result, expected)
         
+    def test_get_trans_matrix_matches_reference(self):
+        """Test vectorized transition matrix against the per-character loop."""
+
+        def reference(syllables, note_seq):
+            trans_matrix = np.zeros((len(note_seq), len(note_seq)), dtype="int64")
+            for i in range(len(syllables) - 1):
+                if syllables[i] not in note_seq or syllables[i + 1] not in note_seq:
+                    continue
+                ind1 = note_seq.index(syllables[i])
+                ind2 = note_seq.index(syllables[i + 1])
+                if ind1 < len(note_seq) - 1:
+                    trans_matrix[ind1, ind2] += 1
+            return trans_matrix
+
+        syllables = "kiiiiabcdjiabcdjiabcd*iiiabcdk*iiii*kmmiiiabcdxiabcd*zz*"
+        for note_seq in ("iabcdjkm*", ("i", "a", "b", "c", "d", "j", "k", "m", "*")):
+            result = get_trans_matrix(syllables, note_seq)
+            np.testing.assert_array_equal(result, reference(syllables, note_seq))
+
+    def test_get_trans_matrix_no_overflow(self):
+        """Test that large transition counts do not overflow."""
+        result = get_trans_matrix("ab" * 40000, "ab*")
+        assert result[0, 1] == 40000
+        assert result[1, 0] == 39999
+
+    def test_get_trans_matrices(self):
+        """Test batched transition tensor against per-session matrices."""
+        syllables_list = ["iiabcd*iabcdabcd*", "kiiabcdk*", "", "iabd*ik*"]
+        note_seq = "iabcdk*"
+        result = get_trans_matrices(syllables_list, note_seq)
+        assert result.shape == (4, 7, 7)
+        for syllables, trans_matrix in zip(syllables_list, result):
+            np.testing.assert_array_equal(
+                trans_matrix, get_trans_matrix(syllables, note_seq)
+            )
+
+    def test_get_trans_matrices_per_session_note_seq(self):
+        """Test batched transition tensor with per-session aligned alphabets."""
+        syllables_list = ["abab*", "xyxy*"]
+        note_seqs = ["ab*", "xy*"]
+        result = get_trans_matrices(syllables_list, note_seqs=note_seqs)
+        np.testing.assert_array_equal(result[0], result[1])
+        np.testing.assert_array_equal(result[0], get_trans_matrix("abab*", "ab*"))
+
+    def test_metrics_on_trans_matrices(self):
+        """Test that metrics on a tensor match the per-matrix results."""
+        syllables_list = ["iiabcd*iabcdabcd*", "kiiabcdk*iabdk*", "iabcd*iacd*"]
+        note_seq = "iabcdk*"
+        trans_matrices = get_trans_matrices(syllables_list, note_seq)
+
+        entropy = get_trans_entropy(trans_matrices)
+        linearity = get_sequence_linearity(note_seq, trans_matrices)
+        consistency = get_sequence_consistency(note_seq, trans_matrices)
+        assert entropy.shape == linearity.shape == consistency.shape == (3,)
+
+        for ind, trans_matrix in enumerate(trans_matrices):
+            syl_network = get_syllable_network(trans_matrix)
+            assert entropy[ind] == pytest.approx(get_trans_entropy(trans_matrix))
+            assert linearity[ind] == pytest.approx(
+                get_sequence_linearity(note_seq, syl_network)
+            )
+            assert consistency[ind] == pytest.approx(
+                get_sequence_consistency(note_seq, trans_matrix)
+            )
+
     def test_get_syllable_network(self):
         """Test syllable network creation."""
         trans_matrix = np.array([[0, 1, 0], [0, 0, 1], [1, 0, 0]], dtype='int16')
@@ -54,6 +126,32 @@ class TestAnalysis:
         result = get_trans_entropy(trans_matrix)
         assert result == 0.0  # All transitions are deterministic
         
+    def test_get_row_entropy(self):
+        """Test per-row entropy on a matrix and a stack of matrices."""
+        trans_matrix = np.array([[0, 2, 2], [0, 0, 3], [0, 0, 0]])
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            result = get_row_entropy(trans_matrix)
+        np.testing.assert_array_equal(result, [1.0, 0.0, np.nan])
+
+        stacked = get_row_entropy(np.stack([trans_matrix, trans_matrix.T]))
+        assert stacked.shape == (2, 3)
+        np.testing.assert_array_equal(stacked[0], result)
+
+    def test_get_trans_entropy_return_rows(self):
+        """Test that the mean entropy skips rows without transitions."""
+        trans_matrix = np.array([[0, 2, 2], [0, 0, 3], [0, 0, 0]])
+        mean, rows = get_trans_entropy(trans_matrix, return_rows=True)
+        assert mean == pytest.approx(0.5)
+        assert rows.shape == (3,)
+
+    def test_get_typical_rows(self):
+        """Test typical transition mask."""
+        trans_matrix = np.array([[0, 2, 2], [0, 1, 3], [0, 0, 0]])
+        np.testing.assert_array_equal(
+            get_typical_rows(trans_matrix), [False, True, False]
+        )
+
     def test_get_sequence_linearity(self):
         """Test sequence linearity calculation."""
         note_seq = "abc"
@@ -61,7 +159,19 @@ class TestAnalysis:
         result = get_sequence_linearity(note_seq, syl_network)
         expected = 2 / 2  # 2 syllables / 2 transitions
         assert result == expected
-        
+
+    def test_get_sequence_linearity_edge_array(self):
+        """Test that an edge-list array is not read as a matrix."""
+        note_seq = "abcd"
+        syl_network = np.array([(0, 1, 1), (1, 2, 1), (2, 0, 3), (2, 3, 1)])
+        assert get_sequence_linearity(note_seq, syl_network) == 3 / 4
+        trans_matrix = get_trans_matrix("abcabcd", note_seq)
+        assert get_sequence_linearity(note_seq, trans_matrix) == 3 / 4
+
+        # Three edges make a square array, still not a (4, 4) matrix
+        syl_network = np.array([(0, 1, 1), (1, 2, 1), (2, 3, 1)])
+        assert get_sequence_linearity("abc*", syl_network) == 1.0
+
     def test_get_sequence_consistency(self):
         """Test sequence consistency calculation."""
         note_seq = "abc"
@@ -78,6 +188,66 @@ class TestAnalysis:
         expected = (0.5 + 0.7) / 2
         assert result == expected
 
+    def test_sparse_trans_matrix(self):
+        """Test that the sparse backend matches the dense one."""
+        syllables = "kiiiiabcdjiabcd*iiiabcdk*iiiixbb*"
+        note_seq = "iabcdjkm*"
+        dense = get_trans_matrix(syllables, note_seq)
+        sparse = get_trans_matrix(syllables, note_seq, sparse=True)
+        assert sp.isspmatrix_csr(sparse)
+        assert sparse.dtype == np.int64
+        assert sparse.nnz == np.count_nonzero(dense)
+        np.testing.assert_array_equal(sparse.toarray(), dense)
+
+        normalized = get_trans_matrix(syllables, note_seq, normalize=True, sparse=True)
+        assert sp.issparse(normalized)
+        np.testing.assert_allclose(
+            normalized.toarray(), get_trans_matrix(syllables, note_seq, normalize=True)
+        )
+
+    def test_sparse_metrics(self):
+        """Test that the network and metrics work on sparse matrices."""
+        syllables = "kiiiiabcdjiabcd*iiiabcdk*iiiixbb*abbb*"
+        note_seq = "iabcdjkm*"
+        dense = get_trans_matrix(syllables, note_seq)
+        sparse = sp.coo_matrix(dense)  # any sparse format is accepted
+
+        assert get_syllable_network(sparse) == get_syllable_network(dense)
+        np.testing.assert_allclose(
+            get_row_entropy(sparse), get_row_entropy(dense), equal_nan=True
+        )
+        np.testing.assert_array_equal(
+            get_typical_rows(sparse), get_typical_rows(dense)
+        )
+        dense_metrics = get_sequence_metrics(note_seq, dense)
+        sparse_metrics = get_sequence_metrics(note_seq, sparse)
+        for key, value in dense_metrics.items():
+            assert sparse_metrics[key] == pytest.approx(value)
+
+    def test_sparse_explicit_zeros(self):
+        """Test that explicitly stored zeros are not counted as transitions."""
+        trans_matrix = sp.csr_matrix(
+            (np.array([1, 0, 2]), np.array([1, 2, 0]), np.array([0, 2, 2, 3])),
+            shape=(3, 3),
+        )
+        assert get_syllable_network(trans_matrix) == [(0, 1, 1), (2, 0, 2)]
+        assert get_typical_rows(trans_matrix).tolist() == [True, False, True]
+        assert get_sequence_consistency("abc", trans_matrix) == 1.0
+        assert trans_matrix.nnz == 3  # input left untouched
+
+    @pytest.mark.parametrize("syllables", ["", "x", "*a"])
+    def test_sparse_empty(self, syllables):
+        """Test that a sparse matrix without transitions matches the dense one."""
+        dense = get_trans_matrix(syllables, "ab*")
+        sparse = get_trans_matrix(syllables, "ab*", sparse=True)
+        assert sparse.nnz == 0
+        np.testing.assert_array_equal(get_row_entropy(sparse), get_row_entropy(dense))
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # mean of all-NaN rows
+            np.testing.assert_array_equal(
+                get_trans_entropy(sparse), get_trans_entropy(dense)
+            )
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
\ No newline at end of file
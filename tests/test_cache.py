@@ -0,0 +1,117 @@
+"""
+Tests for the cache module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    SyllableSequence,
+    disable_cache,
+    enable_cache,
+    get_trans_entropy,
+    get_trans_matrix,
+)
+from syllable_network_analysis.analysis.cache import ResultCache, get_cache_key
+
+
+@pytest.fixture
+def disabled_after():
+    yield
+    disable_cache()
+
+
+class TestCache:
+    """Test class for the content-addressed cache."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiii*"
+    note_seq = "iabcdjkm*"
+
+    def test_cache_key(self):
+        """Test that keys follow the argument content."""
+        key = get_cache_key("f", self.syllables, self.note_seq, normalize=False)
+        assert key == get_cache_key(
+            "f", str(self.syllables), self.note_seq, normalize=False
+        )
+        assert key != get_cache_key("f", self.syllables, self.note_seq, normalize=True)
+        assert key != get_cache_key("f", self.syllables + "a", self.note_seq)
+
+        seq = SyllableSequence.from_string(self.syllables, self.note_seq)
+        seq_key = get_cache_key("f", seq)
+        seq.codes[0] = 0
+        assert seq_key != get_cache_key("f", seq)
+
+        trans_matrix = get_trans_matrix(self.syllables, self.note_seq, sparse=True)
+        sparse_key = get_cache_key("f", trans_matrix)
+        assert sparse_key == get_cache_key("f", trans_matrix.tocoo())
+        trans_matrix.data[0] += 1
+        assert sparse_key != get_cache_key("f", trans_matrix)
+
+    def test_memory_tier(self, disabled_after):
+        """Test hits, misses and isolation of cached results."""
+        cache = enable_cache()
+        first = get_trans_matrix(self.syllables, self.note_seq)
+        expected = first.copy()
+        first[0, 0] = 100  # must not leak into the cache
+        second = get_trans_matrix(self.syllables, self.note_seq)
+        assert (cache.hits, cache.misses) == (1, 1)
+        np.testing.assert_array_equal(second, expected)
+
+        get_trans_entropy(second)
+        get_trans_entropy(second)
+        assert (cache.hits, cache.misses) == (2, 2)
+
+    def test_disk_tier(self, tmp_path, disabled_after):
+        """Test that results persist on disk and respect the size cap."""
+        enable_cache(cache_dir=tmp_path)
+        expected = get_trans_matrix(self.syllables, self.note_seq)
+        assert len(list(tmp_path.glob("*.pkl"))) == 1
+
+        cache = enable_cache(cache_dir=tmp_path)  # fresh memory tier
+        np.testing.assert_array_equal(
+            get_trans_matrix(self.syllables, self.note_seq), expected
+        )
+        assert cache.hits == 1
+
+        cache = enable_cache(cache_dir=tmp_path, max_bytes=0)
+        get_trans_matrix(self.syllables + "a", self.note_seq)
+        assert not list(tmp_path.glob("*.pkl"))
+
+    def test_disk_size_tracking(self, tmp_path, monkeypatch):
+        """Test that writes below the size cap do not list the directory."""
+        ResultCache(cache_dir=tmp_path).set("old", np.zeros(100))
+        cache = ResultCache(cache_dir=tmp_path, max_bytes=4000)
+        assert cache._disk_bytes == (tmp_path / "old.pkl").stat().st_size
+
+        nb_listings = []
+        list_disk = cache._list_disk
+        monkeypatch.setattr(
+            cache, "_list_disk", lambda: nb_listings.append(1) or list_disk()
+        )
+        for ind in range(3):
+            cache.set(f"key{ind}", np.zeros(100))
+        assert not nb_listings
+        cache.set("key3", np.zeros(100))  # 5 files of ~950 bytes, over the cap
+        assert len(nb_listings) == 1
+        sizes = [path.stat().st_size for path in tmp_path.glob("*.pkl")]
+        assert cache._disk_bytes == sum(sizes) <= 4000
+        assert not (tmp_path / "old.pkl").exists()
+
+    def test_bound_arguments(self, disabled_after):
+        """Test that positional, keyword and default arguments share a key."""
+        cache = enable_cache()
+        get_trans_matrix(self.syllables, self.note_seq)
+        get_trans_matrix(self.syllables, note_seq=self.note_seq)
+        get_trans_matrix(syllables=self.syllables, note_seq=self.note_seq)
+        get_trans_matrix(self.syllables, self.note_seq, normalize=False)
+        assert (cache.hits, cache.misses) == (3, 1)
+
+    def test_disabled(self):
+        """Test that results are computed when caching is disabled."""
+        disable_cache()
+        result = get_trans_matrix(self.syllables, self.note_seq)
+        assert result.sum() > 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
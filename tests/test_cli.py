@@ -0,0 +1,165 @@
+"""
+Tests for the command-line entry point.
+"""
+
+import csv
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+from syllable_network_analysis.analysis import (
+    get_trans_entropy,
+    get_trans_matrix,
+    write_corpus,
+)
+from syllable_network_analysis.cli import (
+    _ParquetWriter,
+    analyze_session,
+    find_sessions,
+    main,
+    read_done_sessions,
+)
+
+CONFIG_PATH = Path(__file__).parent.parent / "configs" / "config.yaml"
+
+SESSIONS = {
+    ("b1", "d1"): "iiabcd*iabcdm*",
+    ("b1", "d2"): "iiabcdabcd*iiabd*",
+    ("b2", "d1"): "miiabcd*iabcd*",
+}
+
+
+def _read_rows(path):
+    with open(path, newline="") as fh:
+        return {(row["bird"], row["session"]): row for row in csv.DictReader(fh)}
+
+
+@pytest.fixture
+def session_dir(tmp_path):
+    root = tmp_path / "sessions"
+    for (bird, session), syllables in SESSIONS.items():
+        (root / bird).mkdir(parents=True, exist_ok=True)
+        (root / bird / f"{session}.txt").write_text(syllables)
+    return root
+
+
+class TestCli:
+    """Test class for the batch command-line entry point."""
+
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_session_dir(self, session_dir, tmp_path, n_jobs):
+        """Test metrics of a session directory."""
+        output = tmp_path / "metrics.csv"
+        argv = [str(session_dir), str(output), "--config", str(CONFIG_PATH)]
+        main(argv + ["-j", str(n_jobs)])
+
+        rows = _read_rows(output)
+        assert set(rows) == set(SESSIONS)
+        for key, syllables in SESSIONS.items():
+            expected = get_trans_entropy(get_trans_matrix(syllables, "iabcdm*"))
+            assert float(rows[key]["trans_entropy"]) == pytest.approx(expected)
+
+    def test_resume(self, session_dir, tmp_path):
+        """Test that sessions already in the output are skipped."""
+        output = tmp_path / "metrics.csv"
+        argv = [str(session_dir), str(output), "--config", str(CONFIG_PATH), "-j", "1"]
+        main(argv)
+        (session_dir / "b3").mkdir()
+        (session_dir / "b3" / "d1.txt").write_text("iabcd*")
+        main(argv)
+
+        with open(output, newline="") as fh:
+            keys = [(row["bird"], row["session"]) for row in csv.DictReader(fh)]
+        assert len(keys) == len(set(keys)) == 4
+
+    def test_corpus(self, tmp_path):
+        """Test one session per bird and date of a corpus."""
+        records = [
+            {"bird": bird, "date": session, "syllables": syllables}
+            for (bird, session), syllables in SESSIONS.items()
+        ]
+        corpus_path = write_corpus(tmp_path / "corpus", records, "iabcdm*")
+        output = tmp_path / "metrics.csv"
+        main([str(corpus_path), str(output), "--config", str(CONFIG_PATH), "-j", "1"])
+
+        rows = _read_rows(output)
+        assert set(rows) == set(SESSIONS)
+        assert rows[("b1", "d2")]["nb_bouts"] == "2"
+
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_profile(self, session_dir, tmp_path, n_jobs):
+        """Test the timing report, including stages run in workers."""
+        output, report = tmp_path / "metrics.csv", tmp_path / "profile.json"
+        argv = [str(session_dir), str(output), "--config", str(CONFIG_PATH)]
+        main(argv + ["-j", str(n_jobs), "--profile", str(report)])
+
+        with open(report) as fh:
+            summary = json.load(fh)["summary"]
+        assert summary["run_batch"]["calls"] == 1
+        assert summary["load_session"]["calls"] == len(SESSIONS)
+        assert summary["get_trans_matrix"]["calls"] == len(SESSIONS)
+        assert summary["get_trans_matrix"]["total_size"] == sum(
+            len(syllables) for syllables in SESSIONS.values()
+        )
+
+    def test_missing_config(self, session_dir, tmp_path, capsys):
+        """Test that a missing configuration file is a usage error."""
+        output = tmp_path / "metrics.csv"
+        with pytest.raises(SystemExit):
+            main([str(session_dir), str(output)])
+        missing = tmp_path / "config.yaml"
+        with pytest.raises(SystemExit):
+            main([str(session_dir), str(output), "--config", str(missing)])
+        assert "not found" in capsys.readouterr().err
+        assert not output.exists()
+
+    def test_parquet(self, session_dir, tmp_path):
+        """Test a Parquet table, resumed from row groups of a killed run."""
+        pytest.importorskip("pyarrow")
+        import pyarrow.parquet as pq
+
+        output = tmp_path / "metrics.parquet"
+        tasks = find_sessions(session_dir, "iabcdm*")
+        writer = _ParquetWriter(output, row_group_size=2)
+        for task in tasks:
+            writer.write(analyze_session(task))
+        # Not closed: the first full row group is kept, the last row is lost
+        assert len(read_done_sessions(output)) == 2
+
+        main([str(session_dir), str(output), "--config", str(CONFIG_PATH), "-j", "1"])
+        table = pq.read_table(output).to_pylist()
+        assert sorted((row["bird"], row["session"]) for row in table) == sorted(
+            SESSIONS
+        )
+        assert not (tmp_path / "metrics.parquet.parts").exists()
+
+    def test_parquet_missing_pyarrow(self, session_dir, tmp_path, monkeypatch):
+        """Test that Parquet output without pyarrow explains how to get it."""
+        monkeypatch.setitem(sys.modules, "pyarrow", None)
+        monkeypatch.setitem(sys.modules, "pyarrow.parquet", None)
+        output = tmp_path / "metrics.parquet"
+        with pytest.raises(ImportError, match="pyarrow"):
+            main([str(session_dir), str(output), "--config", str(CONFIG_PATH)])
+
+    def test_corpus_sessions_match_text(self, session_dir, tmp_path):
+        """Test that corpus bout ranges give the same rows as text sessions."""
+        records = [
+            {"bird": bird, "date": session, "syllables": syllables + "iab"}
+            for (bird, session), syllables in SESSIONS.items()
+        ]
+        corpus_path = write_corpus(tmp_path / "corpus", records, "iabcdm*")
+        tasks = find_sessions(corpus_path, "iabcdm*")
+        assert [task[-1] for task in tasks] == [(0, 3), (3, 6), (6, 9)]
+
+        for task in tasks:
+            bird, session = task[:2]
+            path = session_dir / bird / f"{session}.txt"
+            path.write_text(SESSIONS[(bird, session)] + "iab")
+            text_task = (bird, session, "text", str(path), "iabcdm*", None)
+            assert analyze_session(task) == analyze_session(text_task)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
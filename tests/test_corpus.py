@@ -0,0 +1,83 @@
+"""
+Tests for the corpus module.
+"""
+
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    SyllableCorpus,
+    convert_song_info,
+    get_trans_matrix,
+    write_corpus,
+)
+
+DATA_DIR = Path(__file__).parent.parent / "data" / "raw"
+
+
+class TestCorpus:
+    """Test class for the on-disk syllable corpus."""
+
+    note_seq = "iabcdjkm*"
+    records = [
+        {"bird": "b2", "date": "2019-06-18", "file": "f3", "context": "U",
+         "syllables": "iiabcd*iabcdk*"},
+        {"bird": "b1", "date": "2019-06-17", "file": "f1", "context": "D",
+         "syllables": "kiiabcdjiabcd*iiabcd*"},
+        {"bird": "b1", "date": "2019-06-18", "file": "f2", "context": "D",
+         "syllables": "iiiiabcdjia*iab"},
+    ]  # fmt: skip
+
+    def test_round_trip(self, tmp_path):
+        """Test writing and memory-mapping a corpus."""
+        corpus = SyllableCorpus(write_corpus(tmp_path, self.records, self.note_seq))
+        assert isinstance(corpus.codes, np.memmap)
+        assert corpus.nb_bouts == 6
+        assert list(corpus.bouts["file"]) == ["f1", "f1", "f2", "f2", "f3", "f3"]
+
+        seq = corpus.get_sequence(bird="b1", date="2019-06-18")
+        assert seq.to_string() == "iiiiabcdjia*iab"
+        assert np.shares_memory(seq.codes, corpus.codes)
+
+    def test_selection_trans_matrix(self, tmp_path):
+        """Test transition matrices of non-contiguous selections."""
+        corpus = SyllableCorpus(write_corpus(tmp_path, self.records, self.note_seq))
+        seq = corpus.get_sequence(date="2019-06-18")
+        assert seq.nb_bouts == 4
+        expected = get_trans_matrix("iiiiabcdjia*iab" + "iiabcd*iabcdk*", self.note_seq)
+        np.testing.assert_array_equal(get_trans_matrix(seq), expected)
+        assert corpus.get_sequence(bird="b3").nb_bouts == 0
+
+        with pytest.raises(ValueError):
+            corpus.select(colony="c1")
+
+    def test_note_seq_too_long(self, tmp_path):
+        """Test that a note sequence that does not fit in bytes is refused."""
+        note_seq = tuple(f"n{ind}" for ind in range(255)) + ("*",)
+        with pytest.raises(ValueError, match="fewer than"):
+            write_corpus(tmp_path, [{"syllables": ["n254", "*"]}], note_seq)
+        assert not (tmp_path / "codes.npy").exists()
+
+    def test_convert_song_info(self, tmp_path):
+        """Test conversion of the sample SongInfo file."""
+        with zipfile.ZipFile(DATA_DIR / "g35r38.zip") as archive:
+            archive.extract("g35r38(SongInfo).npy", tmp_path)
+        corpus = SyllableCorpus(
+            convert_song_info(
+                [tmp_path / "g35r38(SongInfo).npy"], tmp_path / "corpus", "iabcdkmn*"
+            )
+        )
+        assert set(corpus.bouts["bird"]) == {"g35r38"}
+        assert set(corpus.bouts["date"]) == {"2019-06-17"}
+        assert set(corpus.bouts["context"]) == {"D"}
+        assert corpus.get_sequence(bird="g35r38").to_string() == (
+            "iiiiiiiiiiiiiiiabcdab*nmmmk*iiiiiiiiiiiabcdabcd*"
+            "iiiiiiiiiiiiiabcdabcdabcdabcdabc*iiiiiiiabcd*"
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
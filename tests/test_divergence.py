@@ -0,0 +1,115 @@
+"""
+Tests for the divergence module.
+"""
+
+import numpy as np
+import pytest
+from scipy.stats import entropy
+
+from syllable_network_analysis.analysis import (
+    get_pairwise_divergence,
+    get_trans_matrices,
+    get_trans_matrix,
+)
+
+
+def naive_divergence(matrix_a, matrix_b, metric, smoothing=0.0):
+    """Occupancy-weighted row divergence, one row at a time."""
+    nb_notes = matrix_a.shape[0]
+    occupancy_a = matrix_a.sum(axis=1) / matrix_a.sum()
+    occupancy_b = matrix_b.sum(axis=1) / matrix_b.sum()
+    total, weight_sum = 0.0, 0.0
+    for row in range(nb_notes):
+        has_a, has_b = matrix_a[row].sum() > 0, matrix_b[row].sum() > 0
+        if not ((has_a or has_b) if smoothing else (has_a and has_b)):
+            continue
+        prob_a = matrix_a[row] / max(matrix_a[row].sum(), 1)
+        prob_b = matrix_b[row] / max(matrix_b[row].sum(), 1)
+        prob_a = (prob_a + smoothing) / (has_a + nb_notes * smoothing)
+        prob_b = (prob_b + smoothing) / (has_b + nb_notes * smoothing)
+        if metric == "kl":
+            value = entropy(prob_a, prob_b, base=2)
+        elif metric == "js":
+            mean = (prob_a + prob_b) / 2
+            value = (entropy(prob_a, mean, base=2) + entropy(prob_b, mean, base=2)) / 2
+        else:
+            value = np.abs(prob_a - prob_b).sum()
+        weight = (occupancy_a[row] + occupancy_b[row]) / 2
+        total += weight * value
+        weight_sum += weight
+    return total / weight_sum
+
+
+class TestDivergence:
+    """Test class for pairwise divergences between transition matrices."""
+
+    note_seq = "iabcdjm*"
+    syllables_list = [
+        "iiabcd*iabcd*iabcdj*",
+        "iabcd*iabd*iiabcdm*",
+        "iiiabcdjabcd*",
+        "iacbd*iabcd*iiabcd*",
+        "mmiabcd*",
+    ]
+    trans_matrices = get_trans_matrices(syllables_list, note_seq)
+
+    @pytest.mark.parametrize("metric", ["kl", "js", "l1"])
+    def test_naive(self, metric):
+        """Test against a double loop over pairs and rows."""
+        smoothing = 0.01
+        divergence = get_pairwise_divergence(
+            self.trans_matrices, metric=metric, smoothing=smoothing, block_size=2
+        )
+        expected = [
+            [naive_divergence(a, b, metric, smoothing) for b in self.trans_matrices]
+            for a in self.trans_matrices
+        ]
+        np.testing.assert_allclose(divergence, expected, atol=1e-12)
+        np.testing.assert_allclose(np.diag(divergence), 0, atol=1e-12)
+        if metric != "kl":
+            np.testing.assert_allclose(divergence, divergence.T)
+
+    def test_smoothing(self):
+        """Test that zero probabilities are only smoothed on request."""
+        kl = get_pairwise_divergence(self.trans_matrices, metric="kl")
+        assert np.isinf(kl[1, 0])  # b -> d never happens in the first sequence
+        assert np.all(np.isfinite(get_pairwise_divergence(self.trans_matrices)))
+        assert np.all(
+            np.isfinite(
+                get_pairwise_divergence(self.trans_matrices, metric="kl", smoothing=0.1)
+            )
+        )
+        js = get_pairwise_divergence(self.trans_matrices, weighting="uniform")
+        assert np.all((js >= 0) & (js <= 1))
+
+    def test_inputs(self):
+        """Test normalized, sparse and cross-set inputs."""
+        normalized = [
+            get_trans_matrix(syllables, self.note_seq, normalize=True)
+            for syllables in self.syllables_list
+        ]
+        expected = get_pairwise_divergence(self.trans_matrices)
+        np.testing.assert_allclose(get_pairwise_divergence(normalized), expected)
+
+        sparse = [
+            get_trans_matrix(syllables, self.note_seq, sparse=True)
+            for syllables in self.syllables_list
+        ]
+        np.testing.assert_allclose(get_pairwise_divergence(sparse), expected)
+
+        tutor = self.trans_matrices[0]
+        to_tutor = get_pairwise_divergence(self.trans_matrices, tutor, metric="l1")
+        assert to_tutor.shape == (5, 1)
+        np.testing.assert_allclose(
+            to_tutor[:, 0],
+            get_pairwise_divergence(self.trans_matrices, metric="l1")[:, 0],
+        )
+
+        empty = np.zeros((1, 8, 8))
+        assert np.isnan(get_pairwise_divergence(self.trans_matrices, empty)).all()
+        with pytest.raises(ValueError):
+            get_pairwise_divergence(self.trans_matrices, metric="cosine")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
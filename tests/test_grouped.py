@@ -0,0 +1,121 @@
+"""
+Tests for the grouped module.
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from syllable_network_analysis.analysis import (
+    SyllableCorpus,
+    get_grouped_metrics,
+    get_grouped_trans_matrices,
+    get_sequence_metrics,
+    get_trans_matrix,
+    write_corpus,
+)
+
+
+class TestGrouped:
+    """Test class for group-by aggregation."""
+
+    note_seq = "iabcdjkm*"
+    bouts = pd.DataFrame(
+        {
+            "file": [
+                "b1_190617_100000_Dir.wav",
+                "b1_190617_110000_Undir.wav",
+                "b1_190617_120000_Dir.wav",
+                "b2_190618_100000_Undir.wav",
+            ],
+            "syllables": ["kiiabcdj", "iabcd*iabcd*", "iiabcd*", "iabcdk*"],
+        }
+    )
+
+    def test_trans_matrices(self):
+        """Test that each group sums the transitions of its bouts."""
+        keys, nb_bouts, nb_syllables, trans_matrices = get_grouped_trans_matrices(
+            self.bouts, note_seq=self.note_seq
+        )
+        assert list(keys["bird"]) == ["b1", "b1", "b2"]
+        assert list(keys["date"]) == ["2019-06-17"] * 2 + ["2019-06-18"]
+        assert list(keys["context"]) == ["D", "U", "U"]
+        np.testing.assert_array_equal(nb_bouts, [2, 1, 1])
+        np.testing.assert_array_equal(nb_syllables, [15, 12, 7])
+
+        # No transition across rows, even within a group
+        syllables = self.bouts["syllables"]
+        np.testing.assert_array_equal(
+            trans_matrices[0],
+            get_trans_matrix(syllables[0], self.note_seq)
+            + get_trans_matrix(syllables[2], self.note_seq),
+        )
+        np.testing.assert_array_equal(
+            trans_matrices[2], get_trans_matrix(syllables[3], self.note_seq)
+        )
+
+    def test_metrics(self):
+        """Test the tidy table of metrics per group."""
+        metrics = get_grouped_metrics(self.bouts, by=["bird"], note_seq=self.note_seq)
+        assert list(metrics.columns[:4]) == [
+            "bird",
+            "nb_bouts",
+            "nb_syllables",
+            "nb_transitions",
+        ]
+        assert list(metrics["bird"]) == ["b1", "b2"]
+        expected = get_sequence_metrics(
+            self.note_seq, get_trans_matrix("iabcdk*", self.note_seq)
+        )
+        for name, value in expected.items():
+            assert metrics[name].iloc[1] == pytest.approx(value, nan_ok=True)
+
+        metrics = get_grouped_metrics(
+            self.bouts, by=["bird"], note_seq=self.note_seq, min_bouts=2
+        )
+        assert list(metrics["bird"]) == ["b1"]
+        with pytest.raises(ValueError):
+            get_grouped_metrics(self.bouts, by=["rig"], note_seq=self.note_seq)
+
+    def test_corpus(self, tmp_path):
+        """Test grouping the bouts of a corpus."""
+        records = [
+            {"bird": bird, "date": "2019-06-17", "context": context,
+             "syllables": syllables}
+            for bird, context, syllables in [
+                ("b1", "D", "iabcd*iabcd*"),
+                ("b1", "U", "iiabc*"),
+                ("b2", "D", "ixabcd*"),
+            ]
+        ]  # fmt: skip
+        corpus = SyllableCorpus(write_corpus(tmp_path, records, self.note_seq))
+        metrics = get_grouped_metrics(corpus, by=["bird", "context"])
+        assert list(metrics["nb_bouts"]) == [2, 1, 1]
+        assert list(metrics["nb_transitions"]) == [10, 5, 4]
+        table_metrics = get_grouped_metrics(
+            {key: [record[key] for record in records] for key in records[0]},
+            by=["bird", "context"],
+            note_seq=self.note_seq,
+        )
+        pd.testing.assert_frame_equal(
+            metrics.drop(columns="nb_bouts"), table_metrics.drop(columns="nb_bouts")
+        )
+
+    def test_many_groups(self):
+        """Test thousands of groups in a single call."""
+        rng = np.random.default_rng(0)
+        nb_bouts = 20000
+        syllables = ["iabcd*", "iabcdj*", "iiabd*"]
+        bouts = {
+            "bird": rng.integers(100, size=nb_bouts).astype(str),
+            "date": rng.integers(30, size=nb_bouts),
+            "syllables": [syllables[ind] for ind in rng.integers(3, size=nb_bouts)],
+        }
+        metrics = get_grouped_metrics(bouts, by=["bird", "date"], note_seq="iabcdj*")
+        assert len(metrics) > 2000
+        assert metrics["nb_bouts"].sum() == nb_bouts
+        assert metrics["nb_syllables"].sum() == sum(map(len, bouts["syllables"]))
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
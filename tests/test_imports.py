@@ -0,0 +1,74 @@
+"""
+Tests for the import time of the package.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+# Modules that must only be imported when actually used
+HEAVY_MODULES = [
+    "matplotlib",
+    "scipy",
+    "pandas",
+    "seaborn",
+    "concurrent.futures",
+    "soundfile",
+    "librosa",
+    "sqlite3",
+]
+
+
+def _run(code):
+    """Run Python code in a fresh interpreter and return its output."""
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return result.stdout.strip()
+
+
+class TestImports:
+    """Test class for lazy imports."""
+
+    @pytest.mark.parametrize(
+        "module", ["syllable_network_analysis", "syllable_network_analysis.analysis"]
+    )
+    def test_no_heavy_imports(self, module):
+        """Test that importing the analysis path leaves heavy modules out."""
+        loaded = _run(
+            f"import sys, {module}\n"
+            f"print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+        )
+        assert loaded == ""
+
+    def test_lazy_attributes(self):
+        """Test that plotting names are imported on first access."""
+        output = _run(
+            "import sys, syllable_network_analysis as sna\n"
+            "print('matplotlib' in sys.modules)\n"
+            "func = sna.plot_transition_diag\n"
+            "print('matplotlib' in sys.modules)\n"
+            "print(func is sna.plot.plot_transition_diag)\n"
+            "print('plot_transition_diag' in dir(sna))"
+        )
+        assert output.split() == ["False", "True", "True", "True"]
+
+        with pytest.raises(AttributeError):
+            import syllable_network_analysis
+
+            syllable_network_analysis.not_an_attribute
+
+    def test_import_time(self):
+        """Test that the package imports quickly on top of numpy."""
+        elapsed = _run(
+            "import time, numpy\n"
+            "start = time.perf_counter()\n"
+            "import syllable_network_analysis\n"
+            "print(time.perf_counter() - start)"
+        )
+        assert float(elapsed) < 0.5
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
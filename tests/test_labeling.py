@@ -0,0 +1,144 @@
+"""
+Tests for the labeling module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import Alphabet, get_trans_matrix
+from syllable_network_analysis.audio import (
+    cluster_segments,
+    fit_templates,
+    get_bird_templates,
+    get_segment_features,
+    get_syllable_string,
+    label_file,
+    label_files,
+    label_segments,
+    load_templates,
+    save_templates,
+)
+
+SAMPLE_RATE = 32000
+
+
+def make_syllable(label, rng):
+    """Synthetic syllable: a tone, a lower longer tone or a chirp."""
+    duration = {"a": 0.05, "b": 0.08, "c": 0.06}[label] * rng.uniform(0.9, 1.1)
+    time = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    if label == "c":
+        phase = 2 * np.pi * (2000 * time + 50000 * time**2)
+    else:
+        phase = 2 * np.pi * {"a": 6000, "b": 3000}[label] * time
+    samples = 0.5 * np.sin(phase) + 0.01 * rng.standard_normal(time.size)
+    return samples.astype(np.float32)
+
+
+def make_segments(labels, seed=0):
+    rng = np.random.default_rng(seed)
+    return [make_syllable(label, rng) for label in labels]
+
+
+class TestLabeling:
+    """Test class for syllable features and labeling."""
+
+    train_labels = list("abc" * 10)
+    train_segments = make_segments(train_labels)
+
+    def test_features(self):
+        """Test that features do not depend on batching or padding."""
+        segments = self.train_segments + [np.zeros(10, dtype=np.float32)]
+        features = get_segment_features(segments, SAMPLE_RATE)
+        assert features.shape == (31, 3 * 24 + 1)
+        assert np.all(np.isfinite(features))
+        np.testing.assert_allclose(
+            get_segment_features(segments, SAMPLE_RATE, batch_size=1),
+            features,
+            rtol=1e-5,
+            atol=1e-5,
+        )
+        np.testing.assert_allclose(
+            get_segment_features(segments[:1], SAMPLE_RATE), features[:1], rtol=1e-5
+        )
+
+    def test_label_segments(self):
+        """Test nearest-centroid labeling of new segments."""
+        templates = fit_templates(self.train_segments, self.train_labels, SAMPLE_RATE)
+        assert templates.labels == ("a", "b", "c")
+
+        test_labels = list("cabbacbca")
+        segments = make_segments(test_labels, seed=1)
+        assert label_segments(segments, templates) == test_labels
+        assert label_segments(segments, templates, max_distance=0) == ["?"] * 9
+
+    def test_cluster_segments(self):
+        """Test that k-means recovers the syllable types."""
+        clusters = cluster_segments(self.train_segments, SAMPLE_RATE, 3)
+        for label in "abc":
+            is_label = np.array(self.train_labels) == label
+            assert np.unique(clusters[is_label]).size == 1
+        assert np.unique(clusters).size == 3
+
+    def test_templates_cache(self, tmp_path):
+        """Test that template files are loaded once until they change."""
+        templates = fit_templates(
+            self.train_segments, self.train_labels, SAMPLE_RATE, n_bands=16
+        )
+        save_templates(tmp_path / "b70r38.npz", templates)
+        loaded = get_bird_templates("b70r38", tmp_path)
+        assert loaded is load_templates(tmp_path / "b70r38.npz")
+        assert loaded.labels == templates.labels
+        assert loaded.feature_params == templates.feature_params
+        np.testing.assert_allclose(loaded.centroids, templates.centroids)
+
+        save_templates(tmp_path / "b70r38.npz", templates._replace(labels=tuple("xyz")))
+        loaded_again = get_bird_templates("b70r38", tmp_path)
+        if loaded_again is not loaded:  # file times may not be fine enough
+            assert loaded_again.labels == tuple("xyz")
+
+    def test_syllable_string(self):
+        """Test that label strings feed the analysis directly."""
+        table = {
+            "onset": np.array([0.0, 0.1, 0.2, 1.0, 1.1]),
+            "offset": np.array([0.05, 0.15, 0.25, 1.05, 1.15]),
+        }
+        syllables = get_syllable_string(table, list("iabia"))
+        assert syllables == "iab*ia*"
+        assert get_syllable_string(table, ["i1", "a", "b", "i1", "a"]) == (
+            "i1 a b * i1 a *"
+        )
+
+        alphabet = Alphabet(intro_notes="i", song_notes="ab")
+        trans_matrix = get_trans_matrix(syllables, alphabet)
+        assert trans_matrix[0, 1] == 2 and trans_matrix[1, 2] == 1
+
+    def test_label_files(self, tmp_path):
+        """Test segmenting and labeling recordings."""
+        sf = pytest.importorskip("soundfile")
+        templates = fit_templates(self.train_segments, self.train_labels, SAMPLE_RATE)
+        gap = np.zeros(int(0.05 * SAMPLE_RATE), dtype=np.float32)
+        bout_gap = np.zeros(SAMPLE_RATE, dtype=np.float32)
+        segments = make_segments("abcab", seed=2)
+        recording = np.concatenate(
+            [gap]
+            + [x for segment in segments[:3] for x in (segment, gap)]
+            + [bout_gap]
+            + [x for segment in segments[3:] for x in (segment, gap)]
+        )
+        paths = [tmp_path / "rig0.wav", tmp_path / "rig1.wav"]
+        for path in paths:
+            sf.write(path, recording, SAMPLE_RATE, subtype="FLOAT")
+        assert label_files(paths, templates, n_jobs=2) == ["abc*ab*"] * 2
+
+    def test_label_file_sample_rate(self, tmp_path):
+        """Test that a recording at another rate than the templates is refused."""
+        sf = pytest.importorskip("soundfile")
+        templates = fit_templates(self.train_segments, self.train_labels, SAMPLE_RATE)
+        path = tmp_path / "rig0.wav"
+        sf.write(path, np.concatenate(make_segments("ab")), 44100, subtype="FLOAT")
+        with pytest.raises(ValueError, match="44100 Hz"):
+            label_file(path, templates)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
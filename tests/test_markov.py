@@ -0,0 +1,106 @@
+"""
+Tests for the Markov module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    SyllableSequence,
+    get_conditional_entropy,
+    get_entropy_by_order,
+    get_markov_counts,
+    get_trans_matrix,
+)
+
+
+def _count_reference(syllables, note_seq, order):
+    """Count order-n transitions with a plain loop."""
+    counts = {}
+    for ind in range(order, len(syllables)):
+        context = syllables[ind - order : ind]
+        target = syllables[ind]
+        if any(note not in note_seq or note == note_seq[-1] for note in context):
+            continue
+        if target not in note_seq:
+            continue
+        key = (tuple(note_seq.index(note) for note in context), note_seq.index(target))
+        counts[key] = counts.get(key, 0) + 1
+    return counts
+
+
+class TestMarkov:
+    """Test class for higher-order transition counting."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiiixbb*iabcd*"
+    note_seq = "iabcdjkm*"
+
+    def test_first_order(self):
+        """Test that order 1 matches the transition matrix."""
+        markov_counts = get_markov_counts(self.syllables, self.note_seq, orders=[1])
+        trans_matrix = np.zeros((9, 9), dtype=np.int64)
+        contexts, counts = markov_counts[1].contexts, markov_counts[1].counts
+        trans_matrix[contexts[:, 0]] = counts.toarray()
+        np.testing.assert_array_equal(
+            trans_matrix, get_trans_matrix(self.syllables, self.note_seq)
+        )
+
+    @pytest.mark.parametrize("order", [0, 2, 3, 5])
+    def test_matches_reference(self, order):
+        """Test the counts of each order against a plain loop."""
+        markov_counts = get_markov_counts(self.syllables, self.note_seq, [order])
+        contexts, counts = markov_counts[order].contexts, markov_counts[order].counts
+        assert contexts.shape == (counts.shape[0], order)
+
+        result = {}
+        for row, context in enumerate(contexts):
+            for target, count in zip(
+                counts.indices[counts.indptr[row] : counts.indptr[row + 1]],
+                counts.data[counts.indptr[row] : counts.indptr[row + 1]],
+            ):
+                result[(tuple(context.tolist()), int(target))] = int(count)
+        assert result == _count_reference(self.syllables, self.note_seq, order)
+
+    def test_encoded_sequence(self):
+        """Test that encoded sequences give the same counts as strings."""
+        seq = SyllableSequence.from_string(self.syllables, self.note_seq)
+        from_string = get_markov_counts(self.syllables, self.note_seq)
+        from_seq = get_markov_counts(seq)
+        for order, markov_counts in from_string.items():
+            np.testing.assert_array_equal(
+                markov_counts.contexts, from_seq[order].contexts
+            )
+            assert (markov_counts.counts != from_seq[order].counts).nnz == 0
+
+    def test_conditional_entropy(self):
+        """Test the entropy of the next syllable given its context."""
+        markov_counts = get_markov_counts("ab*ab*ac*", "abc*", orders=[0, 1])
+        # a -> b twice, a -> c once; b -> * and c -> * always
+        expected = 3 / 6 * -(2 / 3 * np.log2(2 / 3) + 1 / 3 * np.log2(1 / 3))
+        assert get_conditional_entropy(markov_counts[1]) == pytest.approx(expected)
+        assert np.isnan(
+            get_conditional_entropy(get_markov_counts("", "abc*", [1])[1])
+        )
+
+    def test_entropy_by_order(self):
+        """Test that second-order dependence shows as an entropy drop."""
+        # b goes to c after a, and to d after x
+        result = get_entropy_by_order("abc*xbd*" * 50, "abcdx*", max_order=3)
+        np.testing.assert_array_equal(result["order"], [0, 1, 2, 3])
+        assert result["conditional_entropy"][1] > 0
+        assert result["conditional_entropy"][2] == pytest.approx(0)
+        assert np.isnan(result["entropy_reduction"][0])
+        assert result["entropy_reduction"][2] == pytest.approx(
+            result["conditional_entropy"][1]
+        )
+
+    def test_invalid_orders(self):
+        """Test that negative or overflowing orders are rejected."""
+        with pytest.raises(ValueError):
+            get_markov_counts(self.syllables, self.note_seq, orders=[-1])
+        with pytest.raises(ValueError):
+            get_markov_counts(self.syllables, self.note_seq, orders=[20])
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
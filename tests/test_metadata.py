@@ -0,0 +1,116 @@
+"""
+Tests for the syllable alphabet and color resolution.
+"""
+
+import sqlite3
+from pathlib import Path
+
+import pytest
+
+from syllable_network_analysis.utils import (
+    clear_metadata_cache,
+    get_alphabet,
+    get_syl_color,
+    load_bird_table,
+)
+
+CONFIG_PATH = Path(__file__).parent.parent / "configs" / "config.yaml"
+
+
+class RecordingConnection(sqlite3.Connection):
+    """SQLite connection recording the queries it runs."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.queries = []
+
+    def execute(self, *args):
+        self.queries.append(args)
+        return super().execute(*args)
+
+
+@pytest.fixture
+def database():
+    """In-memory bird-metadata table."""
+    clear_metadata_cache()
+    connection = sqlite3.connect(":memory:", factory=RecordingConnection)
+    connection.execute(
+        "CREATE TABLE bird (birdID TEXT, introNotes TEXT, songNote TEXT, calls TEXT)"
+    )
+    connection.executemany(
+        "INSERT INTO bird VALUES (?, ?, ?, ?)",
+        [
+            ("b70r38", "ik", "abcd", "m"),
+            ("g20r5", "i", "abcdefghj", None),
+            ("x' OR '1'='1", "", "a", ""),
+        ],
+    )
+    connection.commit()
+    connection.queries.clear()
+    yield connection
+    connection.close()
+    clear_metadata_cache()
+
+
+class TestMetadata:
+    """Test class for alphabet and color resolution."""
+
+    def test_config(self):
+        """Test resolving the alphabet and colors of the configuration."""
+        clear_metadata_cache()
+        note_seq, syl_color = get_syl_color(config=CONFIG_PATH)
+        assert note_seq == "iabcdm*"
+        assert syl_color == {
+            "i": "black",
+            "a": "red",
+            "b": "blue",
+            "c": "lime",
+            "d": "magenta",
+            "m": "teal",
+            "*": "yellow",
+        }
+        assert get_alphabet(config=CONFIG_PATH) is get_alphabet(config=CONFIG_PATH)
+
+    def test_no_config(self, database):
+        """Test that without a configuration only the bird table is used."""
+        with pytest.raises(ValueError, match="configuration"):
+            get_alphabet()
+        with pytest.raises(ValueError, match="configuration"):
+            get_syl_color("b70r38")
+
+        note_seq, syl_color = get_syl_color("b70r38", database)
+        assert note_seq == "ikabcdm*"
+        assert syl_color["k"] == "black" and syl_color["a"] == "red"
+
+    def test_database(self, database):
+        """Test that all birds are loaded with a single query."""
+        note_seq, syl_color = get_syl_color("b70r38", database, CONFIG_PATH)
+        assert note_seq == "ikabcdm*"
+        assert syl_color["k"] == "gray" and syl_color["m"] == "teal"
+
+        # Palettes are reused when a bird has more notes than colors
+        note_seq, syl_color = get_syl_color("g20r5", database, CONFIG_PATH)
+        assert note_seq == "iabcdefghj*"
+        assert syl_color["h"] == syl_color["a"] == "red"
+        assert len(database.queries) == 1
+
+        with pytest.raises(ValueError):
+            get_alphabet("unknown", database)
+        assert len(database.queries) == 1
+
+    def test_parameter_binding(self, database):
+        """Test that bird IDs are bound, not formatted into the query."""
+        assert list(load_bird_table(database, ["x' OR '1'='1"])) == ["x' OR '1'='1"]
+        assert load_bird_table(database, ["b70r38' OR '1'='1"]) == {}
+        assert get_alphabet("x' OR '1'='1", database).note_seq == "a*"
+
+    def test_database_file(self, database, tmp_path):
+        """Test loading a SQLite database file."""
+        path = tmp_path / "db.sqlite"
+        database.execute(f"VACUUM INTO '{path}'")
+        assert set(load_bird_table(path)) == set(load_bird_table(database))
+        assert load_bird_table(str(path)) is load_bird_table(path)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,78 @@
+"""
+Tests for the motifs module.
+"""
+
+import re
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    MotifIndex,
+    SyllableSequence,
+    nb_song_note_in_bout,
+)
+
+
+def find_all(pattern, syllables):
+    """Start of every (overlapping) occurrence of a pattern."""
+    matches = re.finditer(f"(?={re.escape(pattern)})", syllables)
+    return [match.start() for match in matches]
+
+
+class TestMotifs:
+    """Test class for the motif index."""
+
+    note_seq = "iabcdjkm*"
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiiixbb*iabcdjiabcd*iab*"
+
+    def test_find(self):
+        """Test occurrences against a regex scan."""
+        index = MotifIndex(self.syllables, self.note_seq)
+        for pattern in ["abcd", "abcdjia", "ii", "i", "d*i", "abcd*", "bb", "kk"]:
+            expected = find_all(pattern, self.syllables)
+            np.testing.assert_array_equal(index.find(pattern), expected)
+            assert index.count(pattern) == len(expected)
+        assert index.count("ax") == 0  # "x" is not in the note sequence
+        assert index.count([1, 2, 3, 4]) == index.count("abcd")
+        with pytest.raises(ValueError):
+            index.count("")
+
+    @pytest.mark.parametrize("max_length", [1, 3, 64])
+    def test_random(self, max_length):
+        """Test random sequences and patterns, whatever the sorted depth."""
+        rng = np.random.default_rng(max_length)
+        syllables = rng.choice(list("iab*"), size=2000, p=[0.4, 0.3, 0.2, 0.1])
+        syllables = "".join(syllables)
+        index = MotifIndex(syllables, "iab*", max_length=max_length)
+        for size in [1, 2, 5, 8]:
+            for start in rng.integers(0, 2000 - size, size=5):
+                pattern = syllables[start : start + size]
+                np.testing.assert_array_equal(
+                    index.find(pattern), find_all(pattern, syllables)
+                )
+
+    def test_bouts(self):
+        """Test per-bout counts and motif completeness."""
+        sequence = SyllableSequence.from_string(self.syllables, self.note_seq)
+        index = MotifIndex(sequence)
+        assert index.nb_bouts == 5
+        np.testing.assert_array_equal(
+            index.get_bout_counts("abcd"), [2, 1, 0, 2, 0]
+        )
+        # "d*i" crosses bout ends (a bout ends after its stop syllable)
+        assert index.count("d*i") == 2 and not index.get_bout_counts("d*i").any()
+
+        stats = index.get_motif_stats("abcdjia")
+        np.testing.assert_array_equal(stats["nb_motifs"], [1, 0, 0, 1, 0])
+        np.testing.assert_array_equal(stats["max_prefix"], [7, 4, 0, 7, 2])
+        np.testing.assert_allclose(stats["completeness"][1], 4 / 7)
+
+    def test_nb_song_note_in_bout(self):
+        """Test counting the song notes of a bout."""
+        assert nb_song_note_in_bout("abcd", "iiabd*") == 3
+        assert nb_song_note_in_bout("abcd", "") == 0
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -5,6 +5,7 @@ Tests for the plot module.
 import matplotlib.pyplot as plt
 import numpy as np
 import pytest
+import scipy.sparse as sp
 
 from syllable_network_analysis.plot import plot_transition_diag
 
@@ -52,6 +53,60 @@ class TestPlot:
         finally:
             plt.close(fig)
 
+    def test_plot_transition_diag_artists(self):
+        """Test that transitions and repeats are drawn as single collections."""
+        note_seq = "abc"
+        syl_network = [(0, 1, 50), (1, 2, 30), (2, 2, 20)]
+        syl_color = {"a": "red", "b": "blue", "c": "green"}
+
+        fig, ax = plt.subplots(1, 1, figsize=(8, 8))
+        try:
+            plot_transition_diag(ax, note_seq, syl_network, syl_color)
+            line_collection, loop_collection = ax.collections[1:]
+            assert len(line_collection.get_segments()) == 80
+            assert len(loop_collection.get_offsets()) == 20
+            assert len(ax.texts) == len(note_seq)
+            assert not ax.lines and not ax.patches
+        finally:
+            plt.close(fig)
+
+    def test_plot_transition_diag_matrix(self):
+        """Test plotting from a dense or sparse transition matrix."""
+        note_seq = "abc"
+        syl_network = [(0, 1, 5), (1, 2, 3), (2, 2, 2)]
+        trans_matrix = np.zeros((3, 3), dtype=np.int64)
+        for start_node, end_node, weight in syl_network:
+            trans_matrix[start_node, end_node] = weight
+        syl_color = {"a": "red", "b": "blue", "c": "green"}
+
+        segments = []
+        for network in (syl_network, trans_matrix, sp.csr_matrix(trans_matrix)):
+            fig, ax = plt.subplots(1, 1, figsize=(4, 4))
+            try:
+                plot_transition_diag(ax, note_seq, network, syl_color)
+                segments.append(ax.collections[1].get_segments())
+            finally:
+                plt.close(fig)
+        np.testing.assert_array_equal(segments[0], segments[1])
+        np.testing.assert_array_equal(segments[0], segments[2])
+
+    def test_plot_transition_diag_repeat_counts(self):
+        """Test that repeat loops are drawn once per run length."""
+        note_seq = "abc"
+        syl_network = [(0, 1, 5), (1, 2, 5), (2, 2, 40)]
+        syl_color = {"a": "red", "b": "blue", "c": "green"}
+        repeat_counts = np.zeros((3, 9), dtype=np.int64)
+        repeat_counts[2, [2, 5, 8]] = [10, 3, 1]  # runs of c of length 2, 5, 8
+
+        fig, ax = plt.subplots(1, 1, figsize=(4, 4))
+        try:
+            plot_transition_diag(
+                ax, note_seq, syl_network, syl_color, repeat_counts=repeat_counts
+            )
+            assert len(ax.collections[2].get_offsets()) == 3
+        finally:
+            plt.close(fig)
+
 
 if __name__ == "__main__":
     pytest.main([__file__])
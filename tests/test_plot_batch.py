@@ -0,0 +1,52 @@
+"""
+Tests for the batch plotting module.
+"""
+
+import pytest
+
+from syllable_network_analysis.plot import DiagramJob, render_transition_diagrams
+
+
+def _jobs(nb_jobs):
+    note_seq = "abc"
+    syl_color = {"a": "red", "b": "blue", "c": "green"}
+    return [
+        DiagramJob(f"bird{ind}", note_seq, [(0, 1, ind + 1), (2, 2, 2)], syl_color)
+        for ind in range(nb_jobs)
+    ]
+
+
+class TestBatchPlot:
+    """Test class for batch rendering of transition diagrams."""
+
+    @pytest.mark.parametrize("n_jobs", [1, 2])
+    def test_render(self, tmp_path, n_jobs):
+        """Test that every diagram is saved."""
+        rendered = render_transition_diagrams(
+            _jobs(3), tmp_path, n_jobs=n_jobs, figsize=(3, 3), dpi=30
+        )
+        assert [path.name for path in rendered] == [
+            "bird0.png",
+            "bird1.png",
+            "bird2.png",
+        ]
+        assert all(path.stat().st_size for path in rendered)
+
+    def test_skip_unchanged(self, tmp_path):
+        """Test that only changed diagrams are rendered again."""
+        kwargs = dict(figsize=(3, 3), dpi=30)
+        render_transition_diagrams(_jobs(3), tmp_path, **kwargs)
+        assert render_transition_diagrams(_jobs(3), tmp_path, **kwargs) == []
+
+        jobs = _jobs(3)
+        jobs[1] = jobs[1]._replace(title="changed")
+        (tmp_path / "bird2.png").unlink()
+        rendered = render_transition_diagrams(jobs, tmp_path, **kwargs)
+        assert [path.name for path in rendered] == ["bird1.png", "bird2.png"]
+
+        rendered = render_transition_diagrams(jobs, tmp_path, force=True, **kwargs)
+        assert len(rendered) == 3
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
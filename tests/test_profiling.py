@@ -0,0 +1,107 @@
+"""
+Tests for the profiling module.
+"""
+
+import csv
+import json
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import get_sequence_metrics, get_trans_matrix
+from syllable_network_analysis.utils import (
+    disable_profiling,
+    enable_profiling,
+    get_profiler,
+    profile_stage,
+    profiled,
+)
+
+
+@pytest.fixture
+def disabled_after():
+    yield
+    disable_profiling()
+
+
+class TestProfiling:
+    """Test class for the timing instrumentation."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiii*"
+    note_seq = "iabcdjkm*"
+
+    def test_disabled(self):
+        """Test that nothing is recorded while profiling is disabled."""
+        assert get_profiler() is None
+        with profile_stage("stage"):
+            trans_matrix = get_trans_matrix(self.syllables, self.note_seq)
+        assert trans_matrix.sum() == 27
+        assert get_profiler() is None
+
+    def test_records(self, disabled_after):
+        """Test the stages, nesting and input sizes of instrumented calls."""
+        profiler = enable_profiling()
+        with profile_stage("pipeline", size=1):
+            trans_matrix = get_trans_matrix(self.syllables, self.note_seq)
+            get_sequence_metrics(self.note_seq, trans_matrix)
+
+        records = {record["stage"]: record for record in profiler.records}
+        assert records["get_trans_matrix"]["size"] == len(self.syllables)
+        assert records["get_trans_matrix"]["parent"] == "pipeline"
+        assert records["get_trans_entropy"]["parent"] == "get_sequence_metrics"
+        assert records["get_sequence_metrics"]["size"] == trans_matrix.size
+        assert records["pipeline"]["parent"] is None
+        assert records["pipeline"]["wall_time"] >= sum(
+            records[stage]["wall_time"]
+            for stage in ("get_trans_matrix", "get_sequence_metrics")
+        )
+        assert records["pipeline"]["peak_memory"] is None
+
+        summary = profiler.get_summary()
+        assert summary["get_row_entropy"]["calls"] == 1
+        assert "get_trans_matrix" in profiler.format_summary()
+
+    def test_trace_memory(self, disabled_after):
+        """Test that peak allocations of nested stages are recorded."""
+        profiler = enable_profiling(trace_memory=True)
+        with profile_stage("outer"):
+            with profile_stage("inner"):
+                buffer = np.ones(2**20)  # 8 MB
+            del buffer
+            np.ones(2**17)
+
+        records = {record["stage"]: record for record in profiler.records}
+        assert records["inner"]["peak_memory"] >= 8 * 2**20
+        assert records["outer"]["peak_memory"] >= records["inner"]["peak_memory"]
+
+    def test_decorator_size_arg(self, disabled_after):
+        """Test recording the size of a named argument."""
+
+        @profiled(stage="work", size_arg="items")
+        def work(scale, items):
+            return [scale * item for item in items]
+
+        profiler = enable_profiling()
+        work(2, [1, 2, 3])
+        work(2, items=np.zeros((2, 5)))
+        assert [record["size"] for record in profiler.records] == [3, 10]
+
+    def test_save(self, tmp_path, disabled_after):
+        """Test the JSON and CSV reports."""
+        profiler = enable_profiling()
+        get_trans_matrix(self.syllables, self.note_seq)
+
+        profiler.save(tmp_path / "profile.json")
+        with open(tmp_path / "profile.json") as fh:
+            report = json.load(fh)
+        assert report["records"][0]["stage"] == "get_trans_matrix"
+        assert report["summary"]["get_trans_matrix"]["calls"] == 1
+
+        profiler.save(tmp_path / "profile.csv")
+        with open(tmp_path / "profile.csv", newline="") as fh:
+            rows = list(csv.DictReader(fh))
+        assert rows[0]["stage"] == "get_trans_matrix"
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,80 @@
+"""
+Tests for the repeats module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    SyllableSequence,
+    get_repeat_counts,
+    get_repeat_stats,
+    get_repeat_trans_matrix,
+    get_syllable_runs,
+    get_trans_matrix,
+)
+
+
+class TestRepeats:
+    """Test class for run-length encoding and repeat statistics."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiiixbb*"
+    note_seq = "iabcdjkm*"
+
+    def test_get_syllable_runs(self):
+        """Test run-length encoding."""
+        runs = get_syllable_runs("iiiabbx*", "iab*")
+        np.testing.assert_array_equal(runs.codes, [0, 1, 2, -1, 3])
+        np.testing.assert_array_equal(runs.lengths, [3, 1, 2, 1, 1])
+
+        seq = SyllableSequence.from_string(self.syllables, self.note_seq)
+        seq_runs = get_syllable_runs(seq)
+        string_runs = get_syllable_runs(self.syllables, self.note_seq)
+        np.testing.assert_array_equal(seq_runs.codes, string_runs.codes)
+        np.testing.assert_array_equal(seq_runs.lengths, string_runs.lengths)
+        assert get_syllable_runs(seq_runs) is seq_runs
+
+        empty = get_syllable_runs("", "iab*")
+        assert empty.codes.size == empty.lengths.size == 0
+
+    def test_get_repeat_counts(self):
+        """Test the repeat count distribution of each syllable."""
+        repeat_counts = get_repeat_counts(self.syllables, self.note_seq)
+        assert repeat_counts.shape == (9, 5)
+        np.testing.assert_array_equal(repeat_counts[0], [0, 1, 0, 1, 2])  # i
+        np.testing.assert_array_equal(repeat_counts[2], [0, 3, 1, 0, 0])  # b
+        # every known syllable is in exactly one run
+        run_length = np.arange(repeat_counts.shape[1])
+        assert repeat_counts @ run_length @ np.ones(9) == len(self.syllables) - 1
+
+    def test_get_repeat_stats(self):
+        """Test per-syllable repeat statistics."""
+        stats = get_repeat_stats(self.syllables, self.note_seq)
+        assert stats["nb_runs"][0] == 4
+        assert stats["mean_repeat"][0] == pytest.approx(12 / 4)
+        assert stats["max_repeat"][0] == 4
+        assert stats["repeat_fraction"][0] == pytest.approx(3 / 4)
+        assert stats["max_repeat"][7] == 0  # m never occurs
+        assert np.isnan(stats["mean_repeat"][7])
+
+    def test_get_repeat_trans_matrix(self):
+        """Test that each run counts as a single repeat."""
+        repeat_matrix = get_repeat_trans_matrix(self.syllables, self.note_seq)
+        trans_matrix = get_trans_matrix(self.syllables, self.note_seq)
+
+        off_diagonal = ~np.eye(9, dtype=bool)
+        np.testing.assert_array_equal(
+            repeat_matrix[off_diagonal], trans_matrix[off_diagonal]
+        )
+        assert repeat_matrix[0, 0] == 3  # three runs of i longer than one
+        assert repeat_matrix[2, 2] == 1
+        assert get_repeat_trans_matrix("a**", "a*")[1, 1] == 0
+
+        normalized = get_repeat_trans_matrix(
+            self.syllables, self.note_seq, normalize=True
+        )
+        assert normalized.sum() == pytest.approx(1.0)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,73 @@
+"""
+Tests for the resampling module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    bootstrap_metrics,
+    get_bout_trans_matrices,
+    get_confidence_interval,
+    get_trans_entropy,
+    get_trans_matrix,
+    shuffle_null_metrics,
+)
+
+
+class TestResampling:
+    """Test class for bootstrap and shuffle resampling."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiii*iiiabcdjiabcdk*kiiiiiabcdjia*iiabcd*"
+    note_seq = "iabcdjkm*"
+
+    def test_bout_trans_matrices_sum(self):
+        """Test that bout matrices sum up to the whole-string matrix."""
+        bout_matrices = get_bout_trans_matrices(self.syllables, self.note_seq)
+        assert bout_matrices.shape == (6, 9, 9)
+        np.testing.assert_array_equal(
+            bout_matrices.sum(axis=0), get_trans_matrix(self.syllables, self.note_seq)
+        )
+
+    def test_bootstrap_single_bout(self):
+        """Test that resampling a single bout reproduces its metrics."""
+        syllables = "iiabcdabcd*"
+        result = bootstrap_metrics(syllables, self.note_seq, nb_replicates=5)
+        expected = get_trans_entropy(get_trans_matrix(syllables, self.note_seq))
+        np.testing.assert_allclose(result["trans_entropy"], expected)
+
+    def test_bootstrap_deterministic(self):
+        """Test that results depend on the seed and not on the worker count."""
+        kwargs = dict(nb_replicates=50, seed=3, batch_size=20)
+        serial = bootstrap_metrics(self.syllables, self.note_seq, **kwargs)
+        parallel = bootstrap_metrics(self.syllables, self.note_seq, n_jobs=2, **kwargs)
+        assert serial["song_stereotypy"].shape == (50,)
+        for key in serial:
+            np.testing.assert_array_equal(serial[key], parallel[key])
+
+    def test_shuffle_null_keeps_bouts(self):
+        """Test that shuffling keeps the bout structure."""
+        result = shuffle_null_metrics("ab*ab*", "ab*", nb_replicates=20)
+        # Shuffled bouts are either "ab*" or "ba*", each with 2 transitions
+        assert np.all(np.isin(result["sequence_linearity"], [1.0, 2 / 3, 0.5]))
+
+    def test_shuffle_null_chunks(self, monkeypatch):
+        """Test that shuffling in bounded chunks does not change the replicates."""
+        from syllable_network_analysis.analysis import resampling
+
+        kwargs = dict(nb_replicates=30, seed=1, batch_size=30)
+        expected = shuffle_null_metrics(self.syllables, self.note_seq, **kwargs)
+        monkeypatch.setattr(resampling, "SHUFFLE_VALUES", 2 * len(self.syllables))
+        result = shuffle_null_metrics(self.syllables, self.note_seq, **kwargs)
+        for key in expected:
+            np.testing.assert_array_equal(result[key], expected[key])
+
+    def test_get_confidence_interval(self):
+        """Test percentile confidence interval."""
+        lower, upper = get_confidence_interval(np.arange(101), confidence=0.9)
+        assert lower == pytest.approx(5)
+        assert upper == pytest.approx(95)
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
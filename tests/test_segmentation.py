@@ -0,0 +1,109 @@
+"""
+Tests for the segmentation module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.audio import (
+    SyllableSegmenter,
+    segment_blocks,
+    segment_file,
+    segment_files,
+)
+
+SAMPLE_RATE = 32000
+
+
+def make_recording(syllables, duration=1.0, freq=4000.0, noise=0.001, seed=0):
+    """Tones at the given (onset, offset) times (s) over background noise."""
+    rng = np.random.default_rng(seed)
+    time = np.arange(int(duration * SAMPLE_RATE)) / SAMPLE_RATE
+    samples = noise * rng.standard_normal(time.size)
+    for onset, offset in syllables:
+        is_on = (time >= onset) & (time < offset)
+        samples[is_on] += 0.5 * np.sin(2 * np.pi * freq * time[is_on])
+    return samples.astype(np.float32)
+
+
+def split_blocks(samples, block_size):
+    return [samples[i : i + block_size] for i in range(0, samples.size, block_size)]
+
+
+class TestSegmentation:
+    """Test class for syllable segmentation."""
+
+    syllables = [(0.1, 0.15), (0.3, 0.42), (0.6, 0.65)]
+    recording = make_recording(syllables)
+
+    def test_segment_blocks(self):
+        """Test that onsets and offsets are found within a frame."""
+        table = segment_blocks([self.recording], SAMPLE_RATE)
+        np.testing.assert_allclose(
+            np.column_stack((table["onset"], table["offset"])),
+            self.syllables,
+            atol=0.002,
+        )
+        np.testing.assert_allclose(table["duration"], table["offset"] - table["onset"])
+
+    @pytest.mark.parametrize("block_size", [1, 777, 4096, 100000])
+    def test_block_size(self, block_size):
+        """Test that segments do not depend on the block size."""
+        expected = segment_blocks([self.recording], SAMPLE_RATE)
+        blocks = split_blocks(self.recording, block_size)
+        if block_size == 1:
+            blocks = blocks[:5000] + [self.recording[5000:]]
+        table = segment_blocks(blocks, SAMPLE_RATE)
+        for field in expected:
+            np.testing.assert_array_equal(table[field], expected[field])
+
+    def test_merge_and_filter(self):
+        """Test that short gaps are merged and short syllables dropped."""
+        recording = make_recording([(0.1, 0.2), (0.202, 0.3), (0.5, 0.505)])
+        table = segment_blocks(split_blocks(recording, 1000), SAMPLE_RATE)
+        np.testing.assert_allclose(table["onset"], [0.1], atol=0.002)
+        np.testing.assert_allclose(table["offset"], [0.3], atol=0.002)
+
+        table = segment_blocks([recording], SAMPLE_RATE, min_gap=0, min_duration=0)
+        assert table["onset"].size == 3
+
+    def test_streaming(self):
+        """Test that segments are returned once complete."""
+        segmenter = SyllableSegmenter(SAMPLE_RATE)
+        first = segmenter.update(self.recording[: int(0.2 * SAMPLE_RATE)])
+        assert first["onset"].size == 1
+        second = segmenter.update(self.recording[int(0.2 * SAMPLE_RATE) :])
+        assert second["onset"].size == 2
+        assert segmenter.finish()["onset"].size == 0
+
+        # A syllable still on at the end of the recording is closed
+        segmenter.update(make_recording([(0.9, 1.0)]))
+        np.testing.assert_allclose(segmenter.finish()["offset"], [1.0])
+
+    def test_freq_range(self):
+        """Test the spectral envelope with a frequency band."""
+        recording = self.recording + make_recording([(0.8, 0.9)], freq=500.0)
+        assert segment_blocks([recording], SAMPLE_RATE)["onset"].size == 4
+        table = segment_blocks([recording], SAMPLE_RATE, freq_range=(2000, 8000))
+        assert table["onset"].size == 3
+
+    def test_segment_files(self, tmp_path):
+        """Test segmenting audio files across worker processes."""
+        sf = pytest.importorskip("soundfile")
+        paths = []
+        for ind in range(3):
+            paths.append(tmp_path / f"rig{ind}.wav")
+            sf.write(paths[-1], self.recording, SAMPLE_RATE, subtype="FLOAT")
+
+        expected = segment_blocks([self.recording], SAMPLE_RATE)
+        table = segment_file(paths[0], block_size=1000)
+        np.testing.assert_allclose(table["onset"], expected["onset"])
+
+        output_paths = segment_files(paths, tmp_path / "segments", n_jobs=2)
+        assert [path.stem for path in output_paths] == ["rig0", "rig1", "rig2"]
+        rows = output_paths[2].read_text().splitlines()
+        assert rows[0] == "onset,offset,duration" and len(rows) == 4
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
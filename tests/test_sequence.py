@@ -0,0 +1,76 @@
+"""
+Tests for the sequence module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    SyllableSequence,
+    get_bout_trans_matrices,
+    get_trans_matrices,
+    get_trans_matrix,
+    nb_song_note_in_bout,
+)
+
+
+class TestSyllableSequence:
+    """Test class for the integer-encoded syllable sequence."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiii*kmmiiiabcdxiabcd*iab"
+    note_seq = "iabcdjkm*"
+
+    def test_from_string(self):
+        """Test encoding, bout offsets and decoding."""
+        seq = SyllableSequence.from_string(self.syllables, self.note_seq)
+        assert seq.codes.dtype == np.uint8
+        assert len(seq) == len(self.syllables)
+        assert seq.nb_bouts == 5
+        np.testing.assert_array_equal(seq.bout_offsets, [0, 16, 25, 30, 47, 50])
+        assert seq.to_string() == self.syllables.replace("x", "?")
+
+    def test_bout_views(self):
+        """Test that bouts are views on the sequence codes."""
+        seq = SyllableSequence.from_string(self.syllables, self.note_seq)
+        bouts = list(seq.iter_bouts())
+        assert [bout.to_string() for bout in bouts] == [
+            "kiiiiabcdjiabcd*",
+            "iiiabcdk*",
+            "iiii*",
+            "kmmiiiabcd?iabcd*",
+            "iab",
+        ]
+        assert np.shares_memory(bouts[1].codes, seq.codes)
+        assert seq.bout(-1).to_string() == "iab"
+        assert seq.bouts(1, 3).to_string() == "iiiabcdk*iiii*"
+        with pytest.raises(IndexError):
+            seq.bout(5)
+
+    def test_core_functions_accept_sequence(self):
+        """Test analysis functions on an encoded sequence."""
+        seq = SyllableSequence.from_string(self.syllables, self.note_seq)
+        expected = get_trans_matrix(self.syllables, self.note_seq)
+        np.testing.assert_array_equal(get_trans_matrix(seq), expected)
+        np.testing.assert_array_equal(
+            get_trans_matrices([seq], self.note_seq)[0], expected
+        )
+        np.testing.assert_array_equal(
+            get_bout_trans_matrices(seq, self.note_seq).sum(axis=0), expected
+        )
+
+        # Re-indexing into another note sequence
+        other_note_seq = "*mkjdcbai"
+        np.testing.assert_array_equal(
+            get_trans_matrix(seq, other_note_seq),
+            get_trans_matrix(self.syllables, other_note_seq),
+        )
+
+    def test_nb_song_note_in_bout(self):
+        """Test song note counting on an encoded bout."""
+        seq = SyllableSequence.from_string(self.syllables, self.note_seq)
+        counts = [nb_song_note_in_bout("abcd", bout) for bout in seq.iter_bouts()]
+        assert counts == [4, 4, 0, 4, 2]
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,67 @@
+"""
+Tests for the streaming module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    TransitionCounter,
+    get_sequence_consistency,
+    get_sequence_linearity,
+    get_song_stereotypy,
+    get_syllable_network,
+    get_trans_entropy,
+    get_trans_matrix,
+)
+
+
+class TestTransitionCounter:
+    """Test class for the incremental transition counter."""
+
+    syllables = "kiiiiabcdjiabcdjiabcd*iiiabcdk*iiii*iiiabcdjiabcdk*kiiiiiabcdjia*"
+    note_seq = "iabcdjkm*"
+
+    def test_chunks_match_full_string(self):
+        """Test that chunked updates match counting the whole string."""
+        counter = TransitionCounter(self.note_seq)
+        for start in range(0, len(self.syllables), 7):
+            counter.update(self.syllables[start : start + 7])
+
+        expected = get_trans_matrix(self.syllables, self.note_seq)
+        np.testing.assert_array_equal(counter.trans_matrix, expected)
+        assert counter.nb_syllables == len(self.syllables)
+
+    def test_metrics_match_core(self):
+        """Test that cached metrics match the core functions."""
+        counter = TransitionCounter(self.note_seq)
+        half = len(self.syllables) // 2
+        counter.update(self.syllables[:half])
+        counter.trans_entropy  # populate the row cache
+        counter.update(self.syllables[half:])
+
+        trans_matrix = get_trans_matrix(self.syllables, self.note_seq)
+        syl_network = get_syllable_network(trans_matrix)
+        linearity = get_sequence_linearity(self.note_seq, syl_network)
+        consistency = get_sequence_consistency(self.note_seq, trans_matrix)
+
+        assert counter.trans_entropy == pytest.approx(get_trans_entropy(trans_matrix))
+        assert counter.sequence_linearity == pytest.approx(linearity)
+        assert counter.sequence_consistency == pytest.approx(consistency)
+        assert counter.song_stereotypy == pytest.approx(
+            get_song_stereotypy(linearity, consistency)
+        )
+
+    def test_reset(self):
+        """Test that reset discards counts and the carried syllable."""
+        counter = TransitionCounter(self.note_seq)
+        counter.update("iabc")
+        counter.reset()
+        counter.update("d*")
+        np.testing.assert_array_equal(
+            counter.trans_matrix, get_trans_matrix("d*", self.note_seq)
+        )
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])
@@ -0,0 +1,60 @@
+"""
+Tests for the windowed module.
+"""
+
+import numpy as np
+import pytest
+
+from syllable_network_analysis.analysis import (
+    get_trans_entropy,
+    get_trans_matrix,
+    get_windowed_metrics,
+    get_windowed_trans_matrices,
+)
+
+
+class TestWindowed:
+    """Test class for sliding-window analysis."""
+
+    syllables = "kiiiiabcdjiabcd*iiiabcdk*iiii*iiiabcdjiabcdk*kiiiiiabcdjia*iab"
+    note_seq = "iabcdjkm*"
+
+    @pytest.mark.parametrize(
+        "window, step, unit",
+        [(2, 1, "bout"), (3, 2, "bout"), (1, 3, "bout"), (12, 5, "syllable")],
+    )
+    def test_trans_matrices_match_slices(self, window, step, unit):
+        """Test that incremental windows match counting each slice."""
+        win_start, win_stop, trans_matrices = get_windowed_trans_matrices(
+            self.syllables, self.note_seq, window, step=step, unit=unit
+        )
+        assert len(win_start) == len(trans_matrices) > 0
+        for start, stop, trans_matrix in zip(win_start, win_stop, trans_matrices):
+            expected = get_trans_matrix(self.syllables[start:stop], self.note_seq)
+            np.testing.assert_array_equal(trans_matrix, expected)
+
+    def test_bout_windows(self):
+        """Test that bout windows span whole bouts."""
+        win_start, win_stop, _ = get_windowed_trans_matrices(
+            "ab*ab*b*a", "ab*", window=2, unit="bout"
+        )
+        np.testing.assert_array_equal(win_start, [0, 3, 6])
+        np.testing.assert_array_equal(win_stop, [6, 8, 9])
+
+    def test_metrics(self):
+        """Test windowed metrics against the core functions."""
+        result = get_windowed_metrics(self.syllables, self.note_seq, window=2)
+        for ind, (start, stop) in enumerate(zip(result["start"], result["stop"])):
+            trans_matrix = get_trans_matrix(self.syllables[start:stop], self.note_seq)
+            assert result["trans_entropy"][ind] == pytest.approx(
+                get_trans_entropy(trans_matrix)
+            )
+
+    def test_invalid_unit(self):
+        """Test that an unknown window unit raises an error."""
+        with pytest.raises(ValueError):
+            get_windowed_trans_matrices(self.syllables, self.note_seq, 2, unit="day")
+
+
+if __name__ == "__main__":
+    pytest.main([__file__])